@@ -1,5 +1,6 @@
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for, Response, stream_with_context
 from werkzeug.utils import secure_filename
+import math
 import os
 import threading
 import time
@@ -8,7 +9,17 @@ import json
 import logging
 from scrapers.web_scraper import WebScraper
 from scrapers.youtube_scraper import YoutubeDownloader
-from scrapers.utils import get_download_status, cleanup_old_downloads
+from scrapers.driver_pool import get_driver_pool
+from scrapers.readiness import WAIT_STRATEGIES
+from scrapers.blob_store import BlobStore
+from scrapers.http_cache import get_http_cache
+from scrapers.metadata_cache import get_metadata_cache
+from scrapers.scheduler import JobScheduler, JobQueueFull
+from scrapers.task_registry import TaskRegistry, FINISHED_STATES
+from scrapers.job_store import create_job_store
+from scrapers.checkpoint import read_checkpoint, has_checkpoint
+from scrapers.archive import stream_zip, folder_signature, is_archive_fresh, list_archive_files
+from scrapers.utils import get_download_status, cleanup_old_downloads, parse_url_list, validate_url
 from config import Config
 
 app = Flask(__name__)
@@ -21,8 +32,26 @@ logging.basicConfig(
     format='%(asctime)s %(levelname)s %(name)s %(message)s'
 )
 
-# Dictionnaire pour suivre l'état des tâches
-task_status = {}
+# Registre thread-safe de l'état des tâches, partagé entre workers avec le stockage SQLite
+tasks = TaskRegistry(
+    store=create_job_store(Config.JOB_STORE, Config.JOB_STORE_PATH, Config.MAX_FINISHED_TASKS),
+    flush_interval=Config.JOB_PROGRESS_FLUSH_INTERVAL,
+    poll_interval=Config.JOB_STORE_POLL_INTERVAL,
+    heartbeat_timeout=Config.JOB_HEARTBEAT_TIMEOUT
+)
+
+# Métadonnées YouTube partagées entre l'aperçu et les téléchargements
+metadata_cache = get_metadata_cache(
+    Config.METADATA_CACHE_TTL,
+    Config.METADATA_CACHE_MAX_ENTRIES,
+    Config.METADATA_CACHE_FOLDER
+)
+
+# Workers bornés par type de tâche, au lieu d'un thread par requête
+scheduler = JobScheduler(
+    {'web': Config.WEB_WORKERS, 'youtube': Config.YOUTUBE_WORKERS},
+    max_queued=Config.MAX_QUEUED_JOBS
+)
 
 @app.route('/')
 def index():
@@ -50,25 +79,41 @@ def start_web_scraping():
         if not url:
             return jsonify({'error': 'URL manquante'}), 400
         
+        if options.get('render_mode', Config.DEFAULT_RENDER_MODE) not in Config.RENDER_MODES:
+            return jsonify({'error': 'Mode de rendu invalide'}), 400
+        
+        try:
+            # Valeurs normalisées conservées dans les options (relance, reprise)
+            options.update(parse_crawl_options(options))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        wait_strategy = options.get('wait_strategy', Config.DEFAULT_WAIT_STRATEGY)
+        if wait_strategy not in WAIT_STRATEGIES:
+            return jsonify({'error': "Stratégie d'attente invalide"}), 400
+        if wait_strategy == 'selector' and not options.get('wait_selector'):
+            return jsonify({'error': 'Sélecteur CSS manquant'}), 400
+        
+        # Crawl incrémental : la tâche de référence doit avoir laissé son état
+        baseline_task_id = options.get('baseline_task_id')
+        if baseline_task_id and (
+            secure_filename(baseline_task_id) != baseline_task_id
+            or not has_checkpoint(os.path.join('downloads', 'web_content', baseline_task_id))
+        ):
+            return jsonify({'error': 'Tâche de référence introuvable'}), 400
+        
         # Génération d'un ID unique pour la tâche
-        task_id = f"web_{int(time.time())}"
+        task_id = TaskRegistry.new_task_id('web')
         
         # Configuration du scraper
         output_folder = os.path.join('downloads', 'web_content', task_id)
         
-        # Lancement en arrière-plan
-        thread = threading.Thread(
-            target=run_web_scraping,
-            args=(task_id, url, output_folder, options)
+        # Mise en file d'attente
+        return submit_task(
+            task_id, 'web', url, run_web_scraping,
+            (task_id, url, output_folder, options),
+            options, Config.WEB_JOB_TIMEOUT, 'Scraping démarré'
         )
-        thread.daemon = True
-        thread.start()
-        
-        return jsonify({
-            'task_id': task_id,
-            'message': 'Scraping démarré',
-            'status': 'running'
-        })
         
     except Exception as e:
         logging.error(f"Erreur lors du démarrage du web scraping: {e}")
@@ -86,34 +131,371 @@ def start_youtube_download():
             return jsonify({'error': 'URL manquante'}), 400
         
         # Génération d'un ID unique pour la tâche
-        task_id = f"youtube_{int(time.time())}"
+        task_id = TaskRegistry.new_task_id('youtube')
         
         # Configuration du téléchargeur
         output_folder = os.path.join('downloads', 'youtube_content', task_id)
         
-        # Lancement en arrière-plan
-        thread = threading.Thread(
-            target=run_youtube_download,
-            args=(task_id, url, output_folder, options)
+        # Mise en file d'attente
+        return submit_task(
+            task_id, 'youtube', url, run_youtube_download,
+            (task_id, url, output_folder, options),
+            options, Config.YOUTUBE_JOB_TIMEOUT, 'Téléchargement démarré'
         )
-        thread.daemon = True
-        thread.start()
-        
-        return jsonify({
-            'task_id': task_id,
-            'message': 'Téléchargement démarré',
-            'status': 'running'
-        })
         
     except Exception as e:
         logging.error(f"Erreur lors du démarrage du téléchargement YouTube: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/start-youtube-batch', methods=['POST'])
+def start_youtube_batch():
+    """Lance le téléchargement d'une liste d'URLs YouTube en une seule tâche"""
+    try:
+        # Liste JSON, texte collé ou fichier texte/CSV envoyé en multipart
+        if request.files.get('file'):
+            text = request.files['file'].read().decode('utf-8', errors='replace')
+            urls = parse_url_list(text)
+            options = json.loads(request.form.get('options', '{}'))
+        else:
+            data = request.get_json() or {}
+            urls = data.get('urls') or parse_url_list(data.get('text', ''))
+            options = data.get('options', {})
+        
+        valid_urls = []
+        for raw_url in urls:
+            url, error = validate_url(raw_url.strip())
+            if error:
+                return jsonify({'error': f'{error}: {raw_url}'}), 400
+            valid_urls.append(url)
+        
+        if not valid_urls:
+            return jsonify({'error': 'Aucune URL fournie'}), 400
+        if len(valid_urls) > Config.MAX_BATCH_URLS:
+            return jsonify({'error': f'Trop d\'URLs (maximum {Config.MAX_BATCH_URLS})'}), 400
+        
+        task_id = TaskRegistry.new_task_id('youtube')
+        output_folder = os.path.join('downloads', 'youtube_content', task_id)
+        options = dict(options, urls=valid_urls)
+        
+        return submit_task(
+            task_id, 'youtube', valid_urls[0], run_youtube_download,
+            (task_id, valid_urls[0], output_folder, options),
+            options, Config.YOUTUBE_JOB_TIMEOUT, 'Téléchargement groupé démarré'
+        )
+        
+    except Exception as e:
+        logging.error(f"Erreur lors du démarrage du téléchargement groupé: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def parse_priority(options):
+    """Priorité entière d'une tâche, ramenée dans les bornes de la configuration
+
+    Lève ValueError si la valeur envoyée n'est pas un nombre entier.
+    """
+    value = options.get('priority')
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        raise ValueError('Priorité invalide')
+    try:
+        priority = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('Priorité invalide')
+    return min(max(priority, Config.MIN_JOB_PRIORITY), Config.MAX_JOB_PRIORITY)
+
+def parse_seconds(options, name, default, message, allow_zero=True):
+    """Durée en secondes d'une option, ou default si elle est absente (ou null)
+
+    Lève ValueError(message) si la valeur n'est pas un nombre fini positif
+    (strictement positif avec allow_zero=False).
+    """
+    value = options.get(name)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError(message)
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(message)
+    if not math.isfinite(seconds) or seconds < 0 or (seconds == 0 and not allow_zero):
+        raise ValueError(message)
+    return seconds
+
+def parse_count(options, name, default, minimum, maximum, message):
+    """Entier d'une option compris entre minimum et maximum (None = sans borne)
+
+    Une valeur absente (ou null) donne default. Lève ValueError(message) pour
+    un booléen, un nombre non entier ou une valeur hors bornes.
+    """
+    value = options.get(name)
+    if value is None:
+        return default
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(message)
+    try:
+        count = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(message)
+    if count < minimum or (maximum is not None and count > maximum):
+        raise ValueError(message)
+    return count
+
+def parse_delay(options):
+    """Délai moyen entre deux requêtes vers un même hôte, en secondes
+
+    Une valeur absente (ou null, envoyée pour un champ vide) donne le délai
+    par défaut. Lève ValueError si la valeur n'est pas un nombre fini positif.
+    """
+    return parse_seconds(options, 'delay', Config.DEFAULT_DELAY, 'Délai invalide')
+
+def parse_crawl_options(options):
+    """Options numériques d'un scraping web, validées et normalisées
+
+    Lève ValueError avec le message à renvoyer si une valeur est invalide.
+    """
+    return {
+        'delay': parse_delay(options),
+        'workers': parse_count(
+            options, 'workers', Config.DEFAULT_CRAWL_WORKERS, 1, Config.MAX_CRAWL_WORKERS,
+            f'Nombre de pages en parallèle invalide (1 à {Config.MAX_CRAWL_WORKERS})'
+        ),
+        'max_depth': parse_count(
+            options, 'max_depth', Config.DEFAULT_MAX_DEPTH, 0, None, 'Profondeur maximale invalide'
+        ),
+        'wait_timeout': parse_seconds(
+            options, 'wait_timeout', Config.DEFAULT_WAIT_TIMEOUT, "Délai d'attente invalide", allow_zero=False
+        ),
+        'shards': parse_count(
+            options, 'shards', Config.DEFAULT_CRAWL_SHARDS, 1, Config.MAX_CRAWL_SHARDS,
+            f'Nombre de processus invalide (1 à {Config.MAX_CRAWL_SHARDS})'
+        ),
+    }
+
+def submit_task(task_id, kind, url, func, args, options, timeout, message):
+    """Soumet une tâche au planificateur et construit la réponse JSON"""
+    try:
+        # Valeur normalisée conservée dans les options (relance, reprise)
+        options['priority'] = parse_priority(options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    tasks.create(
+        task_id, kind,
+        status='queued',
+        url=url,
+        options=options,
+        submitted_at=datetime.now().isoformat(),
+        progress=0
+    )
+    
+    try:
+        position = scheduler.submit(
+            task_id, kind, func, args,
+            priority=options['priority'],
+            timeout=timeout
+        )
+    except JobQueueFull as e:
+        tasks.remove(task_id)
+        return jsonify({'error': str(e)}), 429
+    
+    return queued_response(task_id, position, message)
+
+def queued_response(task_id, position, message):
+    """Réponse JSON d'une tâche soumise au planificateur"""
+    if position:
+        return jsonify({
+            'task_id': task_id,
+            'message': "Tâche en file d'attente",
+            'status': 'queued',
+            'queue_position': position
+        }), 202
+    
+    return jsonify({
+        'task_id': task_id,
+        'message': message,
+        'status': 'running'
+    })
+
+@app.route('/retry/<task_id>', methods=['POST'])
+def retry_task(task_id):
+    """Relance une tâche en erreur ou annulée dans son dossier d'origine
+
+    Les fichiers déjà terminés sont conservés et les téléchargements
+    interrompus reprennent à partir des fichiers partiels.
+    """
+    task = tasks.get(task_id)
+    if task is None:
+        return jsonify({'error': 'Tâche introuvable'}), 404
+    if tasks.is_orphaned(task):
+        task = tasks.interrupt(task_id)
+    if task['status'] not in ('error', 'cancelled'):
+        return jsonify({'error': 'Seules les tâches en erreur ou annulées peuvent être relancées'}), 409
+    
+    if task['type'] == 'web':
+        func, content_folder, timeout = run_web_scraping, 'web_content', Config.WEB_JOB_TIMEOUT
+    else:
+        func, content_folder, timeout = run_youtube_download, 'youtube_content', Config.YOUTUBE_JOB_TIMEOUT
+    
+    options = task.get('options', {})
+    try:
+        priority = parse_priority(options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    output_folder = os.path.join('downloads', content_folder, task_id)
+    tasks.update(
+        task_id,
+        status='queued',
+        error=None,
+        cancel_requested=False,
+        progress=0,
+        retries=task.get('retries', 0) + 1,
+        submitted_at=datetime.now().isoformat()
+    )
+    
+    try:
+        position = scheduler.submit(
+            task_id, task['type'], func,
+            (task_id, task['url'], output_folder, options),
+            priority=priority,
+            timeout=timeout
+        )
+    except JobQueueFull as e:
+        tasks.update(task_id, status=task['status'], error=task.get('error'))
+        return jsonify({'error': str(e)}), 429
+    
+    return queued_response(task_id, position, 'Tâche relancée')
+
+@app.route('/resume/<task_id>', methods=['POST'])
+def resume_task(task_id):
+    """Reprend un crawl interrompu à partir de son point de reprise
+
+    Fonctionne aussi après un redémarrage du serveur : la tâche est alors
+    reconstruite à partir des informations du point de reprise, ou passée
+    en erreur si elle était restée en cours dans le stockage partagé.
+    """
+    output_folder = os.path.join('downloads', 'web_content', task_id)
+    task = tasks.get(task_id)
+    if tasks.is_orphaned(task):
+        task = tasks.interrupt(task_id)
+    if task is not None and task['status'] not in ('error', 'cancelled'):
+        return jsonify({'error': 'Seules les tâches en erreur ou annulées peuvent être reprises'}), 409
+    
+    checkpoint = read_checkpoint(output_folder) if task_id.startswith('web_') else None
+    if checkpoint is None:
+        return jsonify({'error': 'Aucun point de reprise pour cette tâche'}), 404
+    
+    url = checkpoint['start_url']
+    options = dict(checkpoint.get('metadata', {}).get('options', {}), resume=True)
+    try:
+        priority = parse_priority(options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if task is None:
+        tasks.create(task_id, 'web', status='queued', url=url, options=options, progress=0)
+    tasks.update(
+        task_id,
+        status='queued',
+        error=None,
+        cancel_requested=False,
+        options=options,
+        submitted_at=datetime.now().isoformat()
+    )
+    
+    try:
+        position = scheduler.submit(
+            task_id, 'web', run_web_scraping,
+            (task_id, url, output_folder, options),
+            priority=priority,
+            timeout=Config.WEB_JOB_TIMEOUT
+        )
+    except JobQueueFull as e:
+        tasks.update(task_id, status='error', error=str(e), completed_at=datetime.now().isoformat())
+        return jsonify({'error': str(e)}), 429
+    
+    return queued_response(task_id, position, 'Crawl repris')
+
+@app.route('/video-info', methods=['POST'])
+def video_info():
+    """Aperçu d'une vidéo YouTube (titre, auteur, durée, formats)"""
+    data = request.get_json() or {}
+    url = data.get('url')
+    if not url:
+        return jsonify({'error': 'URL requise'}), 400
+    
+    downloader = YoutubeDownloader(os.path.join('downloads', 'youtube_content'), metadata_cache=metadata_cache)
+    info = downloader.get_video_info(url)
+    if info is None:
+        return jsonify({'error': 'Impossible de récupérer les informations de la vidéo'}), 422
+    
+    info.pop('formats', None)
+    info.update(downloader.get_available_formats(url))
+    return jsonify(info)
+
+def task_snapshot(task_id, task):
+    """État public d'une tâche, avec sa position dans la file d'attente"""
+    status = task or {'status': 'not_found'}
+    if status['status'] == 'queued':
+        status['queue_position'] = scheduler.queue_position(task_id)
+    return status
+
 @app.route('/task-status/<task_id>')
 def get_task_status(task_id):
     """Récupère l'état d'une tâche"""
-    status = task_status.get(task_id, {'status': 'not_found'})
-    return jsonify(status)
+    return jsonify(task_snapshot(task_id, tasks.get(task_id)))
+
+@app.route('/task-events/<task_id>')
+def task_events(task_id):
+    """Flux Server-Sent Events de la progression d'une tâche"""
+    min_interval = 1.0 / Config.SSE_MAX_EVENTS_PER_SECOND
+    
+    def generate():
+        version, task = tasks.get_versioned(task_id)
+        last_sent = 0
+        while True:
+            status = task_snapshot(task_id, task)
+            yield f"data: {json.dumps(status)}\n\n"
+            last_sent = time.monotonic()
+            if status['status'] in FINISHED_STATES or status['status'] == 'not_found':
+                return
+            
+            while True:
+                new_version, task = tasks.wait_for_change(task_id, version, timeout=Config.SSE_KEEPALIVE_SECONDS)
+                if new_version != version or task is None:
+                    break
+                yield ": keep-alive\n\n"
+            
+            # Regrouper les mises à jour trop rapprochées en un seul événement
+            delay = last_sent + min_interval - time.monotonic()
+            if delay > 0 and task is not None and task.get('status') not in FINISHED_STATES:
+                time.sleep(delay)
+                new_version, task = tasks.get_versioned(task_id)
+            version = new_version
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/cancel-task/<task_id>', methods=['POST'])
+def cancel_task(task_id):
+    """Annule une tâche en attente ou en cours"""
+    if not scheduler.cancel(task_id):
+        # Tâche exécutée par un autre worker : il appliquera la demande
+        task = tasks.get(task_id)
+        if not tasks.store.shared or task is None or task['status'] not in ('queued', 'running'):
+            return jsonify({'success': False, 'error': 'Tâche introuvable ou déjà terminée'}), 404
+        tasks.update(task_id, cancel_requested=True)
+        return jsonify({'success': True})
+    
+    if (tasks.get(task_id) or {}).get('status') == 'queued':
+        tasks.update(
+            task_id,
+            status='cancelled',
+            completed_at=datetime.now().isoformat()
+        )
+    return jsonify({'success': True})
 
 @app.route('/download/<task_id>')
 def download_result(task_id):
@@ -124,24 +506,15 @@ def download_result(task_id):
         youtube_folder = os.path.join('downloads', 'youtube_content', task_id)
         
         if os.path.exists(web_folder):
-            # Créer un ZIP du contenu web
-            import zipfile
-            zip_path = f"{web_folder}.zip"
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for root, dirs, files in os.walk(web_folder):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, web_folder)
-                        zipf.write(file_path, arcname)
-            
-            return send_file(zip_path, as_attachment=True, download_name=f"web_content_{task_id}.zip")
+            return send_folder_archive(web_folder, f"web_content_{task_id}.zip")
         
         elif os.path.exists(youtube_folder):
-            # Pour YouTube, renvoyer le premier fichier trouvé
-            for file in os.listdir(youtube_folder):
-                file_path = os.path.join(youtube_folder, file)
-                if os.path.isfile(file_path):
-                    return send_file(file_path, as_attachment=True)
+            # Une seule vidéo : envoi direct ; playlist ou lot : archive ZIP
+            files = list_archive_files(youtube_folder)
+            if len(files) == 1:
+                return send_file(os.path.abspath(files[0][0]), as_attachment=True)
+            if files:
+                return send_folder_archive(youtube_folder, f"youtube_content_{task_id}.zip")
         
         return jsonify({'error': 'Fichier non trouvé'}), 404
         
@@ -149,34 +522,73 @@ def download_result(task_id):
         logging.error(f"Erreur lors du téléchargement: {e}")
         return jsonify({'error': str(e)}), 500
 
+def send_folder_archive(folder, download_name):
+    """Envoie un dossier sous forme d'archive ZIP, mise en cache à côté du dossier"""
+    zip_path = os.path.abspath(f"{folder}.zip")
+    signature = folder_signature(folder)
+    
+    # Archive déjà construite et dossier inchangé : envoi direct
+    if is_archive_fresh(zip_path, signature):
+        return send_file(zip_path, as_attachment=True, download_name=download_name)
+    
+    # Sinon, l'archive est envoyée pendant sa construction et mise en cache
+    return Response(
+        stream_with_context(stream_zip(folder, signature, cache_path=zip_path)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+    )
+
 @app.route('/results')
 def results():
     """Page des résultats avec historique"""
     # Récupérer l'historique des tâches
     history = []
-    for task_id, status in task_status.items():
-        if status.get('status') == 'completed':
-            history.append({
-                'task_id': task_id,
-                'type': 'Web Scraping' if task_id.startswith('web_') else 'YouTube',
-                'url': status.get('url', ''),
-                'completed_at': status.get('completed_at', ''),
-                'files_count': status.get('files_count', 0)
-            })
+    for task_id, status in tasks.list(status='completed'):
+        history.append({
+            'task_id': task_id,
+            'type': 'Web Scraping' if status.get('type') == 'web' else 'YouTube',
+            'url': status.get('url', ''),
+            'completed_at': status.get('completed_at', ''),
+            'files_count': status.get('files_count', 0)
+        })
     
     return render_template('results.html', history=history)
 
-def run_web_scraping(task_id, url, output_folder, options):
+def finish_cancelled_task(task_id):
+    """Marque une tâche arrêtée par annulation ou par dépassement de délai"""
+    job = scheduler.get_job(task_id)
+    if job is not None and job.timed_out:
+        tasks.update(
+            task_id,
+            status='error',
+            error='Délai maximal de la tâche dépassé',
+            completed_at=datetime.now().isoformat()
+        )
+    else:
+        tasks.update(
+            task_id,
+            status='cancelled',
+            completed_at=datetime.now().isoformat()
+        )
+
+def run_web_scraping(task_id, url, output_folder, options, cancel_event=None):
     """Exécute le web scraping"""
+    scraper = None
     try:
-        task_status[task_id] = {
-            'status': 'running',
-            'url': url,
-            'started_at': datetime.now().isoformat(),
-            'progress': 0
-        }
+        tasks.update(
+            task_id,
+            status='running',
+            started_at=datetime.now().isoformat()
+        )
         
-        scraper = WebScraper(output_folder)
+        # Les tâches attendent un driver du pool au lieu de lancer leur propre Chrome
+        driver_pool = get_driver_pool(Config.DRIVER_POOL_SIZE, Config.DRIVER_MAX_PAGES)
+        scraper = WebScraper(
+            output_folder,
+            driver_pool=driver_pool,
+            blob_store=BlobStore(Config.BLOB_STORE_FOLDER),
+            http_cache=get_http_cache(Config.HTTP_CACHE_FOLDER, Config.HTTP_CACHE_MAX_SIZE) if Config.HTTP_CACHE_ENABLED else None
+        )
         
         # Configuration des options
         scraper.max_pages = options.get('max_pages', 10)
@@ -184,90 +596,177 @@ def run_web_scraping(task_id, url, output_folder, options):
         scraper.download_css = options.get('download_css', True)
         scraper.download_js = options.get('download_js', True)
         scraper.follow_external_links = options.get('follow_external_links', False)
+        scraper.max_workers = Config.MAX_CONCURRENT_DOWNLOADS
+        scraper.max_connections_per_host = Config.MAX_CONNECTIONS_PER_HOST
+        scraper.resume_attempts = Config.DOWNLOAD_RESUME_ATTEMPTS
+        crawl_options = parse_crawl_options(options)
+        scraper.delay = crawl_options['delay']
+        scraper.rate_burst = Config.RATE_LIMIT_BURST
+        scraper.domain_rate_limits = Config.DOMAIN_RATE_LIMITS
+        scraper.checkpoint_every = Config.CHECKPOINT_EVERY_PAGES
+        scraper.checkpoint_metadata = {'task_id': task_id, 'options': options}
+        if options.get('baseline_task_id'):
+            scraper.baseline_folder = os.path.join('downloads', 'web_content', options['baseline_task_id'])
+        scraper.workers = crawl_options['workers']
+        scraper.max_depth = crawl_options['max_depth']
+        scraper.render_mode = options.get('render_mode', Config.DEFAULT_RENDER_MODE)
+        scraper.domain_render_modes = dict(Config.RENDER_MODE_OVERRIDES)
+        scraper.render_fallback_pages = Config.RENDER_FALLBACK_PAGES
+        scraper.parser_backend = Config.HTML_PARSER
+        scraper.tracking_params = Config.TRACKING_PARAMS
+        scraper.seen_set = Config.SEEN_SET
+        scraper.bloom_capacity = Config.BLOOM_CAPACITY
+        scraper.bloom_error_rate = Config.BLOOM_ERROR_RATE
+        scraper.wait_strategy = options.get('wait_strategy', Config.DEFAULT_WAIT_STRATEGY)
+        scraper.wait_selector = options.get('wait_selector')
+        scraper.wait_timeout = crawl_options['wait_timeout']
+        scraper.wait_quiet_period = Config.DEFAULT_WAIT_QUIET_PERIOD
         
         # Callback pour suivre le progrès
         def progress_callback(current, total):
-            task_status[task_id]['progress'] = int((current / total) * 100)
+            tasks.report_progress(task_id, progress=int((current / total) * 100))
         
         scraper.set_progress_callback(progress_callback)
+        scraper.cancel_event = cancel_event
+        
+        # Lancement du scraping, réparti sur plusieurs processus si demandé
+        shards = crawl_options['shards']
+        if shards > 1:
+            scraper.start_sharded_scraping(url, shards, resume=options.get('resume', False))
+        else:
+            scraper.start_scraping(url, resume=options.get('resume', False))
         
-        # Lancement du scraping
-        scraper.start_scraping(url)
+        if scraper.is_cancelled():
+            finish_cancelled_task(task_id)
+            return
         
         # Finalisation
         files_count = scraper.get_files_count()
-        task_status[task_id].update({
-            'status': 'completed',
-            'completed_at': datetime.now().isoformat(),
-            'files_count': files_count,
-            'progress': 100
-        })
+        tasks.update(
+            task_id,
+            status='completed',
+            completed_at=datetime.now().isoformat(),
+            files_count=files_count,
+            render_stats=scraper.render_stats,
+            page_wait_times=scraper.page_wait_times,
+            cache_stats=scraper.get_cache_stats(),
+            rate_limit_stats=scraper.get_rate_limit_stats(),
+            asset_cache_stats=scraper.get_asset_cache_stats(),
+            changes={
+                name: len(value) if isinstance(value, list) else value
+                for name, value in scraper.changes_manifest.items() if name != 'baseline'
+            } if scraper.changes_manifest else None,
+            progress=100
+        )
         
-        scraper.close()
         logging.info(f"Web scraping terminé pour {task_id}: {files_count} fichiers")
         
     except Exception as e:
-        task_status[task_id] = {
-            'status': 'error',
-            'error': str(e),
-            'completed_at': datetime.now().isoformat()
-        }
+        tasks.update(
+            task_id,
+            status='error',
+            error=str(e),
+            completed_at=datetime.now().isoformat()
+        )
         logging.error(f"Erreur lors du web scraping {task_id}: {e}")
+    finally:
+        # Rendre le driver au pool même en cas d'erreur
+        if scraper is not None:
+            scraper.close()
 
-def run_youtube_download(task_id, url, output_folder, options):
+def run_youtube_download(task_id, url, output_folder, options, cancel_event=None):
     """Exécute le téléchargement YouTube"""
     try:
-        task_status[task_id] = {
-            'status': 'running',
-            'url': url,
-            'started_at': datetime.now().isoformat(),
-            'progress': 0
-        }
+        tasks.update(
+            task_id,
+            status='running',
+            started_at=datetime.now().isoformat()
+        )
         
-        downloader = YoutubeDownloader(output_folder)
+        downloader = YoutubeDownloader(output_folder, metadata_cache=metadata_cache)
+        downloader.playlist_workers = Config.YOUTUBE_PLAYLIST_WORKERS
+        downloader.entry_retries = Config.YOUTUBE_ENTRY_RETRIES
+        downloader.concurrent_fragments = Config.YOUTUBE_CONCURRENT_FRAGMENTS
         
         # Configuration des options
         quality = options.get('quality', 'best')
         audio_only = options.get('audio_only', False)
         is_playlist = options.get('is_playlist', False)
+        batch_urls = options.get('urls')
         
         # Callback pour suivre le progrès
         def progress_callback(progress_info):
             if 'percentage' in progress_info:
                 percentage = progress_info['percentage']
                 if percentage:
-                    task_status[task_id]['progress'] = int(percentage)
+                    tasks.report_progress(task_id, progress=int(percentage))
+            if 'entries_total' in progress_info:
+                # Progression agrégée d'une playlist
+                tasks.report_progress(
+                    task_id,
+                    entries_done=progress_info['entries_done'],
+                    entries_failed=progress_info['entries_failed'],
+                    entries_total=progress_info['entries_total'],
+                    bytes_done=progress_info['bytes_done'],
+                    bytes_total=progress_info['bytes_total'],
+                    items=progress_info['items']
+                )
         
         downloader.set_progress_callback(progress_callback)
+        downloader.cancel_event = cancel_event
         
         # Lancement du téléchargement
-        if is_playlist:
+        if batch_urls:
+            result = downloader.download_batch(batch_urls, quality, audio_only)
+        elif is_playlist:
             result = downloader.download_playlist(url, quality, audio_only)
         else:
             result = downloader.download_video(url, quality, audio_only)
         
+        if cancel_event is not None and cancel_event.is_set():
+            finish_cancelled_task(task_id)
+            return
+        
+        if not result.get('success'):
+            raise Exception(result.get('error', 'Téléchargement échoué'))
+        
+        # Tâche terminée : les fichiers partiels ne serviront plus
+        downloader.cleanup()
+        
         # Finalisation
-        task_status[task_id].update({
-            'status': 'completed',
-            'completed_at': datetime.now().isoformat(),
-            'files_count': result.get('files_count', 1),
-            'progress': 100
-        })
+        tasks.update(
+            task_id,
+            status='completed',
+            completed_at=datetime.now().isoformat(),
+            files_count=result.get('files_count', 1),
+            failed_entries=result.get('failed', []),
+            duplicate_urls=result.get('duplicates', []),
+            extraction_time=result.get('extraction_time'),
+            download_time=result.get('download_time'),
+            progress=100
+        )
         
         logging.info(f"Téléchargement YouTube terminé pour {task_id}")
         
     except Exception as e:
-        task_status[task_id] = {
-            'status': 'error',
-            'error': str(e),
-            'completed_at': datetime.now().isoformat()
-        }
+        tasks.update(
+            task_id,
+            status='error',
+            error=str(e),
+            completed_at=datetime.now().isoformat()
+        )
         logging.error(f"Erreur lors du téléchargement YouTube {task_id}: {e}")
 
 # Nettoyage périodique des anciens téléchargements
+cleanup_started = threading.Event()
+
 @app.before_request
 def setup_cleanup():
-    """Configure le nettoyage automatique"""
+    """Configure le nettoyage automatique (un seul thread par processus)"""
+    if cleanup_started.is_set():
+        return
+    cleanup_started.set()
+    
     def cleanup_task():
         while True:
             time.sleep(3600)  # Toutes les heures
@@ -276,6 +775,41 @@ def setup_cleanup():
     cleanup_thread = threading.Thread(target=cleanup_task)
     cleanup_thread.daemon = True
     cleanup_thread.start()
+    
+    if tasks.store.shared:
+        cancel_thread = threading.Thread(target=watch_remote_cancellations, daemon=True)
+        cancel_thread.start()
+        heartbeat_thread = threading.Thread(target=watch_orphaned_tasks, daemon=True)
+        heartbeat_thread.start()
+
+def watch_remote_cancellations():
+    """Applique les annulations demandées à un autre worker pour les tâches de ce processus"""
+    while True:
+        time.sleep(Config.JOB_STORE_POLL_INTERVAL)
+        try:
+            for task_id in scheduler.active_job_ids():
+                task = tasks.get(task_id)
+                if not task or not task.get('cancel_requested') or not scheduler.cancel(task_id):
+                    continue
+                if task['status'] == 'queued':
+                    tasks.update(task_id, status='cancelled', completed_at=datetime.now().isoformat())
+        except Exception as e:
+            logging.error(f"Erreur lors de la vérification des annulations: {e}")
+
+def watch_orphaned_tasks():
+    """Signale que ce worker est vivant et passe en erreur les tâches des workers arrêtés
+
+    Les tâches en attente ou en cours lors d'un redémarrage sont ainsi
+    marquées interrompues et peuvent être relancées ou reprises.
+    """
+    while True:
+        try:
+            tasks.heartbeat()
+            for task_id in tasks.recover_orphans():
+                logging.info(f"Tâche {task_id} marquée interrompue")
+        except Exception as e:
+            logging.error(f"Erreur lors de la vérification des tâches interrompues: {e}")
+        time.sleep(Config.JOB_HEARTBEAT_INTERVAL)
 
 if __name__ == '__main__':
     # Créer les dossiers nécessaires
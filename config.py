@@ -9,17 +9,91 @@ class Config:
     
     # Dossiers
     UPLOAD_FOLDER = 'downloads'
+    BLOB_STORE_FOLDER = os.path.join('downloads', 'blobs')  # Fichiers partagés entre tâches
+    
+    # Cache HTTP (ETag/Last-Modified/Cache-Control) partagé entre tâches
+    HTTP_CACHE_ENABLED = True
+    HTTP_CACHE_FOLDER = os.path.join('downloads', 'http_cache')
+    HTTP_CACHE_MAX_SIZE = 500 * 1024 * 1024  # 500MB, éviction LRU au-delà
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max pour les uploads
     
     # Web Scraping
     DEFAULT_MAX_PAGES = 10
     DEFAULT_TIMEOUT = 30
     DEFAULT_DELAY = 1
+    MAX_CONCURRENT_DOWNLOADS = 8  # Ressources téléchargées en parallèle par tâche
+    MAX_CONNECTIONS_PER_HOST = 4  # Connexions simultanées vers un même hôte
+    RATE_LIMIT_BURST = 4  # Requêtes consécutives vers un hôte avant application du délai
+    # Débit maximal par domaine (requêtes/s, None = illimité), prioritaire sur le délai de la tâche
+    DOMAIN_RATE_LIMITS = {}
+    DOWNLOAD_RESUME_ATTEMPTS = 2  # Reprises d'un téléchargement coupé (requêtes Range)
+    CHECKPOINT_EVERY_PAGES = 10  # Pages crawlées entre deux points de reprise
+    DEFAULT_CRAWL_WORKERS = 1  # Pages traitées en parallèle par tâche
+    MAX_CRAWL_WORKERS = 16
+    DEFAULT_CRAWL_SHARDS = 1  # Processus de crawl par tâche (> 1 = crawl réparti sur plusieurs cœurs)
+    MAX_CRAWL_SHARDS = os.cpu_count() or 1
+    DEFAULT_MAX_DEPTH = None  # Profondeur de crawl maximale (None = illimitée)
+    DEFAULT_RENDER_MODE = 'auto'  # 'static', 'browser' ou 'auto'
+    RENDER_MODES = ['static', 'browser', 'auto']
+    HTML_PARSER = 'auto'  # 'auto' (lxml si installé), 'lxml' ou 'html.parser'
+    
+    # Déduplication des URLs du crawl
+    # Paramètres de requête ignorés lors de la canonisation des URLs (motifs fnmatch)
+    TRACKING_PARAMS = ['utm_*', 'gclid', 'dclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_hsenc', '_hsmi']
+    SEEN_SET = 'hash'  # 'hash' (empreintes 64 bits) ou 'bloom' (mémoire fixe, très gros crawls)
+    BLOOM_CAPACITY = 1000000  # URLs prévues pour le filtre de Bloom
+    BLOOM_ERROR_RATE = 0.001  # Taux de faux positifs visé
+    
+    # Attente de la page rendue par Chrome
+    DEFAULT_WAIT_STRATEGY = 'ready_state'  # 'ready_state', 'network_idle', 'mutation_idle' ou 'selector'
+    DEFAULT_WAIT_TIMEOUT = 10  # Secondes
+    DEFAULT_WAIT_QUIET_PERIOD = 0.5  # Secondes sans activité réseau/DOM
+    
+    # Mode de rendu forcé par domaine, ex: {'app.exemple.com': 'browser'}
+    RENDER_MODE_OVERRIDES = {}
+    # En mode 'auto', pages consécutives nécessitant Chrome avant d'y passer tout le domaine
+    RENDER_FALLBACK_PAGES = 3
+    
+    # Pool de navigateurs Chrome partagé entre les tâches
+    DRIVER_POOL_SIZE = 2  # Nombre maximal de Chrome lancés simultanément
+    DRIVER_MAX_PAGES = 100  # Pages chargées avant recyclage d'un driver
     
     # YouTube
     DEFAULT_QUALITY = 'best'
     ALLOWED_FORMATS = ['mp4', 'webm', 'mp3', 'wav']
     
+    # File d'attente des tâches
+    WEB_WORKERS = 2  # Scrapings web exécutés simultanément
+    YOUTUBE_WORKERS = 2  # Téléchargements YouTube exécutés simultanément
+    MAX_QUEUED_JOBS = 20  # Au-delà, les nouvelles tâches sont refusées (429)
+    MIN_JOB_PRIORITY = -10  # Priorités acceptées (les plus petites passent en premier)
+    MAX_JOB_PRIORITY = 10
+    WEB_JOB_TIMEOUT = 3600  # Durée maximale d'un scraping (secondes)
+    YOUTUBE_JOB_TIMEOUT = 7200  # Durée maximale d'un téléchargement (secondes)
+    MAX_FINISHED_TASKS = 500  # Tâches terminées conservées dans le registre
+    # Stockage des tâches : 'sqlite' (partagé entre workers gunicorn) ou 'memory' (un seul processus)
+    JOB_STORE = os.environ.get('JOB_STORE', 'sqlite')
+    JOB_STORE_PATH = os.path.join('downloads', 'jobs.sqlite3')
+    JOB_PROGRESS_FLUSH_INTERVAL = 0.5  # Secondes entre deux écritures groupées de progression
+    JOB_STORE_POLL_INTERVAL = 0.5  # Relecture du stockage partagé pour les flux SSE et les annulations
+    JOB_HEARTBEAT_INTERVAL = 10  # Secondes entre deux signes de vie d'un worker
+    JOB_HEARTBEAT_TIMEOUT = 60  # Sans signe de vie, les tâches du worker sont considérées interrompues
+    
+    # Suivi de progression en temps réel (Server-Sent Events)
+    SSE_MAX_EVENTS_PER_SECOND = 4  # Les mises à jour plus rapprochées sont regroupées
+    SSE_KEEPALIVE_SECONDS = 15  # Commentaire envoyé pour garder la connexion ouverte
+    
+    # Téléchargements YouTube
+    YOUTUBE_PLAYLIST_WORKERS = 3  # Vidéos d'une playlist téléchargées en parallèle
+    YOUTUBE_ENTRY_RETRIES = 2  # Nouvelles tentatives par vidéo de playlist
+    YOUTUBE_CONCURRENT_FRAGMENTS = 4  # Fragments DASH/HLS téléchargés en parallèle
+    MAX_BATCH_URLS = 200  # URLs acceptées par une tâche de téléchargement groupé
+    
+    # Cache des métadonnées YouTube (aperçu et téléchargement)
+    METADATA_CACHE_TTL = 1800  # Les URLs de flux YouTube expirent après quelques heures
+    METADATA_CACHE_MAX_ENTRIES = 256
+    METADATA_CACHE_FOLDER = os.path.join('downloads', 'metadata_cache')  # None = mémoire seule
+    
     # Nettoyage automatique
     AUTO_CLEANUP_ENABLED = True
     MAX_FILE_AGE_HOURS = 24
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+import threading
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Formats déjà compressés : les recompresser ne fait que consommer du CPU
+STORED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif',
+    '.woff', '.woff2',
+    '.mp4', '.webm', '.mkv', '.m4a', '.mp3', '.ogg',
+    '.zip', '.gz', '.bz2', '.xz', '.7z', '.pdf'
+}
+
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+
+# Fichiers en cours d'écriture : partiels reprenables, yt-dlp (.part, .ytdl, fragments), écritures atomiques
+TEMPORARY_SUFFIXES = ('.part', '.tmp', '.temp', '.ytdl')
+TEMPORARY_MARKERS = ('.part-Frag',)
+
+
+def is_temporary_file(name):
+    """Indique si le fichier est interne ou à moitié écrit et ne doit pas être archivé"""
+    return (
+        name.startswith('.')
+        or name.endswith(TEMPORARY_SUFFIXES)
+        or any(marker in name for marker in TEMPORARY_MARKERS)
+    )
+
+
+def list_archive_files(folder):
+    """Liste (chemin, nom dans l'archive) des fichiers à archiver, fichiers internes et temporaires exclus"""
+    entries = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for file in sorted(files):
+            if is_temporary_file(file):
+                continue
+            file_path = os.path.join(root, file)
+            entries.append((file_path, os.path.relpath(file_path, folder)))
+    return entries
+
+
+def folder_signature(folder):
+    """Empreinte du contenu d'un dossier (noms, tailles, dates de modification)"""
+    hash_object = hashlib.sha256()
+    for file_path, arcname in list_archive_files(folder):
+        stat = os.stat(file_path)
+        hash_object.update(f"{arcname}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    return hash_object.hexdigest()
+
+
+def is_archive_fresh(archive_path, signature):
+    """Indique si l'archive en cache correspond encore au dossier"""
+    if not os.path.exists(archive_path):
+        return False
+    try:
+        with zipfile.ZipFile(archive_path) as zipf:
+            return zipf.comment == signature.encode('ascii')
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class _ChunkWriter:
+    """Flux en écriture seule qui accumule les octets produits par zipfile"""
+
+    def __init__(self, cache_file=None):
+        self.chunks = []
+        self.cache_file = cache_file
+
+    def write(self, data):
+        if data:
+            self.chunks.append(bytes(data))
+            if self.cache_file is not None:
+                self.cache_file.write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(folder, signature=None, cache_path=None):
+    """Génère une archive ZIP du dossier par morceaux, au fur et à mesure de la lecture
+
+    Si cache_path est fourni, l'archive produite y est enregistrée (avec la
+    signature du dossier en commentaire) pour être resservie telle quelle.
+    """
+    cache_file = None
+    tmp_path = None
+    if cache_path is not None:
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        cache_file = open(tmp_path, 'wb')
+
+    completed = False
+    try:
+        writer = _ChunkWriter(cache_file)
+        with zipfile.ZipFile(writer, 'w') as zipf:
+            if signature is not None:
+                zipf.comment = signature.encode('ascii')
+
+            for file_path, arcname in list_archive_files(folder):
+                zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+                extension = os.path.splitext(file_path)[1].lower()
+                zinfo.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+                with open(file_path, 'rb') as source, \
+                        zipf.open(zinfo, 'w', force_zip64=zinfo.file_size > zipfile.ZIP64_LIMIT) as dest:
+                    while True:
+                        chunk = source.read(ARCHIVE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        data = writer.drain()
+                        if data:
+                            yield data
+
+                data = writer.drain()
+                if data:
+                    yield data
+
+        # Répertoire central écrit à la fermeture
+        data = writer.drain()
+        if data:
+            yield data
+        completed = True
+    finally:
+        if cache_file is not None:
+            cache_file.close()
+            if completed:
+                os.replace(tmp_path, cache_path)
+            else:
+                # Téléchargement interrompu : ne pas garder une archive partielle
+                os.remove(tmp_path)
@@ -0,0 +1,112 @@
+import threading
+
+
+class _Fetch:
+    """Téléchargement en cours, partagé par les pages qui référencent la même URL"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class AssetCache:
+    """Résolution des ressources d'un crawl : chaque URL distincte est téléchargée une fois
+
+    Conserve pour toute la durée de la tâche :
+    - l'URL -> chemin local (relatif au dossier de la tâche) des ressources obtenues ;
+    - l'empreinte SHA-256 -> chemin local des contenus déjà écrits, pour que deux
+      URLs au contenu identique (ou un style inline répété) partagent un fichier ;
+    - les URLs en échec, trop volumineuses ou non prises en charge (cache négatif).
+
+    Les pages traitées en parallèle qui demandent la même URL attendent le
+    téléchargement en cours au lieu d'en lancer un second.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.resolved = {}  # URL -> chemin local
+        self.failed = set()  # URLs à ne pas redemander pendant la tâche
+        self.digests = {}  # SHA-256 -> chemin local
+        self.pending = {}  # URL -> _Fetch
+        self.journal = []  # Entrées ajoutées depuis le dernier point de reprise
+        self.stats = {'fetched': 0, 'hits': 0, 'negative_hits': 0, 'duplicates': 0}
+
+    def get_or_fetch(self, url, fetch):
+        """Retourne le chemin local de l'URL, en appelant fetch() au plus une fois
+
+        fetch() retourne le chemin local ou None en cas d'échec ; un échec
+        est mémorisé et renvoyé tel quel aux demandes suivantes.
+        """
+        with self.lock:
+            if url in self.resolved:
+                self.stats['hits'] += 1
+                return self.resolved[url]
+            if url in self.failed:
+                self.stats['negative_hits'] += 1
+                return None
+            current = self.pending.get(url)
+            leader = current is None
+            if leader:
+                current = self.pending[url] = _Fetch()
+                self.stats['fetched'] += 1
+            else:
+                self.stats['hits'] += 1
+
+        if not leader:
+            current.done.wait()
+            return current.value
+
+        try:
+            current.value = fetch()
+        finally:
+            with self.lock:
+                if current.value:
+                    self.resolved[url] = current.value
+                    self.journal.append({'type': 'asset', 'url': url, 'path': current.value})
+                else:
+                    self.failed.add(url)
+                self.pending.pop(url, None)
+            current.done.set()
+        return current.value
+
+    def path_for_digest(self, digest):
+        """Chemin local d'un contenu déjà écrit pendant la tâche, ou None"""
+        with self.lock:
+            path = self.digests.get(digest)
+            if path is not None:
+                self.stats['duplicates'] += 1
+            return path
+
+    def add_digest(self, digest, path):
+        """Mémorise le fichier écrit pour un contenu, retourne le chemin retenu
+
+        Si un autre thread a enregistré le même contenu entre-temps, son
+        chemin est conservé et retourné.
+        """
+        with self.lock:
+            if digest not in self.digests:
+                self.digests[digest] = path
+                self.journal.append({'type': 'digest', 'digest': digest, 'path': path})
+            return self.digests[digest]
+
+    @property
+    def requests_saved(self):
+        return self.stats['hits'] + self.stats['negative_hits']
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, requests_saved=self.requests_saved)
+
+    def take_journal(self):
+        """Entrées ajoutées depuis le dernier appel, à écrire dans le journal du crawl
+
+        Les échecs n'y figurent pas : ils seront retentés après une reprise.
+        """
+        with self.lock:
+            records, self.journal = self.journal, []
+            return records
+
+    def restore(self, state):
+        with self.lock:
+            self.resolved.update(state.get('resolved', {}))
+            self.digests.update(state.get('digests', {}))
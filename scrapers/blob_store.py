@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Nom du manifeste écrit dans chaque dossier de tâche
+MANIFEST_NAME = '.blobs.json'
+
+
+class BlobStore:
+    """Stockage de fichiers adressé par contenu (SHA-256), partagé entre les tâches
+
+    Chaque fichier n'est écrit qu'une fois dans objects/ ; les dossiers de
+    tâche y font référence par lien physique (ou copie si le système de
+    fichiers ne le permet pas) et listent leurs blobs dans un manifeste.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_folder = os.path.join(root, 'objects')
+        self.tmp_folder = os.path.join(root, 'tmp')
+        os.makedirs(self.objects_folder, exist_ok=True)
+        os.makedirs(self.tmp_folder, exist_ok=True)
+
+    def blob_path(self, digest):
+        """Chemin du blob correspondant à une empreinte"""
+        return os.path.join(self.objects_folder, digest[:2], digest[2:])
+
+    def has(self, digest):
+        """Indique si le blob existe déjà"""
+        return os.path.exists(self.blob_path(digest))
+
+    def put_bytes(self, data):
+        """Enregistre un contenu et retourne son empreinte SHA-256"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self.has(digest):
+            return digest
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_folder)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return self.put_file(tmp_path, digest)
+
+    def put_file(self, path, digest):
+        """Déplace un fichier déjà haché dans le store et retourne son empreinte"""
+        blob_path = self.blob_path(digest)
+        if os.path.exists(blob_path):
+            os.remove(path)
+            return digest
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.chmod(path, 0o644)
+        os.replace(path, blob_path)
+        return digest
+
+    def link(self, digest, dest_path):
+        """Fait apparaître le blob à dest_path (lien physique, sinon copie)"""
+        blob_path = self.blob_path(digest)
+        tmp_path = f"{dest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+
+    def reference_counts(self, content_folders):
+        """Compte les références à chaque blob dans les manifestes des tâches"""
+        counts = {}
+        for content_folder in content_folders:
+            if not os.path.isdir(content_folder):
+                continue
+            for task_folder in os.listdir(content_folder):
+                for digest in read_manifest(os.path.join(content_folder, task_folder)).values():
+                    counts[digest] = counts.get(digest, 0) + 1
+        return counts
+
+    def collect_garbage(self, content_folders, min_age_seconds=3600, partial_max_age_seconds=24 * 3600):
+        """Supprime les blobs qui ne sont plus référencés par aucune tâche
+
+        Les blobs récents ou encore liés dans un dossier de tâche sont
+        conservés : une tâche en cours n'a pas encore écrit son manifeste.
+        Les fichiers temporaires (dont les partiels reprenables) sont
+        supprimés au-delà de partial_max_age_seconds.
+        """
+        self.remove_stale_tmp_files(partial_max_age_seconds)
+
+        counts = self.reference_counts(content_folders)
+        cutoff = time.time() - min_age_seconds
+        removed = 0
+
+        for prefix in os.listdir(self.objects_folder):
+            prefix_folder = os.path.join(self.objects_folder, prefix)
+            if not os.path.isdir(prefix_folder):
+                continue
+            for name in os.listdir(prefix_folder):
+                digest = prefix + name
+                blob_path = os.path.join(prefix_folder, name)
+                stat = os.stat(blob_path)
+                if counts.get(digest, 0) > 0 or stat.st_mtime > cutoff or stat.st_nlink > 1:
+                    continue
+                try:
+                    os.remove(blob_path)
+                    removed += 1
+                except OSError as e:
+                    logger.error(f"Erreur lors de la suppression du blob {digest}: {e}")
+
+        if removed:
+            logger.info(f"{removed} blob(s) non référencé(s) supprimé(s)")
+        return removed
+
+    def remove_stale_tmp_files(self, max_age_seconds):
+        """Supprime les téléchargements interrompus trop anciens pour être repris"""
+        cutoff = time.time() - max_age_seconds
+        for name in os.listdir(self.tmp_folder):
+            path = os.path.join(self.tmp_folder, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def read_manifest(task_folder):
+    """Lit le manifeste des blobs d'une tâche ({chemin relatif: empreinte})"""
+    manifest_path = os.path.join(task_folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Manifeste illisible {manifest_path}: {e}")
+        return {}
+
+
+def write_manifest(task_folder, manifest):
+    """Écrit atomiquement le manifeste des blobs d'une tâche"""
+    manifest_path = os.path.join(task_folder, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
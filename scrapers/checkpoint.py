@@ -0,0 +1,104 @@
+import gzip
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Point de reprise écrit dans chaque dossier de tâche web (ignoré par les archives)
+CHECKPOINT_NAME = '.crawl_checkpoint.json.gz'
+CHECKPOINT_VERSION = 2
+
+# Journal des événements du crawl (URLs découvertes, pages, fichiers), une ligne JSON par événement.
+# Le point de reprise ne contient que les compteurs et la taille du journal qu'ils couvrent.
+JOURNAL_NAME = '.crawl_journal.jsonl'
+
+
+def checkpoint_path(task_folder, name=CHECKPOINT_NAME):
+    return os.path.join(task_folder, name)
+
+
+def has_checkpoint(task_folder, name=CHECKPOINT_NAME):
+    """Indique si un point de reprise existe pour la tâche"""
+    return os.path.exists(checkpoint_path(task_folder, name))
+
+
+def write_checkpoint(task_folder, state, name=CHECKPOINT_NAME):
+    """Écrit atomiquement l'état du crawl, compressé"""
+    path = checkpoint_path(task_folder, name)
+    tmp_path = f"{path}.tmp"
+    state = dict(state, version=CHECKPOINT_VERSION)
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(task_folder, name=CHECKPOINT_NAME):
+    """Lit l'état du crawl sauvegardé, ou None s'il est absent ou illisible"""
+    path = checkpoint_path(task_folder, name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError, EOFError) as e:
+        logger.error(f"Point de reprise illisible {path}: {e}")
+        return None
+    if state.get('version') != CHECKPOINT_VERSION:
+        logger.warning(f"Version de point de reprise non prise en charge: {path}")
+        return None
+    return state
+
+
+def journal_path(task_folder, name=JOURNAL_NAME):
+    return os.path.join(task_folder, name)
+
+
+def append_journal(task_folder, records, name=JOURNAL_NAME, size=None):
+    """Ajoute des événements à la fin du journal, retourne sa nouvelle taille en octets
+
+    size est la taille du journal après le dernier ajout réussi : une
+    écriture interrompue depuis est d'abord effacée.
+    """
+    data = ''.join(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n' for record in records)
+    with open(journal_path(task_folder, name), 'ab') as f:
+        if size is not None and f.seek(0, os.SEEK_END) > size:
+            f.truncate(size)
+            f.seek(size)
+        f.write(data.encode('utf-8'))
+        return f.tell()
+
+
+def read_journal(task_folder, size=None, name=JOURNAL_NAME):
+    """Parcourt les événements du journal, limités aux size premiers octets
+
+    size est la taille notée dans le point de reprise : les événements
+    écrits après lui (sauvegarde interrompue) sont ignorés.
+    """
+    path = journal_path(task_folder, name)
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        position = 0
+        for line in f:
+            position += len(line)
+            if size is not None and position > size:
+                return
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.error(f"Journal de crawl illisible {path} à l'octet {position - len(line)}")
+                return
+
+
+def truncate_journal(task_folder, size, name=JOURNAL_NAME):
+    """Ramène le journal à la taille couverte par le point de reprise"""
+    path = journal_path(task_folder, name)
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
+
+
+def remove_journal(task_folder, name=JOURNAL_NAME):
+    path = journal_path(task_folder, name)
+    if os.path.exists(path):
+        os.remove(path)
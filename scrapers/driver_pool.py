@@ -0,0 +1,169 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def create_chrome_driver():
+    """Lance un navigateur Chrome headless configuré pour le scraping"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--ignore-ssl-errors")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+
+    try:
+        from chromedriver_py import binary_path
+        service = Service(binary_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    except ImportError:
+        # Fallback si chromedriver_py n'est pas disponible
+        driver = webdriver.Chrome(options=chrome_options)
+
+    driver.set_page_load_timeout(30)
+    return driver
+
+
+def is_driver_alive(driver):
+    """Vérifie que le processus Chrome répond toujours"""
+    try:
+        driver.window_handles
+        return True
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """Pool de navigateurs Chrome partagé entre les tâches de scraping
+
+    Les drivers sont prêtés avec acquire() et rendus avec release(). Un driver
+    rendu est réinitialisé (cookies, stockage, onglets) avant d'être réutilisé,
+    et remplacé après max_pages_per_driver pages ou en cas de plantage.
+    """
+
+    def __init__(self, size=2, max_pages_per_driver=100, driver_factory=create_chrome_driver):
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.driver_factory = driver_factory
+        self.idle = []
+        self.page_counts = {}
+        self.created = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Prête un driver, en attendant qu'un emplacement se libère si besoin"""
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Le pool de drivers est fermé")
+                if self.idle:
+                    return self.idle.pop()
+                if self.created < self.size:
+                    self.created += 1
+                    break
+                if not self.condition.wait(timeout):
+                    raise TimeoutError("Aucun driver Chrome disponible")
+
+        # Le lancement de Chrome se fait hors du verrou
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self.condition:
+                self.created -= 1
+                self.condition.notify()
+            raise
+
+        self.page_counts[id(driver)] = 0
+        logger.info(f"Nouveau driver Chrome lancé ({self.created}/{self.size})")
+        return driver
+
+    def release(self, driver, pages=0, broken=False):
+        """Rend un driver au pool après usage"""
+        if driver is None:
+            return
+
+        count = self.page_counts.get(id(driver), 0) + pages
+        self.page_counts[id(driver)] = count
+
+        recycle = broken or self.closed or count >= self.max_pages_per_driver
+        if not recycle:
+            try:
+                self.reset_driver(driver)
+            except Exception as e:
+                logger.warning(f"Réinitialisation du driver impossible, recyclage: {e}")
+                recycle = True
+
+        if recycle:
+            self.destroy_driver(driver)
+            return
+
+        with self.condition:
+            self.idle.append(driver)
+            self.condition.notify()
+
+    def reset_driver(self, driver):
+        """Efface l'état laissé par la tâche précédente"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        try:
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': '*', 'storageTypes': 'all'})
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        except Exception:
+            # Fallback sans CDP : stockage de l'origine courante uniquement
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    def destroy_driver(self, driver):
+        """Ferme un driver et libère son emplacement"""
+        self.page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Erreur lors de la fermeture du driver: {e}")
+
+        with self.condition:
+            self.created -= 1
+            self.condition.notify()
+
+    def needs_recycle(self, driver, pages=0):
+        """Indique si le driver a atteint max_pages_per_driver avec pages chargées en plus"""
+        return self.page_counts.get(id(driver), 0) + pages >= self.max_pages_per_driver
+
+    def shutdown(self):
+        """Ferme tous les drivers inactifs et refuse les nouveaux prêts"""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.condition.notify_all()
+
+        for driver in idle:
+            self.destroy_driver(driver)
+        logger.info("Pool de drivers Chrome arrêté")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool(size=2, max_pages_per_driver=100):
+    """Retourne le pool de drivers partagé par le processus, créé au premier appel"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(size=size, max_pages_per_driver=max_pages_per_driver)
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,78 @@
+import heapq
+import itertools
+import threading
+from .seen_set import HashSeenSet
+
+
+class CrawlFrontier:
+    """File d'attente des pages à visiter, dédupliquée et ordonnée par priorité
+
+    Par défaut la priorité d'une page est sa profondeur : les pages proches de
+    la page de départ sont visitées en premier (parcours en largeur).
+    Les URLs déjà vues sont mémorisées dans un ensemble compact (empreintes
+    ou filtre de Bloom, voir seen_set) : elles doivent être canonisées avant
+    d'être ajoutées.
+    """
+
+    def __init__(self, max_depth=None, prioritize_shallow=True, seen=None):
+        self.max_depth = max_depth
+        self.prioritize_shallow = prioritize_shallow
+        self.heap = []
+        self.seen = seen if seen is not None else HashSeenSet()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def add(self, url, depth=0, priority=None):
+        """Ajoute une URL si elle n'a jamais été vue, retourne True si ajoutée"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        with self.lock:
+            if not self.seen.add(url):
+                return False
+
+            if priority is None:
+                priority = depth if self.prioritize_shallow else 0
+            heapq.heappush(self.heap, (priority, next(self.counter), url, depth))
+            return True
+
+    def pop(self):
+        """Retire la prochaine URL à visiter, retourne (url, profondeur) ou None"""
+        with self.lock:
+            if not self.heap:
+                return None
+            _, _, url, depth = heapq.heappop(self.heap)
+            return url, depth
+
+    def mark_done(self, url):
+        """Signale la fin du traitement d'une URL (utile aux frontières partagées)"""
+
+    def close(self):
+        """Libère les ressources de la frontière (aucune pour la version en mémoire)"""
+
+    def has_seen(self, url):
+        """Indique si l'URL a déjà été ajoutée à la frontière"""
+        with self.lock:
+            return url in self.seen
+
+    def pending_count(self):
+        """Retourne le nombre d'URLs en attente"""
+        with self.lock:
+            return len(self.heap)
+
+    def __len__(self):
+        return self.pending_count()
+
+    def restore(self, pending, seen=()):
+        """Recharge la frontière lors d'une reprise
+
+        seen contient les URLs déjà traitées et pending les (url, profondeur)
+        à remettre en attente, dont les pages en cours lors de la sauvegarde.
+        """
+        with self.lock:
+            for url in seen:
+                self.seen.add(url)
+            for url, depth in pending:
+                self.seen.add(url)
+                priority = depth if self.prioritize_shallow else 0
+                heapq.heappush(self.heap, (priority, next(self.counter), url, depth))
@@ -0,0 +1,142 @@
+from bs4 import BeautifulSoup, CData, NavigableString, Tag, UnicodeDammit
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_BACKEND = 'lxml'
+except ImportError:
+    DEFAULT_BACKEND = 'html.parser'
+
+# Backends acceptés par l'option de configuration
+PARSER_BACKENDS = ['auto', 'lxml', 'html.parser']
+
+FONT_EXTENSIONS = ('.woff', '.woff2', '.ttf', '.otf', '.eot')
+
+# Éléments dont le contenu n'est pas affiché par le navigateur
+HIDDEN_TEXT_TAGS = ('script', 'style', 'noscript', 'template')
+
+
+def resolve_backend(backend='auto'):
+    """Backend BeautifulSoup effectif : lxml si disponible, sinon html.parser"""
+    if backend in (None, 'auto'):
+        return DEFAULT_BACKEND
+    if backend == 'lxml' and DEFAULT_BACKEND != 'lxml':
+        logger.warning("lxml n'est pas installé, utilisation de html.parser")
+        return 'html.parser'
+    return backend
+
+
+def detect_html_encoding(data):
+    """Encodage d'une page servie sans charset : BOM, <meta charset>, sinon déduit du contenu"""
+    return UnicodeDammit(data, is_html=True).original_encoding or 'utf-8'
+
+
+def parse_html(html, backend='auto'):
+    """Analyse une page HTML avec le backend choisi"""
+    return BeautifulSoup(html, resolve_backend(backend))
+
+
+def visible_text(tag, separator=" "):
+    """Texte affiché d'un élément, sans scripts, styles, noscript ni templates
+
+    Contrairement à decompose() suivi de get_text(), l'arbre n'est pas
+    modifié : la même analyse sert ensuite à l'enregistrement de la page.
+    """
+    strings = []
+    stack = list(reversed(tag.contents))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag):
+            if node.name not in HIDDEN_TEXT_TAGS:
+                stack.extend(reversed(node.contents))
+        elif type(node) in (NavigableString, CData):
+            text = node.strip()
+            if text:
+                strings.append(text)
+    return separator.join(strings)
+
+
+class Reference:
+    """Référence réécrivable trouvée dans une page
+
+    kind vaut 'css', 'font', 'js', 'image', 'srcset', 'anchor',
+    'inline_style' ou 'inline_script' ; value est la valeur brute de
+    l'attribut (ou le contenu pour les éléments inline).
+    """
+
+    __slots__ = ('tag', 'attribute', 'value', 'kind')
+
+    def __init__(self, tag, attribute, value, kind):
+        self.tag = tag
+        self.attribute = attribute
+        self.value = value
+        self.kind = kind
+
+
+class PageReferences:
+    """Liste de travail typée des références d'une page, collectée en un seul parcours"""
+
+    def __init__(self):
+        self.inline_styles = []
+        self.inline_scripts = []
+        self.resources = []  # css, font, js, image
+        self.srcsets = []
+        self.anchors = []
+        self.base_href = None  # Premier <base href> de la page, base des URLs relatives
+
+    def __len__(self):
+        return (len(self.inline_styles) + len(self.inline_scripts) + len(self.resources)
+                + len(self.srcsets) + len(self.anchors))
+
+
+def collect_references(soup):
+    """Parcourt l'arbre une seule fois et classe toutes les références réécrivables"""
+    references = PageReferences()
+    for tag in soup.find_all(True):
+        name = tag.name
+        if name == 'a':
+            href = tag.get('href')
+            if href:
+                references.anchors.append(Reference(tag, 'href', href, 'anchor'))
+        elif name == 'base':
+            if references.base_href is None and tag.get('href'):
+                references.base_href = tag['href']
+        elif name in ('img', 'source'):
+            if tag.get('src'):
+                references.resources.append(Reference(tag, 'src', tag['src'], 'image'))
+            if tag.get('srcset'):
+                references.srcsets.append(Reference(tag, 'srcset', tag['srcset'], 'srcset'))
+        elif name == 'link':
+            href = tag.get('href')
+            if not href:
+                continue
+            if href.endswith('.css') or tag.get('rel') == ['stylesheet']:
+                references.resources.append(Reference(tag, 'href', href, 'css'))
+            elif any(extension in href for extension in FONT_EXTENSIONS):
+                references.resources.append(Reference(tag, 'href', href, 'font'))
+        elif name == 'script':
+            if tag.get('src'):
+                references.resources.append(Reference(tag, 'src', tag['src'], 'js'))
+            elif tag.string:
+                references.inline_scripts.append(Reference(tag, None, tag.string, 'inline_script'))
+        elif name == 'style':
+            if tag.string:
+                references.inline_styles.append(Reference(tag, None, tag.string, 'inline_style'))
+    return references
+
+
+def parse_srcset(value):
+    """Découpe un attribut srcset en liste de (url, descripteur)"""
+    candidates = []
+    for candidate in value.split(','):
+        parts = candidate.strip().split()
+        if parts:
+            candidates.append((parts[0], ' '.join(parts[1:])))
+    return candidates
+
+
+def build_srcset(candidates):
+    """Reconstruit un attribut srcset à partir de (url, descripteur)"""
+    return ', '.join(f"{url} {descriptor}".strip() for url, descriptor in candidates)
@@ -0,0 +1,292 @@
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import requests
+
+logger = logging.getLogger(__name__)
+
+# En-têtes propres à une connexion, jamais conservés dans le cache
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'content-encoding', 'content-length'
+}
+
+# En-têtes mis à jour par une réponse 304
+REVALIDATION_HEADERS = ['cache-control', 'expires', 'etag', 'last-modified', 'date']
+
+
+def parse_cache_control(value):
+    """Découpe un en-tête Cache-Control en dictionnaire de directives"""
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, argument = part.partition('=')
+        directives[name.strip()] = argument.strip().strip('"') or True
+    return directives
+
+
+def freshness_lifetime(headers):
+    """Durée de fraîcheur explicite d'une réponse en secondes (0 si inconnue)"""
+    directives = parse_cache_control(headers.get('cache-control'))
+    if 'no-cache' in directives or 'no-store' in directives:
+        return 0
+    if 'max-age' in directives:
+        try:
+            return max(int(directives['max-age']), 0)
+        except ValueError:
+            return 0
+    if headers.get('expires'):
+        try:
+            expires = parsedate_to_datetime(headers['expires']).timestamp()
+            return max(expires - time.time(), 0)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+class HttpCache:
+    """Cache HTTP persistant sur disque avec validateurs et éviction LRU
+
+    Chaque entrée est stockée dans deux fichiers : <clé>.json (métadonnées)
+    et <clé>.body (contenu). La date de modification des métadonnées sert
+    d'horodatage de dernier accès pour reconstruire l'ordre LRU au démarrage.
+    """
+
+    def __init__(self, folder, max_size=500 * 1024 * 1024):
+        self.folder = folder
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.index = OrderedDict()  # clé -> taille du contenu
+        self.total_size = 0
+        os.makedirs(folder, exist_ok=True)
+        self.load_index()
+
+    def load_index(self):
+        """Reconstruit l'index LRU à partir des fichiers présents"""
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            body_path = self.body_path(key)
+            if not os.path.exists(body_path):
+                continue
+            entries.append((os.path.getmtime(self.meta_path(key)), key, os.path.getsize(body_path)))
+
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total_size += size
+
+    def key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def meta_path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def body_path(self, key):
+        return os.path.join(self.folder, f"{key}.body")
+
+    def lookup(self, url):
+        """Retourne les métadonnées de l'entrée pour l'URL, ou None"""
+        key = self.key(url)
+        with self.lock:
+            if key not in self.index:
+                return None
+            self.index.move_to_end(key)
+        try:
+            with open(self.meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            os.utime(self.meta_path(key))
+            return meta
+        except (OSError, ValueError):
+            self.remove(key)
+            return None
+
+    def is_fresh(self, meta):
+        """Indique si l'entrée peut être servie sans contacter le serveur"""
+        return time.time() < meta['stored_at'] + meta.get('max_age', 0)
+
+    def is_cacheable(self, response):
+        """Indique si une réponse peut être conservée"""
+        if response.status_code != 200:
+            return False
+        directives = parse_cache_control(response.headers.get('cache-control'))
+        if 'no-store' in directives or response.headers.get('vary', '').strip() == '*':
+            return False
+        return bool(
+            response.headers.get('etag')
+            or response.headers.get('last-modified')
+            or freshness_lifetime(response.headers) > 0
+        )
+
+    def store(self, url, response, body=None, body_path=None):
+        """Enregistre une réponse complète, avec son contenu en mémoire ou dans un fichier"""
+        size = len(body) if body_path is None else os.path.getsize(body_path)
+        if not self.is_cacheable(response) or size > self.max_size:
+            return False
+
+        key = self.key(url)
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in HOP_BY_HOP_HEADERS
+            },
+            'stored_at': time.time(),
+            'max_age': freshness_lifetime(response.headers),
+        }
+
+        body_tmp = f"{self.body_path(key)}.{threading.get_ident()}.tmp"
+        if body_path is None:
+            with open(body_tmp, 'wb') as f:
+                f.write(body)
+        else:
+            try:
+                os.link(body_path, body_tmp)
+            except OSError:
+                shutil.copyfile(body_path, body_tmp)
+        os.replace(body_tmp, self.body_path(key))
+        self.write_meta(key, meta)
+
+        with self.lock:
+            self.total_size += size - self.index.pop(key, 0)
+            self.index[key] = size
+        self.evict()
+        return True
+
+    def refresh(self, url, meta, headers):
+        """Met à jour une entrée revalidée par une réponse 304"""
+        for name in REVALIDATION_HEADERS:
+            if name in headers:
+                meta['headers'][name] = headers[name]
+        merged = CaseInsensitiveDict(meta['headers'])
+        meta['stored_at'] = time.time()
+        meta['max_age'] = freshness_lifetime(merged)
+        self.write_meta(self.key(url), meta)
+
+    def write_meta(self, key, meta):
+        meta_tmp = f"{self.meta_path(key)}.{threading.get_ident()}.tmp"
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, self.meta_path(key))
+
+    def read_body(self, meta):
+        with open(self.body_path(self.key(meta['url'])), 'rb') as f:
+            return f.read()
+
+    def build_response(self, meta, request=None):
+        """Reconstruit une réponse requests à partir d'une entrée du cache"""
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = 'OK'
+        response.url = meta['url']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.read_body(meta)
+        response._content_consumed = True
+        response.headers['content-length'] = str(len(response._content))
+        response.request = request
+        response.from_cache = True
+        return response
+
+    def remove(self, key):
+        with self.lock:
+            self.total_size -= self.index.pop(key, 0)
+        for path in (self.meta_path(key), self.body_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale"""
+        while True:
+            with self.lock:
+                if self.total_size <= self.max_size or not self.index:
+                    return
+                key = next(iter(self.index))
+            self.remove(key)
+
+
+class CachingSession(requests.Session):
+    """Session requests qui passe les requêtes GET par le cache HTTP"""
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self.stats_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'revalidations': 0}
+
+    def count(self, name):
+        with self.stats_lock:
+            self.cache_stats[name] += 1
+
+    def is_fresh(self, url):
+        """Indique si l'URL peut être servie par le cache sans requête réseau"""
+        meta = self.cache.lookup(url)
+        return meta is not None and self.cache.is_fresh(meta)
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != 'GET':
+            return super().request(method, url, *args, **kwargs)
+
+        meta = self.cache.lookup(url)
+        if meta is not None and self.cache.is_fresh(meta):
+            self.count('hits')
+            return self.cache.build_response(meta)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if meta is not None:
+            stored_headers = CaseInsensitiveDict(meta['headers'])
+            if stored_headers.get('etag'):
+                headers['If-None-Match'] = stored_headers['etag']
+            if stored_headers.get('last-modified'):
+                headers['If-Modified-Since'] = stored_headers['last-modified']
+
+        response = super().request(method, url, *args, headers=headers, **kwargs)
+
+        if meta is not None and response.status_code == 304:
+            self.count('revalidations')
+            self.cache.refresh(url, meta, response.headers)
+            response.close()
+            return self.cache.build_response(meta, response.request)
+
+        self.count('misses')
+        if not kwargs.get('stream'):
+            self.store_response(url, response)
+        return response
+
+    def store_response(self, url, response, body=None, body_path=None):
+        """Enregistre une réponse dans le cache (contenu déjà lu si body et body_path sont None)"""
+        if getattr(response, 'from_cache', False):
+            return
+        if body is None and body_path is None:
+            body = response.content
+        try:
+            self.cache.store(url, response, body, body_path)
+        except OSError as e:
+            logger.warning(f"Impossible de mettre en cache {url}: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache(folder, max_size):
+    """Retourne le cache HTTP partagé par le processus, créé au premier appel"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(folder, max_size)
+        return _cache
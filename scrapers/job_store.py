@@ -0,0 +1,301 @@
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# États après lesquels une tâche n'évolue plus
+FINISHED_STATES = ('completed', 'error', 'cancelled')
+
+
+class MemoryJobStore:
+    """Stockage des tâches en mémoire, propre au processus (un seul worker)
+
+    Les tâches sont indexées par état et par type pour éviter de parcourir
+    tout l'historique. Seules les max_finished dernières tâches terminées
+    sont conservées ; les fichiers produits restent sur disque.
+    """
+
+    shared = False  # Visible uniquement par le processus courant
+
+    def __init__(self, max_finished=500):
+        self.max_finished = max_finished
+        self.lock = threading.RLock()
+        self.tasks = {}
+        self.versions = {}  # identifiant -> compteur de modifications
+        self.by_status = {}  # état -> OrderedDict des identifiants
+        self.by_type = {}  # type -> ensemble des identifiants
+        self.workers = {}  # propriétaire -> dernier signe de vie
+
+    def create(self, task_id, task):
+        """Enregistre une nouvelle tâche, KeyError si l'identifiant existe déjà"""
+        with self.lock:
+            if task_id in self.tasks:
+                raise KeyError(f"Tâche déjà existante: {task_id}")
+            self.tasks[task_id] = dict(task)
+            self.versions[task_id] = 1
+            self.by_type.setdefault(task['type'], set()).add(task_id)
+            self.by_status.setdefault(task['status'], OrderedDict())[task_id] = None
+            self.evict()
+            return 1, dict(task)
+
+    def get(self, task_id):
+        """Retourne (version, copie de la tâche) ou (0, None)"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return 0, None
+            return self.versions[task_id], dict(task)
+
+    def update(self, task_id, fields):
+        """Met à jour atomiquement les champs d'une tâche, retourne (version, tâche)"""
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return 0, None
+
+            old_status = task.get('status')
+            task.update(fields)
+            self.versions[task_id] += 1
+            new_status = task.get('status')
+            if new_status != old_status:
+                self.by_status.get(old_status, {}).pop(task_id, None)
+                self.by_status.setdefault(new_status, OrderedDict())[task_id] = None
+                if new_status in FINISHED_STATES:
+                    self.evict()
+            return self.get(task_id)
+
+    def update_many(self, updates):
+        """Applique plusieurs mises à jour {identifiant: champs}"""
+        for task_id, fields in updates.items():
+            self.update(task_id, fields)
+
+    def remove(self, task_id):
+        with self.lock:
+            task = self.tasks.pop(task_id, None)
+            if task is None:
+                return False
+            self.by_status.get(task.get('status'), {}).pop(task_id, None)
+            self.by_type.get(task.get('type'), set()).discard(task_id)
+            self.versions.pop(task_id, None)
+            return True
+
+    def list(self, status=None, task_type=None):
+        """Liste (identifiant, tâche) filtrée par état et/ou type"""
+        with self.lock:
+            if status is not None:
+                candidates = self.by_status.get(status, {}).keys()
+                if task_type is not None:
+                    type_ids = self.by_type.get(task_type, set())
+                    candidates = [task_id for task_id in candidates if task_id in type_ids]
+            elif task_type is not None:
+                candidates = self.by_type.get(task_type, set())
+            else:
+                candidates = self.tasks.keys()
+            return [(task_id, dict(self.tasks[task_id])) for task_id in candidates]
+
+    def count(self, status):
+        with self.lock:
+            return len(self.by_status.get(status, {}))
+
+    def heartbeat(self, owner, now):
+        """Enregistre un signe de vie du processus propriétaire de tâches"""
+        with self.lock:
+            self.workers[owner] = now
+
+    def live_owners(self, since):
+        """Propriétaires ayant donné signe de vie depuis since"""
+        with self.lock:
+            return {owner for owner, seen in self.workers.items() if seen >= since}
+
+    def evict(self):
+        """Oublie les tâches terminées les plus anciennes au-delà de la limite"""
+        finished = sum(len(self.by_status.get(status, {})) for status in FINISHED_STATES)
+        while finished > self.max_finished:
+            # La plus ancienne tâche terminée, tous états finaux confondus
+            oldest = None
+            for status in FINISHED_STATES:
+                ids = self.by_status.get(status)
+                if ids:
+                    task_id = next(iter(ids))
+                    finished_at = self.tasks[task_id].get('completed_at', '')
+                    if oldest is None or finished_at < oldest[1]:
+                        oldest = (task_id, finished_at)
+            self.remove(oldest[0])
+            finished -= 1
+
+    def close(self):
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    task_id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    status_since REAL NOT NULL,
+    completed_at TEXT,
+    version INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, status_since);
+CREATE INDEX IF NOT EXISTS jobs_type_status ON jobs (type, status, status_since);
+CREATE TABLE IF NOT EXISTS workers (
+    owner TEXT PRIMARY KEY,
+    seen REAL NOT NULL
+);
+"""
+
+
+class SQLiteJobStore:
+    """Stockage des tâches dans SQLite (mode WAL), partagé par les workers gunicorn
+
+    Chaque tâche est une ligne : état, type et date de fin sont des colonnes
+    indexées pour les listes (/results), le reste est sérialisé en JSON.
+    Les mises à jour lisent et réécrivent la ligne dans une transaction
+    BEGIN IMMEDIATE : deux processus ne peuvent pas perdre leurs champs
+    respectifs. Chaque thread utilise sa propre connexion.
+    """
+
+    shared = True  # Visible par tous les processus qui ouvrent la base
+
+    def __init__(self, path, max_finished=500):
+        self.path = path
+        self.max_finished = max_finished
+        self.local = threading.local()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    @staticmethod
+    def dumps(task):
+        return json.dumps(task, default=str, ensure_ascii=False)
+
+    def create(self, task_id, task):
+        connection = self.connection()
+        try:
+            connection.execute(
+                'INSERT INTO jobs (task_id, type, status, status_since, completed_at, version, data) '
+                'VALUES (?, ?, ?, ?, ?, 1, ?)',
+                (task_id, task['type'], task['status'], time.time(), task.get('completed_at'), self.dumps(task))
+            )
+        except sqlite3.IntegrityError:
+            raise KeyError(f"Tâche déjà existante: {task_id}")
+        return 1, json.loads(self.dumps(task))
+
+    def get(self, task_id):
+        row = self.connection().execute('SELECT version, data FROM jobs WHERE task_id = ?', (task_id,)).fetchone()
+        if row is None:
+            return 0, None
+        return row[0], json.loads(row[1])
+
+    def apply(self, connection, task_id, fields):
+        """Fusionne les champs dans la ligne de la tâche (transaction ouverte)"""
+        row = connection.execute('SELECT version, status, data FROM jobs WHERE task_id = ?', (task_id,)).fetchone()
+        if row is None:
+            return 0, None, False
+        version, old_status, data = row
+        task = json.loads(data)
+        task.update(fields)
+        version += 1
+        status = task.get('status')
+        changed = status != old_status
+        connection.execute(
+            'UPDATE jobs SET status = ?, status_since = CASE WHEN status = ? THEN status_since ELSE ? END, '
+            'completed_at = ?, version = ?, data = ? WHERE task_id = ?',
+            (status, status, time.time(), task.get('completed_at'), version, self.dumps(task), task_id)
+        )
+        return version, task, changed and status in FINISHED_STATES
+
+    def update(self, task_id, fields):
+        """Met à jour atomiquement les champs d'une tâche, retourne (version, tâche)"""
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            version, task, finished = self.apply(connection, task_id, fields)
+            if finished:
+                self.evict(connection)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return version, task
+
+    def update_many(self, updates):
+        """Applique plusieurs mises à jour {identifiant: champs} en une transaction"""
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for task_id, fields in updates.items():
+                self.apply(connection, task_id, fields)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def remove(self, task_id):
+        cursor = self.connection().execute('DELETE FROM jobs WHERE task_id = ?', (task_id,))
+        return cursor.rowcount > 0
+
+    def list(self, status=None, task_type=None):
+        """Liste (identifiant, tâche) filtrée par état et/ou type, par date d'entrée dans l'état"""
+        conditions = []
+        params = []
+        if task_type is not None:
+            conditions.append('type = ?')
+            params.append(task_type)
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.connection().execute(
+            f'SELECT task_id, data FROM jobs {where} ORDER BY status_since', params
+        ).fetchall()
+        return [(task_id, json.loads(data)) for task_id, data in rows]
+
+    def count(self, status):
+        return self.connection().execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (status,)).fetchone()[0]
+
+    def heartbeat(self, owner, now):
+        """Enregistre un signe de vie du processus propriétaire de tâches"""
+        self.connection().execute('INSERT OR REPLACE INTO workers (owner, seen) VALUES (?, ?)', (owner, now))
+
+    def live_owners(self, since):
+        """Propriétaires ayant donné signe de vie depuis since ; les autres sont oubliés"""
+        connection = self.connection()
+        connection.execute('DELETE FROM workers WHERE seen < ?', (since,))
+        return {row[0] for row in connection.execute('SELECT owner FROM workers WHERE seen >= ?', (since,))}
+
+    def evict(self, connection):
+        """Supprime les tâches terminées les plus anciennes au-delà de la limite (transaction ouverte)"""
+        placeholders = ', '.join('?' for _ in FINISHED_STATES)
+        connection.execute(
+            f'DELETE FROM jobs WHERE task_id IN ('
+            f'SELECT task_id FROM jobs WHERE status IN ({placeholders}) '
+            f'ORDER BY completed_at DESC LIMIT -1 OFFSET ?)',
+            (*FINISHED_STATES, self.max_finished)
+        )
+
+    def close(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+def create_job_store(kind='memory', path=None, max_finished=500):
+    """Crée le stockage de tâches configuré ('memory' ou 'sqlite')"""
+    if kind == 'sqlite':
+        return SQLiteJobStore(path, max_finished)
+    return MemoryJobStore(max_finished)
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _Extraction:
+    """Extraction en cours, partagée par les appels concurrents sur la même clé"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MetadataCache:
+    """Cache des métadonnées yt-dlp avec durée de vie et éviction LRU
+
+    Les entrées sont indexées par identifiant de vidéo (ou par URL pour les
+    playlists). Les appels concurrents pour une même clé ne déclenchent
+    qu'une seule extraction. Si un dossier est fourni, chaque entrée y est
+    aussi écrite en JSON pour survivre à un redémarrage.
+    """
+
+    def __init__(self, ttl=1800, max_entries=256, folder=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # clé -> (horodatage, info)
+        self.pending = {}  # clé -> _Extraction
+        self.stats = {'hits': 0, 'misses': 0}
+
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+            self.load()
+
+    def file_path(self, key):
+        return os.path.join(self.folder, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+    def load(self):
+        """Recharge les entrées encore valides depuis le disque"""
+        loaded = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if self.is_expired(data['stored_at']):
+                self.remove_file(path)
+                continue
+            loaded.append((data['stored_at'], data['key'], data['info']))
+
+        for stored_at, key, info in sorted(loaded, key=lambda entry: entry[0]):
+            self.entries[key] = (stored_at, info)
+        self.evict()
+
+    def is_expired(self, stored_at):
+        return time.time() >= stored_at + self.ttl
+
+    def get(self, key):
+        """Retourne une copie de l'entrée si elle est encore valide, sinon None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if self.is_expired(entry[0]):
+                self.discard(key)
+                return None
+            self.entries.move_to_end(key)
+            # Copie : yt-dlp modifie le dictionnaire pendant le traitement
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, info):
+        """Enregistre les métadonnées d'une clé"""
+        stored_at = time.time()
+        with self.lock:
+            self.entries[key] = (stored_at, copy.deepcopy(info))
+            self.entries.move_to_end(key)
+            self.evict()
+
+        if self.folder:
+            path = self.file_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'stored_at': stored_at, 'info': info}, f, default=str)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Impossible d'enregistrer les métadonnées de {key}: {e}")
+                self.remove_file(tmp_path)
+
+    def get_or_extract(self, key, extract):
+        """Retourne les métadonnées en cache ou les obtient via extract()
+
+        Un seul appel à extract() est effectué par clé, même si plusieurs
+        threads demandent la même vidéo en même temps.
+        """
+        info = self.get(key)
+        if info is not None:
+            with self.lock:
+                self.stats['hits'] += 1
+            return info
+
+        with self.lock:
+            extraction = self.pending.get(key)
+            leader = extraction is None
+            if leader:
+                extraction = self.pending[key] = _Extraction()
+                self.stats['misses'] += 1
+            else:
+                self.stats['hits'] += 1
+
+        if not leader:
+            extraction.done.wait()
+            if extraction.error is not None:
+                raise extraction.error
+            return copy.deepcopy(extraction.value)
+
+        try:
+            extraction.value = extract()
+            if extraction.value is not None:
+                self.put(key, extraction.value)
+            return copy.deepcopy(extraction.value)
+        except Exception as e:
+            extraction.error = e
+            raise
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+            extraction.done.set()
+
+    def discard(self, key):
+        """Oublie une entrée (à appeler avec le verrou)"""
+        self.entries.pop(key, None)
+        if self.folder:
+            self.remove_file(self.file_path(key))
+
+    def remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la limite"""
+        while len(self.entries) > self.max_entries:
+            self.discard(next(iter(self.entries)))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_metadata_cache(ttl, max_entries, folder=None):
+    """Retourne le cache de métadonnées partagé par le processus, créé au premier appel"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetadataCache(ttl, max_entries, folder)
+        return _cache
@@ -0,0 +1,163 @@
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Réponses indiquant que le serveur demande de ralentir
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Débit appliqué à un hôte sans limite après un premier refus
+PENALTY_START_RATE = 1.0
+# Au-delà de ce débit retrouvé, un hôte sans limite redevient illimité
+UNLIMITED_RECOVERY_RATE = 20.0
+
+
+def parse_retry_after(value, default=None):
+    """Durée en secondes indiquée par un en-tête Retry-After (secondes ou date HTTP)"""
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """Seau à jetons d'un hôte : débit soutenu (jetons/s) et rafale autorisée
+
+    Les réservations peuvent rendre le solde négatif : chaque appelant
+    obtient alors le délai après lequel son jeton sera disponible, ce qui
+    sert les requêtes dans l'ordre d'arrivée.
+    """
+
+    def __init__(self, rate, burst):
+        self.configured_rate = rate
+        self.rate = rate  # None = illimité
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+
+    def reserve(self, now):
+        """Prend un jeton et retourne le temps d'attente correspondant"""
+        wait = max(self.blocked_until - now, 0)
+        if self.rate is None:
+            return wait
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            wait = max(wait, -self.tokens / self.rate)
+        return wait
+
+    def slow_down(self, now, pause, min_rate):
+        """Divise le débit par deux et suspend l'hôte pendant pause secondes"""
+        self.tokens = min(self.tokens, 0)
+        self.updated = now
+        self.rate = PENALTY_START_RATE if self.rate is None else max(self.rate / 2, min_rate)
+        self.blocked_until = max(self.blocked_until, now + pause)
+
+    def recover(self):
+        """Remonte progressivement vers le débit configuré après une réponse normale"""
+        if self.rate is None or self.rate == self.configured_rate:
+            return
+        target = self.configured_rate if self.configured_rate is not None else UNLIMITED_RECOVERY_RATE
+        self.rate = min(self.rate * 1.1, target)
+        if self.configured_rate is None and self.rate >= UNLIMITED_RECOVERY_RATE:
+            self.rate = None
+
+
+class HostRateLimiter:
+    """Limiteur de débit par hôte (seau à jetons), partagé par les pages et les ressources
+
+    Chaque hôte a son propre seau : les requêtes vers des hôtes différents
+    progressent en parallèle. Les refus 429/503 divisent le débit de l'hôte
+    et respectent Retry-After ; le débit remonte ensuite progressivement.
+    """
+
+    def __init__(self, rate=None, burst=1, domain_rates=None, min_rate=0.05, max_pause=120):
+        self.rate = rate
+        self.burst = burst
+        self.domain_rates = domain_rates or {}
+        self.min_rate = min_rate
+        self.max_pause = max_pause
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.stats = {'throttled': 0, 'wait_time': 0.0}
+
+    def rate_for(self, host):
+        """Débit configuré pour un hôte (surcharges par domaine et sous-domaines)"""
+        for pattern, rate in self.domain_rates.items():
+            if host == pattern or host.endswith('.' + pattern):
+                return rate
+        return self.rate
+
+    def get_bucket(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate_for(host), self.burst)
+        return bucket
+
+    def acquire(self, url, cancel_event=None):
+        """Attend le droit d'envoyer une requête vers l'hôte de l'URL"""
+        with self.lock:
+            wait = self.get_bucket(url).reserve(time.monotonic())
+            self.stats['wait_time'] += wait
+        if wait > 0:
+            if cancel_event is not None:
+                cancel_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+    def throttled(self, url, retry_after=None):
+        """Signale un refus 429/503 de l'hôte et retourne la pause appliquée"""
+        with self.lock:
+            bucket = self.get_bucket(url)
+            current_rate = bucket.rate or PENALTY_START_RATE
+            pause = min(retry_after if retry_after is not None else 1 / current_rate, self.max_pause)
+            bucket.slow_down(time.monotonic(), pause, self.min_rate)
+            self.stats['throttled'] += 1
+        logger.warning(f"Hôte {urlparse(url).hostname} saturé, pause de {pause:.1f}s et débit réduit")
+        return pause
+
+    def succeeded(self, url):
+        with self.lock:
+            self.get_bucket(url).recover()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """Adaptateur requests qui passe chaque requête par le limiteur de l'hôte
+
+    Les réponses 429/503 sont renvoyées après la pause demandée par le
+    serveur, dans la limite de max_throttle_retries.
+    """
+
+    def __init__(self, get_limiter, max_throttle_retries=3, cancel_event_getter=None, **kwargs):
+        self.get_limiter = get_limiter
+        self.max_throttle_retries = max_throttle_retries
+        self.cancel_event_getter = cancel_event_getter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        limiter = self.get_limiter()
+        cancel_event = self.cancel_event_getter() if self.cancel_event_getter else None
+        attempt = 0
+        while True:
+            limiter.acquire(request.url, cancel_event)
+            response = super().send(request, **kwargs)
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                limiter.succeeded(request.url)
+                return response
+            limiter.throttled(request.url, parse_retry_after(response.headers.get('retry-after')))
+            if attempt >= self.max_throttle_retries or (cancel_event is not None and cancel_event.is_set()):
+                return response
+            attempt += 1
+            response.close()
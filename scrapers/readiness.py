@@ -0,0 +1,135 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+WAIT_STRATEGIES = ['ready_state', 'network_idle', 'mutation_idle', 'selector']
+
+# Injecté avant les scripts de la page pour compter les requêtes fetch/XHR en cours
+NETWORK_HOOK_SCRIPT = """
+(function() {
+    if (window.__scraperNetwork) { return; }
+    var state = window.__scraperNetwork = {pending: 0, last: Date.now()};
+    function done() { state.pending = Math.max(state.pending - 1, 0); state.last = Date.now(); }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.pending++; state.last = Date.now();
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function() {
+            state.pending++; state.last = Date.now();
+            return originalFetch.apply(this, arguments).finally(done);
+        };
+    }
+})();
+"""
+
+NETWORK_STATE_SCRIPT = """
+var state = window.__scraperNetwork || {pending: 0, last: 0};
+return [state.pending, performance.getEntriesByType('resource').length];
+"""
+
+MUTATION_STATE_SCRIPT = """
+if (!window.__scraperMutations) {
+    window.__scraperMutations = {last: Date.now()};
+    new MutationObserver(function() { window.__scraperMutations.last = Date.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+return Date.now() - window.__scraperMutations.last;
+"""
+
+
+def install_network_hook(driver):
+    """Installe le compteur de requêtes réseau pour les prochaines pages (via CDP)"""
+    if getattr(driver, '_scraper_network_hook', False):
+        return True
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_HOOK_SCRIPT})
+        driver._scraper_network_hook = True
+        return True
+    except Exception as e:
+        logger.warning(f"CDP indisponible, détection réseau limitée aux ressources chargées: {e}")
+        return False
+
+
+def wait_for_ready_state(driver, timeout):
+    """Attend que document.readyState vaille 'complete'"""
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+
+def wait_for_network_idle(driver, timeout, quiet_period, poll_interval):
+    """Attend qu'aucune requête ne soit en cours pendant quiet_period secondes"""
+    deadline = time.monotonic() + timeout
+    last_count = None
+    quiet_since = time.monotonic()
+
+    while time.monotonic() < deadline:
+        pending, resource_count = driver.execute_script(NETWORK_STATE_SCRIPT)
+        now = time.monotonic()
+        if pending or resource_count != last_count:
+            quiet_since = now
+            last_count = resource_count
+        elif now - quiet_since >= quiet_period:
+            return
+        time.sleep(poll_interval)
+
+    raise TimeoutException("Le réseau n'est pas devenu inactif")
+
+
+def wait_for_mutation_idle(driver, timeout, quiet_period, poll_interval):
+    """Attend que le DOM ne change plus pendant quiet_period secondes"""
+    deadline = time.monotonic() + timeout
+    quiet_ms = quiet_period * 1000
+
+    while time.monotonic() < deadline:
+        if driver.execute_script(MUTATION_STATE_SCRIPT) >= quiet_ms:
+            return
+        time.sleep(poll_interval)
+
+    raise TimeoutException("Le DOM n'est pas devenu stable")
+
+
+def wait_for_selector(driver, timeout, selector):
+    """Attend la présence d'un élément correspondant au sélecteur CSS"""
+    WebDriverWait(driver, timeout).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+    )
+
+
+def wait_for_page_ready(driver, strategy='ready_state', timeout=10, selector=None,
+                        quiet_period=0.5, poll_interval=0.1):
+    """Attend que la page soit prête selon la stratégie choisie
+
+    Un dépassement du délai n'est pas une erreur : la page est utilisée dans
+    l'état où elle se trouve. Retourne (temps d'attente en secondes, délai dépassé).
+    """
+    start = time.monotonic()
+    timed_out = False
+
+    try:
+        if strategy == 'ready_state':
+            wait_for_ready_state(driver, timeout)
+        elif strategy == 'network_idle':
+            wait_for_network_idle(driver, timeout, quiet_period, poll_interval)
+        elif strategy == 'mutation_idle':
+            wait_for_mutation_idle(driver, timeout, quiet_period, poll_interval)
+        elif strategy == 'selector':
+            if not selector:
+                raise ValueError("Un sélecteur CSS est requis pour la stratégie 'selector'")
+            wait_for_selector(driver, timeout, selector)
+        else:
+            raise ValueError(f"Stratégie d'attente inconnue: {strategy}")
+    except TimeoutException:
+        timed_out = True
+        logger.warning(f"Délai d'attente dépassé ({strategy}, {timeout}s)")
+
+    return time.monotonic() - start, timed_out
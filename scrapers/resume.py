@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import re
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class PartialDownload:
+    """Fichier partiel reprenable, identifié par le hachage de l'URL
+
+    Le fichier <dossier>/.partial-<hachage>.part contient les octets déjà
+    reçus ; le fichier .json associé conserve le validateur (ETag fort ou
+    Last-Modified) et la taille totale annoncée. Une reprise n'est tentée
+    qu'avec un validateur, envoyé en If-Range : si la ressource a changé,
+    le serveur renvoie le contenu complet et le partiel est réécrit.
+
+    Le fichier .lock associé est verrouillé par le système pendant
+    l'écriture : la réservation vaut entre threads, processus de shards et
+    workers gunicorn, et disparaît avec le processus qui la détenait.
+    """
+
+    def __init__(self, folder, url):
+        self.url = url
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        self.path = os.path.join(folder, f".partial-{name}.part")
+        self.meta_path = f"{self.path}.json"
+        self.lock_path = f"{self.path}.lock"
+        self.lock_fd = None
+        self.offset = 0
+        self.validator = None
+        self.total = None
+
+    def claim(self):
+        """Réserve le fichier partiel, False s'il est déjà utilisé par un autre thread ou processus"""
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            lock_file(fd)
+            # Le détenteur précédent a pu supprimer le verrou entre l'ouverture et le verrouillage
+            if os.fstat(fd).st_ino != os.stat(self.lock_path).st_ino:
+                raise OSError("verrou remplacé")
+        except OSError:
+            os.close(fd)
+            return False
+        self.lock_fd = fd
+        self.load()
+        return True
+
+    def release(self):
+        if self.lock_fd is not None:
+            # Suppression avant déverrouillage : un nouveau venu recrée un verrou neuf
+            self.remove(self.lock_path)
+            unlock_file(self.lock_fd)
+            os.close(self.lock_fd)
+            self.lock_fd = None
+
+    def load(self):
+        """Relit l'état d'un partiel laissé par une tentative précédente"""
+        self.offset = 0
+        self.validator = None
+        self.total = None
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self.discard()
+            return
+
+        size = os.path.getsize(self.path)
+        if meta.get('url') != self.url or not meta.get('validator') or (meta.get('total') and size > meta['total']):
+            self.discard()
+            return
+        self.offset = size
+        self.validator = meta['validator']
+        self.total = meta.get('total')
+
+    def request_headers(self):
+        """En-têtes de reprise à ajouter à la requête GET"""
+        if self.offset <= 0 or not self.validator:
+            return {}
+        return {'Range': f'bytes={self.offset}-', 'If-Range': self.validator}
+
+    def open(self, response, hash_object):
+        """Ouvre le partiel pour écrire le corps de la réponse
+
+        En cas de réponse 206 cohérente, les octets existants sont ajoutés
+        au hachage et l'écriture reprend à la suite ; sinon le fichier est
+        réécrit depuis le début. Retourne (fichier, octets déjà présents).
+        """
+        offset = 0
+        total = None
+        # Content-Length et Range comptent les octets encodés (gzip, br), le fichier les octets décodés
+        encoded = is_content_encoded(response)
+        match = CONTENT_RANGE_PATTERN.match(response.headers.get('content-range', ''))
+        if response.status_code == 206 and match and int(match.group(1)) == self.offset and not encoded:
+            offset = self.offset
+            if match.group(3) != '*':
+                total = int(match.group(3))
+        elif response.headers.get('content-length') and not encoded:
+            total = int(response.headers['content-length'])
+
+        if offset:
+            with open(self.path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hash_object.update(chunk)
+            logger.info(f"Reprise du téléchargement de {self.url} à l'octet {offset}")
+        else:
+            # Un contenu encodé ne peut pas être repris à partir des octets décodés déjà écrits
+            self.validator = None if encoded else response_validator(response)
+
+        self.offset = offset
+        self.total = total
+        if self.validator:
+            self.write_meta()
+        return open(self.path, 'ab' if offset else 'wb'), offset
+
+    def write_meta(self):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': self.url, 'validator': self.validator, 'total': self.total}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    @property
+    def resumable(self):
+        return bool(self.validator)
+
+    def is_complete(self, size):
+        """Vérifie que la taille décodée reçue correspond à la taille annoncée (si connue)"""
+        return self.total is None or size == self.total
+
+    def finish(self):
+        """Termine le téléchargement : retourne le chemin du fichier complet"""
+        self.remove(self.meta_path)
+        return self.path
+
+    def discard(self):
+        """Supprime le partiel et ses métadonnées"""
+        self.remove(self.path)
+        self.remove(self.meta_path)
+        self.offset = 0
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def lock_file(fd):
+    """Verrou exclusif non bloquant, OSError s'il est déjà pris"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+def unlock_file(fd):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+
+def response_validator(response):
+    """Validateur utilisable dans If-Range : ETag fort, sinon Last-Modified"""
+    etag = response.headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('last-modified')
+
+
+def is_content_encoded(response):
+    """Indique si le corps est transmis avec un Content-Encoding (gzip, br...)"""
+    return response.headers.get('content-encoding', 'identity').strip().lower() not in ('', 'identity')
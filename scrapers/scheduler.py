@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """La file d'attente d'un type de tâche est pleine"""
+
+
+class Job:
+    """Tâche soumise au planificateur"""
+
+    def __init__(self, job_id, kind, func, args, priority=0, timeout=None):
+        self.job_id = job_id
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.priority = priority
+        self.timeout = timeout
+        self.state = 'queued'
+        self.cancel_event = threading.Event()
+        self.timed_out = False
+        self.submitted_at = time.time()
+
+
+class JobScheduler:
+    """Planificateur de tâches avec un pool de workers borné par type
+
+    Chaque type de tâche (ex: 'web', 'youtube') a sa propre file de priorité
+    (FIFO à priorité égale) et son propre nombre de workers. L'annulation et
+    le délai maximal sont coopératifs : la fonction exécutée reçoit un
+    threading.Event qu'elle doit surveiller.
+    """
+
+    def __init__(self, workers, max_queued=20):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.queues = {kind: [] for kind in workers}
+        self.jobs = {}
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.closed = False
+
+        for kind, count in workers.items():
+            for index in range(count):
+                thread = threading.Thread(
+                    target=self.worker_loop,
+                    args=(kind,),
+                    name=f"{kind}-worker-{index}",
+                    daemon=True
+                )
+                thread.start()
+
+    def submit(self, job_id, kind, func, args=(), priority=0, timeout=None):
+        """Ajoute une tâche à la file, retourne sa position (0 si un worker est libre)"""
+        job = Job(job_id, kind, func, args, priority, timeout)
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Le planificateur est arrêté")
+            if self.queued_count(kind) >= self.max_queued:
+                raise JobQueueFull(f"File d'attente '{kind}' pleine ({self.max_queued} tâches)")
+
+            self.jobs[job_id] = job
+            heapq.heappush(self.queues[kind], (priority, next(self.counter), job))
+            self.condition.notify_all()
+
+            # Les workers libres prendront la tâche immédiatement
+            free_workers = self.workers[kind] - self.running_count(kind)
+            return max(self.queue_position(job_id) - free_workers, 0)
+
+    def queued_count(self, kind):
+        return sum(1 for _, _, job in self.queues[kind] if job.state == 'queued')
+
+    def running_count(self, kind):
+        return sum(1 for job in self.jobs.values() if job.kind == kind and job.state == 'running')
+
+    def active_job_ids(self):
+        """Identifiants des tâches en attente ou en cours dans ce processus"""
+        with self.condition:
+            return list(self.jobs)
+
+    def queue_position(self, job_id):
+        """Position (à partir de 1) d'une tâche en attente, ou None"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.state != 'queued':
+                return None
+            waiting = [entry[2] for entry in sorted(self.queues[job.kind]) if entry[2].state == 'queued']
+            return waiting.index(job) + 1
+
+    def cancel(self, job_id):
+        """Annule une tâche en attente ou demande l'arrêt d'une tâche en cours"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.state in ('done', 'cancelled'):
+                return False
+            job.cancel_event.set()
+            if job.state == 'queued':
+                # Retirée paresseusement de la file par le prochain worker
+                job.state = 'cancelled'
+                self.jobs.pop(job_id, None)
+            return True
+
+    def is_cancelled(self, job_id):
+        job = self.jobs.get(job_id)
+        return job is not None and job.cancel_event.is_set()
+
+    def get_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def worker_loop(self, kind):
+        """Boucle d'un worker : prend la tâche la plus prioritaire et l'exécute"""
+        while True:
+            with self.condition:
+                while not self.closed and not self.queues[kind]:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                _, _, job = heapq.heappop(self.queues[kind])
+                if job.state != 'queued':
+                    continue
+                job.state = 'running'
+
+            timer = None
+            if job.timeout:
+                timer = threading.Timer(job.timeout, self.expire, args=(job,))
+                timer.daemon = True
+                timer.start()
+
+            try:
+                job.func(*job.args, cancel_event=job.cancel_event)
+            except Exception as e:
+                logger.error(f"Erreur non gérée dans la tâche {job.job_id}: {e}")
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                with self.condition:
+                    job.state = 'done'
+                    # Les tâches terminées ne sont plus suivies par le planificateur
+                    self.jobs.pop(job.job_id, None)
+                    self.condition.notify_all()
+
+    def expire(self, job):
+        """Demande l'arrêt d'une tâche qui a dépassé son délai maximal"""
+        if job.state == 'running':
+            job.timed_out = True
+            job.cancel_event.set()
+            logger.warning(f"Tâche {job.job_id} arrêtée: délai de {job.timeout}s dépassé")
+
+    def shutdown(self):
+        """Arrête les workers et annule les tâches en attente ou en cours"""
+        with self.condition:
+            self.closed = True
+            for job in self.jobs.values():
+                job.cancel_event.set()
+            self.condition.notify_all()
@@ -0,0 +1,117 @@
+from array import array
+import hashlib
+import math
+
+
+def url_hash(url, digest_size=8):
+    """Empreinte BLAKE2b d'une URL, sous forme d'entier"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=digest_size).digest(), 'big')
+
+
+class HashSeenSet:
+    """Ensemble d'URLs vues stocké sous forme d'empreintes de 64 bits
+
+    Les empreintes sont rangées dans une table à adressage ouvert (tableau
+    d'entiers non signés de largeur fixe) : environ 16 octets par URL au
+    lieu de la chaîne complète. Une collision sur 64 bits est négligeable
+    même pour des millions d'URLs.
+    """
+
+    def __init__(self, capacity=1024):
+        size = 16
+        while size < capacity * 2:
+            size *= 2
+        self.table = array('Q', bytes(8 * size))
+        self.mask = size - 1
+        self.count = 0
+
+    @staticmethod
+    def fingerprint(url):
+        # 0 marque un emplacement libre
+        return url_hash(url) or 1
+
+    def find_slot(self, value):
+        index = value & self.mask
+        while True:
+            current = self.table[index]
+            if current == 0 or current == value:
+                return index
+            index = (index + 1) & self.mask
+
+    def add(self, url):
+        """Ajoute une URL, retourne True si elle n'avait jamais été vue"""
+        return self.add_fingerprint(self.fingerprint(url))
+
+    def add_fingerprint(self, value):
+        index = self.find_slot(value)
+        if self.table[index] == value:
+            return False
+        self.table[index] = value
+        self.count += 1
+        if self.count * 2 > len(self.table):
+            self.grow()
+        return True
+
+    def grow(self):
+        previous = self.table
+        self.table = array('Q', bytes(8 * len(previous) * 2))
+        self.mask = len(self.table) - 1
+        for value in previous:
+            if value:
+                self.table[self.find_slot(value)] = value
+
+    def __contains__(self, url):
+        value = self.fingerprint(url)
+        return self.table[self.find_slot(value)] == value
+
+    def __len__(self):
+        return self.count
+
+
+class BloomSeenSet:
+    """Filtre de Bloom pour les très gros crawls : mémoire fixe, faux positifs possibles
+
+    Une URL jamais vue peut être considérée comme déjà vue avec une
+    probabilité proche de error_rate (tant que capacity n'est pas dépassée) ;
+    elle ne sera alors pas visitée. Une URL vue n'est jamais oubliée.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, url):
+        # Double hachage : k positions dérivées de deux empreintes de 64 bits
+        value = url_hash(url, digest_size=16)
+        first, second = value >> 64, value & 0xFFFFFFFFFFFFFFFF
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, url):
+        """Ajoute une URL, retourne True si elle n'avait (probablement) jamais été vue"""
+        added = False
+        for position in self.positions(url):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, url):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self.positions(url))
+
+    def __len__(self):
+        return self.count
+
+
+def create_seen_set(kind='hash', capacity=1000000, error_rate=0.001):
+    """Crée l'ensemble d'URLs vues demandé ('hash' ou 'bloom')"""
+    if kind == 'bloom':
+        return BloomSeenSet(capacity, error_rate)
+    return HashSeenSet()
+
@@ -0,0 +1,29 @@
+"""Point d'entrée des processus d'un crawl réparti
+
+Lancé par run_sharded_crawl avec « python -m scrapers.shard_worker » : le
+processus n'importe que le paquet scrapers, sans l'application Flask ni ses
+singletons. La description du shard est lue en JSON sur l'entrée standard,
+et son résultat écrit en JSON sur la sortie standard.
+"""
+import json
+import logging
+import sys
+
+from .sharded_crawl import run_shard
+
+
+def main():
+    job = json.load(sys.stdin)
+    if job.get('log_file'):
+        logging.basicConfig(
+            filename=job['log_file'],
+            level=job.get('log_level', logging.INFO),
+            format=job.get('log_format')
+        )
+    error = run_shard(job['shard'], job['shards'], job['output_folder'], job['settings'], job['stores'])
+    print(json.dumps({'error': error}), flush=True)
+    return 0 if error is None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,502 @@
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from .blob_store import BlobStore
+from .checkpoint import read_checkpoint, read_journal
+from .driver_pool import DriverPool
+from .http_cache import get_http_cache
+from .seen_set import HashSeenSet
+
+logger = logging.getLogger(__name__)
+
+# Frontière partagée et états intermédiaires des processus (ignorés par les archives)
+FRONTIER_DB_NAME = '.crawl_frontier.sqlite'
+SHARD_CHECKPOINT_PREFIX = '.crawl_shard-'
+
+# État d'une URL dans la frontière partagée
+PENDING, IN_FLIGHT, DONE = 0, 1, 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    fingerprint INTEGER PRIMARY KEY,
+    url TEXT,
+    shard INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    state INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_queue ON urls (shard, state, priority);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (state);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('claimed', 0), ('done', 0), ('cancelled', 0);
+"""
+
+# Options du scraper principal transmises à chaque processus
+SHARD_SETTINGS = [
+    'max_pages', 'download_images', 'download_css', 'download_js', 'download_fonts',
+    'follow_external_links', 'max_file_size', 'max_workers', 'resume_attempts',
+    'rate_burst', 'workers', 'max_depth', 'render_mode', 'domain_render_modes', 'render_fallback_pages',
+    'wait_strategy', 'wait_selector', 'wait_timeout', 'wait_quiet_period',
+    'parser_backend', 'tracking_params', 'baseline_folder', 'checkpoint_every',
+    'base_domain', 'start_url',
+]
+
+
+def frontier_path(task_folder):
+    return os.path.join(task_folder, FRONTIER_DB_NAME)
+
+
+def shard_checkpoint_name(shard):
+    return f"{SHARD_CHECKPOINT_PREFIX}{shard}.json.gz"
+
+
+def shard_journal_name(shard):
+    return f"{SHARD_CHECKPOINT_PREFIX}{shard}.jsonl"
+
+
+def to_signed(value):
+    """Empreinte non signée de 64 bits vers un entier SQLite (signé)"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+class SharedFrontier:
+    """Frontière d'un crawl réparti, partagée par les processus via SQLite (mode WAL)
+
+    Chaque URL canonique est identifiée par son empreinte de 64 bits (la même
+    que HashSeenSet) et attribuée au shard empreinte % shards : un processus
+    ne retire que les URLs de son shard, mais peut en ajouter à tous. La table
+    sert d'ensemble des URLs vues pour toute la tâche, et un compteur commun
+    applique la limite de pages à l'ensemble des processus.
+
+    Expose la même interface que CrawlFrontier. pop() attend qu'une URL
+    arrive dans le shard tant que d'autres processus ont des pages en cours.
+    """
+
+    poll_interval = 0.2
+
+    def __init__(self, path, shards=1, shard=None, max_depth=None, max_pages=None,
+                 prioritize_shallow=True, cancel_event=None):
+        self.path = path
+        self.shards = shards
+        self.shard = shard
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.prioritize_shallow = prioritize_shallow
+        self.cancel_event = cancel_event
+        self.local_in_flight = 0  # Pages retirées par ce processus et non terminées
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def add(self, url, depth=0, priority=None):
+        """Ajoute une URL si elle n'a jamais été vue par aucun processus, retourne True si ajoutée"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if priority is None:
+            priority = depth if self.prioritize_shallow else 0
+        fingerprint = to_signed(HashSeenSet.fingerprint(url))
+        with self.lock:
+            cursor = self.connection.execute(
+                'INSERT OR IGNORE INTO urls (fingerprint, url, shard, depth, priority, state) VALUES (?, ?, ?, ?, ?, ?)',
+                (fingerprint, url, fingerprint % self.shards, depth, priority, PENDING)
+            )
+            return cursor.rowcount == 1
+
+    def pop(self):
+        """Retire la prochaine URL du shard, retourne (url, profondeur) ou None
+
+        Sans page en cours dans ce processus, attend que d'autres shards
+        ajoutent des URLs ; retourne None quand le crawl est terminé, que la
+        limite de pages est atteinte ou que la tâche est annulée.
+        """
+        while True:
+            with self.lock:
+                item = self.claim()
+                if item is not None or self.local_in_flight > 0:
+                    return item
+                if self.budget_exhausted() or not self.has_active():
+                    return None
+            if self.cancel_event is not None:
+                if self.cancel_event.wait(self.poll_interval):
+                    return None
+            else:
+                time.sleep(self.poll_interval)
+
+    def claim(self):
+        """Réserve atomiquement une URL du shard et une place dans la limite de pages (avec le verrou)"""
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.connection.execute(
+                'SELECT fingerprint, url, depth FROM urls WHERE shard = ? AND state = ? ORDER BY priority LIMIT 1',
+                (self.shard, PENDING)
+            ).fetchone()
+            if row is None:
+                self.connection.execute('ROLLBACK')
+                return None
+            if self.max_pages is not None:
+                cursor = self.connection.execute(
+                    "UPDATE counters SET value = value + 1 WHERE name = 'claimed' AND value < ?",
+                    (self.max_pages,)
+                )
+            else:
+                cursor = self.connection.execute("UPDATE counters SET value = value + 1 WHERE name = 'claimed'")
+            if cursor.rowcount == 0:
+                self.connection.execute('ROLLBACK')
+                return None
+            self.connection.execute('UPDATE urls SET state = ? WHERE fingerprint = ?', (IN_FLIGHT, row[0]))
+            self.connection.execute('COMMIT')
+        except sqlite3.Error:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.local_in_flight += 1
+        return row[1], row[2]
+
+    def mark_done(self, url):
+        """Signale la fin du traitement d'une URL retirée par ce processus"""
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.execute(
+                'UPDATE urls SET state = ? WHERE fingerprint = ?',
+                (DONE, to_signed(HashSeenSet.fingerprint(url)))
+            )
+            self.connection.execute("UPDATE counters SET value = value + 1 WHERE name = 'done'")
+            self.connection.execute('COMMIT')
+            self.local_in_flight = max(self.local_in_flight - 1, 0)
+
+    def counter(self, name):
+        return self.connection.execute('SELECT value FROM counters WHERE name = ?', (name,)).fetchone()[0]
+
+    def request_cancel(self):
+        """Demande l'arrêt de tous les processus du crawl"""
+        with self.lock:
+            self.connection.execute("UPDATE counters SET value = 1 WHERE name = 'cancelled'")
+
+    def cancel_requested(self):
+        with self.lock:
+            return bool(self.counter('cancelled'))
+
+    def budget_exhausted(self):
+        return self.max_pages is not None and self.counter('claimed') >= self.max_pages
+
+    def has_active(self):
+        """Indique s'il reste des URLs en attente ou en cours dans un shard"""
+        return self.connection.execute(
+            'SELECT 1 FROM urls WHERE state IN (?, ?) LIMIT 1', (PENDING, IN_FLIGHT)
+        ).fetchone() is not None
+
+    def progress(self):
+        """Retourne (pages terminées, pages réservées, URLs en attente) pour toute la tâche"""
+        with self.lock:
+            return self.counter('done'), self.counter('claimed'), self.count_state(PENDING)
+
+    def count_state(self, state):
+        return self.connection.execute('SELECT COUNT(*) FROM urls WHERE state = ?', (state,)).fetchone()[0]
+
+    def has_seen(self, url):
+        """Indique si l'URL a déjà été ajoutée par l'un des processus"""
+        with self.lock:
+            return self.connection.execute(
+                'SELECT 1 FROM urls WHERE fingerprint = ?', (to_signed(HashSeenSet.fingerprint(url)),)
+            ).fetchone() is not None
+
+    def pending_count(self):
+        """Retourne le nombre d'URLs en attente, tous shards confondus"""
+        with self.lock:
+            return self.count_state(PENDING)
+
+    def __len__(self):
+        return self.pending_count()
+
+    def reset_in_flight(self):
+        """Remet en attente les pages en cours lors d'une interruption
+
+        Les URLs sont aussi réattribuées aux shards, dont le nombre peut
+        avoir changé depuis le crawl interrompu (modulo Python sur l'empreinte signée).
+        """
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.execute('UPDATE urls SET state = ? WHERE state = ?', (PENDING, IN_FLIGHT))
+            self.connection.execute(
+                'UPDATE urls SET shard = ((fingerprint % ?) + ?) % ?', (self.shards, self.shards, self.shards)
+            )
+            self.connection.execute(
+                "UPDATE counters SET value = (SELECT COUNT(*) FROM urls WHERE state = ?) "
+                "WHERE name IN ('claimed', 'done')", (DONE,)
+            )
+            self.connection.execute('COMMIT')
+
+    def restore(self, pending, seen=()):
+        """Alimente la frontière partagée à partir du journal de la tâche
+
+        seen contient les URLs déjà traitées et pending les (url, profondeur)
+        à remettre en attente. Les URLs sont réparties entre les shards
+        actuels, dont le nombre peut avoir changé depuis le crawl interrompu.
+        """
+        def row(url, depth, state):
+            fingerprint = to_signed(HashSeenSet.fingerprint(url))
+            priority = depth if self.prioritize_shallow else 0
+            return fingerprint, url, fingerprint % self.shards, depth, priority, state
+
+        rows = itertools.chain(
+            (row(url, 0, DONE) for url in seen),
+            (row(url, depth, PENDING) for url, depth in pending)
+        )
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO urls (fingerprint, url, shard, depth, priority, state) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.connection.execute('COMMIT')
+        self.reset_in_flight()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def remove_shared_state(task_folder, frontier=True, shard_states=True):
+    """Supprime la frontière partagée et les états intermédiaires d'un crawl réparti précédent
+
+    Avec shard_states=False, les résumés et journaux des processus sont
+    conservés pour être fusionnés lors d'une reprise.
+    """
+    if shard_states:
+        for name in os.listdir(task_folder):
+            if name.startswith(SHARD_CHECKPOINT_PREFIX):
+                os.remove(os.path.join(task_folder, name))
+    if frontier:
+        path = frontier_path(task_folder)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def run_shard(shard, shards, output_folder, settings, stores):
+    """Crawle les URLs d'un shard avec son propre driver et sa session (voir shard_worker)
+
+    L'annulation demandée par le processus principal dans la frontière
+    partagée est relayée à l'événement d'annulation du scraper.
+    Retourne None, ou le message d'erreur du shard.
+    """
+    from .web_scraper import WebScraper
+
+    driver_pool = DriverPool(1, stores.get('driver_max_pages', 100))
+    cancel_event = threading.Event()
+    scraper = None
+    try:
+        scraper = WebScraper(
+            output_folder,
+            driver_pool=driver_pool,
+            blob_store=BlobStore(stores['blob_store']) if stores.get('blob_store') else None,
+            http_cache=get_http_cache(*stores['http_cache']) if stores.get('http_cache') else None
+        )
+        for name, value in settings.items():
+            setattr(scraper, name, value)
+        scraper.cancel_event = cancel_event
+        scraper.shard_index = shard
+        scraper.frontier = SharedFrontier(
+            frontier_path(output_folder), shards, shard,
+            max_depth=scraper.max_depth, max_pages=scraper.max_pages, cancel_event=cancel_event
+        )
+        threading.Thread(
+            target=watch_cancellation, args=(scraper.frontier, cancel_event),
+            name="shard-cancel-watcher", daemon=True
+        ).start()
+        if scraper.baseline_folder:
+            scraper.load_baseline()
+        scraper.reset_journal()
+        try:
+            scraper.crawl()
+        finally:
+            # Journal et résumé du processus, fusionnés par le processus principal
+            scraper.save_checkpoint()
+        return None
+    except Exception as e:
+        logger.error(f"Erreur dans le shard {shard}: {e}")
+        return str(e)
+    finally:
+        cancel_event.set()
+        if scraper is not None:
+            scraper.close()
+        driver_pool.shutdown()
+
+
+def watch_cancellation(frontier, cancel_event):
+    """Relaie l'annulation enregistrée dans la frontière partagée, jusqu'à la fin du shard"""
+    while not cancel_event.wait(frontier.poll_interval):
+        try:
+            if frontier.cancel_requested():
+                cancel_event.set()
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture de l'annulation impossible: {e}")
+
+
+def shard_settings(scraper, shards):
+    """Options d'un processus : budget de taille et débit par hôte répartis entre les shards"""
+    settings = {name: getattr(scraper, name) for name in SHARD_SETTINGS}
+    settings.update(
+        max_total_size=max(scraper.max_total_size - scraper.total_size, 0) // shards,
+        max_connections_per_host=max(scraper.max_connections_per_host // shards, 1),
+        delay=scraper.delay * shards,
+        domain_rate_limits={
+            domain: rate / shards if rate else rate
+            for domain, rate in scraper.domain_rate_limits.items()
+        },
+    )
+    return settings
+
+
+def shard_stores(scraper):
+    """Emplacements des stores partagés, rouverts dans chaque processus"""
+    stores = {'driver_max_pages': getattr(scraper.driver_pool, 'max_pages_per_driver', 100)}
+    if scraper.blob_store is not None:
+        stores['blob_store'] = scraper.blob_store.root
+    if scraper.http_cache is not None:
+        stores['http_cache'] = (scraper.http_cache.folder, scraper.http_cache.max_size)
+    return stores
+
+
+def log_settings():
+    """Fichier, niveau et format du journal du processus principal, repris par les shards"""
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, logging.FileHandler):
+            return {
+                'log_file': handler.baseFilename,
+                'log_level': root.level,
+                'log_format': getattr(handler.formatter, '_fmt', None),
+            }
+    return {}
+
+
+def start_shard_process(job):
+    """Lance un processus « python -m scrapers.shard_worker » pour un shard
+
+    Le processus n'importe que le paquet scrapers : ni l'application Flask
+    ni ses singletons (registre, planificateur, caches) ne sont recréés.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'scrapers.shard_worker'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env
+    )
+    process.stdin.write(json.dumps(job).encode('utf-8'))
+    process.stdin.close()
+    return process
+
+
+def shard_error(process):
+    """Message d'erreur d'un processus terminé, ou None s'il a réussi"""
+    output = process.stdout.read().decode('utf-8', errors='replace').strip()
+    try:
+        error = json.loads(output.splitlines()[-1])['error'] if output else None
+    except (ValueError, KeyError, TypeError):
+        error = None
+    if error is None and process.returncode != 0:
+        error = f"processus terminé avec le code {process.returncode}"
+    return error
+
+
+def merge_leftover_shards(scraper):
+    """Intègre au journal de la tâche les états laissés par les processus d'un crawl réparti
+
+    Le point de reprise de la tâche est écrit avant la suppression des
+    fichiers des processus : une interruption ne perd aucun résultat.
+    """
+    names = [name for name in os.listdir(scraper.output_folder) if name.startswith(SHARD_CHECKPOINT_PREFIX)]
+    if not names:
+        return
+    for name in sorted(names):
+        if not name.endswith('.json.gz'):
+            continue
+        shard = int(name[len(SHARD_CHECKPOINT_PREFIX):-len('.json.gz')])
+        state = read_checkpoint(scraper.output_folder, name)
+        if state is not None:
+            records = list(read_journal(scraper.output_folder, state['journal_size'], shard_journal_name(shard)))
+            scraper.merge_shard_summary(state, records)
+    scraper.save_checkpoint()
+    for name in names:
+        os.remove(os.path.join(scraper.output_folder, name))
+
+
+def run_sharded_crawl(scraper, shards, resume=False):
+    """Exécute le crawl de scraper sur shards processus et fusionne leurs résultats
+
+    Les URLs sont réparties par empreinte entre les processus, qui partagent
+    la frontière SQLite du dossier de la tâche. Chaque processus écrit ses
+    fichiers dans ce même dossier ; ses compteurs, pages et manifestes sont
+    fusionnés dans scraper à la fin. Le processus principal ne télécharge rien.
+    """
+    # La frontière partagée est reconstruite à partir du journal de la tâche
+    remove_shared_state(scraper.output_folder, shard_states=False)
+    frontier = SharedFrontier(
+        frontier_path(scraper.output_folder), shards,
+        max_depth=scraper.max_depth, max_pages=scraper.max_pages
+    )
+    scraper.frontier = frontier
+    if not (resume and scraper.restore_checkpoint()):
+        remove_shared_state(scraper.output_folder, frontier=False)
+        scraper.reset_journal()
+        scraper.add_to_frontier(scraper.start_url, 0)
+    # Point de reprise initial : le crawl peut être repris même si ce processus s'arrête
+    scraper.save_checkpoint()
+
+    settings = shard_settings(scraper, shards)
+    stores = shard_stores(scraper)
+    processes = {
+        shard: start_shard_process(dict(
+            log_settings(), shard=shard, shards=shards, output_folder=scraper.output_folder,
+            settings=settings, stores=stores
+        ))
+        for shard in range(shards)
+    }
+    logger.info(f"Crawl réparti sur {shards} processus")
+
+    errors = {}
+    try:
+        running = dict(processes)
+        while running:
+            time.sleep(0.5)
+            for shard, process in list(running.items()):
+                if process.poll() is not None:
+                    del running[shard]
+                    error = shard_error(process)
+                    if error is not None:
+                        errors[shard] = error
+            if (scraper.is_cancelled() or errors) and running:
+                frontier.request_cancel()
+
+            scraper.pages_done, scraper.current_page, _ = frontier.progress()
+            scraper.update_progress()
+    finally:
+        if any(process.poll() is None for process in processes.values()):
+            frontier.request_cancel()
+        for process in processes.values():
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+
+    frontier.reset_in_flight()
+    scraper.pages_done, scraper.current_page, _ = frontier.progress()
+    merge_leftover_shards(scraper)
+    scraper.update_progress()
+
+    if errors:
+        raise RuntimeError("; ".join(f"shard {shard}: {error}" for shard, error in sorted(errors.items())))
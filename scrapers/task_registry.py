@@ -0,0 +1,233 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from .job_store import FINISHED_STATES, MemoryJobStore
+
+logger = logging.getLogger(__name__)
+
+# États d'une tâche prise en charge par un processus
+ACTIVE_STATES = ('queued', 'running')
+
+INTERRUPTED_MESSAGE = 'Tâche interrompue par un redémarrage du serveur'
+
+
+class TaskRegistry:
+    """Registre thread-safe de l'état des tâches
+
+    Les tâches sont conservées dans un stockage interchangeable (voir
+    job_store) : en mémoire pour un seul processus, ou dans SQLite pour que
+    plusieurs workers gunicorn partagent statuts, historique et annulations.
+
+    Les rapports de progression fréquents passent par report_progress() :
+    avec un stockage partagé, ils sont regroupés en mémoire et écrits par
+    lots toutes les flush_interval secondes. Les autres mises à jour sont
+    écrites immédiatement, après les progressions en attente de la tâche.
+
+    Chaque tâche en attente ou en cours porte l'identifiant du processus qui
+    l'exécute (owner). Un processus qui ne donne plus signe de vie depuis
+    heartbeat_timeout secondes, ou qui n'existe plus sur cette machine, a
+    laissé ses tâches orphelines : recover_orphans() les passe en erreur.
+    """
+
+    def __init__(self, max_finished=500, store=None, flush_interval=0.5, poll_interval=0.5,
+                 heartbeat_timeout=60):
+        self.store = store if store is not None else MemoryJobStore(max_finished)
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval  # Relecture du stockage partagé par les observateurs
+        self.heartbeat_timeout = heartbeat_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)  # Signalé à chaque modification locale
+        # Sérialise les écritures du processus : un lot ne peut pas écraser une mise à jour plus récente
+        self.write_lock = threading.Lock()
+        self.pending = {}  # identifiant -> champs de progression non encore écrits
+        self.pending_versions = {}  # identifiant -> rapports reçus, pour réveiller les observateurs
+        self.flusher = None
+        self.heartbeat()
+
+    @staticmethod
+    def new_task_id(task_type):
+        """Génère un identifiant unique, préfixé par le type de tâche"""
+        return f"{task_type}_{uuid.uuid4().hex}"
+
+    def create(self, task_id, task_type, **fields):
+        """Enregistre une nouvelle tâche"""
+        task = dict(fields, type=task_type)
+        task.setdefault('status', 'queued')
+        if task['status'] in ACTIVE_STATES:
+            task['owner'] = self.owner
+        with self.write_lock:
+            _, task = self.store.create(task_id, task)
+        self.notify()
+        return task
+
+    def get(self, task_id):
+        """Retourne une copie de l'état d'une tâche, ou None"""
+        return self.get_versioned(task_id)[1]
+
+    def update(self, task_id, **fields):
+        """Met à jour atomiquement les champs d'une tâche"""
+        with self.write_lock:
+            with self.lock:
+                pending = self.pending.pop(task_id, None)
+            if pending:
+                fields = dict(pending, **fields)
+            if fields.get('status') in ACTIVE_STATES:
+                fields = dict(fields, owner=self.owner)
+            _, task = self.store.update(task_id, fields)
+        self.notify()
+        return task
+
+    def report_progress(self, task_id, **fields):
+        """Enregistre des champs de progression, écrits par lots avec un stockage partagé"""
+        if not self.store.shared:
+            return self.update(task_id, **fields)
+
+        with self.lock:
+            self.pending.setdefault(task_id, {}).update(fields)
+            self.pending_versions[task_id] = self.pending_versions.get(task_id, 0) + 1
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self.flush_loop, name="task-progress-flusher", daemon=True)
+                self.flusher.start()
+            self.changed.notify_all()
+
+    def flush(self):
+        """Écrit en une transaction les progressions en attente"""
+        with self.write_lock:
+            with self.lock:
+                updates, self.pending = self.pending, {}
+            if updates:
+                self.store.update_many(updates)
+
+    def flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Impossible d'enregistrer la progression des tâches: {e}")
+
+    def remove(self, task_id):
+        """Supprime une tâche du registre"""
+        with self.write_lock:
+            with self.lock:
+                self.pending.pop(task_id, None)
+                self.pending_versions.pop(task_id, None)
+            removed = self.store.remove(task_id)
+        self.notify()
+        return removed
+
+    def notify(self):
+        """Réveille les observateurs du processus"""
+        with self.changed:
+            self.changed.notify_all()
+
+    def with_pending(self, task_id, task):
+        """Ajoute à la tâche les progressions pas encore écrites (verrou tenu)"""
+        pending = self.pending.get(task_id)
+        if task is not None and pending:
+            task.update(pending)
+        return task
+
+    def get_versioned(self, task_id):
+        """Retourne (version, copie de la tâche) ou (0, None)
+
+        La version combine celle du stockage et le nombre de progressions
+        reçues localement : elle change à chaque modification visible.
+        """
+        with self.lock:
+            version, task = self.store.get(task_id)
+            return (version, self.pending_versions.get(task_id, 0)), self.with_pending(task_id, task)
+
+    def wait_for_change(self, task_id, version, timeout=None):
+        """Attend que la tâche dépasse la version donnée
+
+        Retourne (version, copie de la tâche), ou (version, None) si la tâche
+        n'existe pas ou plus. La version est inchangée si le délai expire.
+        Les modifications faites par d'autres processus sont détectées en
+        relisant le stockage toutes les poll_interval secondes.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.changed:
+            while True:
+                current, task = self.get_versioned(task_id)
+                if current != version or task is None:
+                    return current, task
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return current, task
+                if self.store.shared:
+                    remaining = self.poll_interval if remaining is None else min(remaining, self.poll_interval)
+                self.changed.wait(remaining)
+
+    def list(self, status=None, task_type=None):
+        """Liste (identifiant, état) des tâches filtrées par état et/ou type"""
+        tasks = self.store.list(status=status, task_type=task_type)
+        with self.lock:
+            return [(task_id, self.with_pending(task_id, task)) for task_id, task in tasks]
+
+    def count(self, status):
+        """Nombre de tâches dans un état donné"""
+        return self.store.count(status)
+
+    def heartbeat(self):
+        """Signale que ce processus est toujours vivant"""
+        self.store.heartbeat(self.owner, time.time())
+
+    def live_owners(self):
+        return self.store.live_owners(time.time() - self.heartbeat_timeout)
+
+    def is_orphaned(self, task, live_owners=None):
+        """Indique si une tâche en attente ou en cours n'est plus exécutée par aucun processus"""
+        if task is None or task.get('status') not in ACTIVE_STATES:
+            return False
+        owner = task.get('owner')
+        if owner == self.owner:
+            return False
+        if not owner:
+            return True
+        host, _, rest = owner.partition(':')
+        pid = rest.partition(':')[0]
+        if host == socket.gethostname() and pid.isdigit() and not process_alive(int(pid)):
+            return True
+        if live_owners is None:
+            live_owners = self.live_owners()
+        return owner not in live_owners
+
+    def interrupt(self, task_id):
+        """Passe en erreur une tâche orpheline, pour qu'elle puisse être relancée ou reprise"""
+        logger.warning(f"Tâche {task_id} interrompue: son processus n'existe plus")
+        return self.update(
+            task_id,
+            status='error',
+            error=INTERRUPTED_MESSAGE,
+            completed_at=datetime.now().isoformat()
+        )
+
+    def recover_orphans(self):
+        """Passe en erreur les tâches laissées en attente ou en cours par un processus arrêté"""
+        live_owners = self.live_owners()
+        recovered = []
+        for status in ACTIVE_STATES:
+            for task_id, task in self.list(status=status):
+                if self.is_orphaned(task, live_owners):
+                    self.interrupt(task_id)
+                    recovered.append(task_id)
+        return recovered
+
+
+def process_alive(pid):
+    """Indique si un processus de cette machine existe (toujours vrai hors POSIX)"""
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
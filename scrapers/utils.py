@@ -1,10 +1,14 @@
+import csv
+import io
 import os
 import re
 import time
 import shutil
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from fnmatch import fnmatchcase
 from datetime import datetime, timedelta
 import logging
+from .blob_store import BlobStore
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +45,47 @@ def is_allowed_domain(url):
     
     return True
 
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url, tracking_params=None):
+    """Forme canonique d'une URL pour la déduplication du crawl
+
+    Supprime le fragment, trie les paramètres de requête, retire les
+    paramètres de suivi (motifs de Config.TRACKING_PARAMS par défaut, ex:
+    'utm_*'), met le schéma et l'hôte en minuscules et retire le port par
+    défaut. La barre oblique finale est conservée : /docs et /docs/ sont
+    des documents distincts pour la résolution de leurs liens relatifs.
+    """
+    if tracking_params is None:
+        from config import Config
+        tracking_params = Config.TRACKING_PARAMS
+
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+
+    host = (parsed.hostname or '').lower()
+    if ':' in host:
+        host = f"[{host}]"
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    if parsed.username:
+        userinfo = parsed.username + (f":{parsed.password}" if parsed.password else '')
+        netloc = f"{userinfo}@{netloc}"
+
+    path = parsed.path or '/'
+
+    params = [
+        (name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not any(fnmatchcase(name.lower(), pattern) for pattern in tracking_params)
+    ]
+    query = urlencode(sorted(params))
+    return urlunparse((scheme, netloc, path, parsed.params, query, ''))
+
 def get_file_extension(content_type):
     """Détermine l'extension de fichier à partir du content-type"""
     content_type = content_type.lower().split(';')[0].strip()
@@ -158,6 +203,14 @@ def cleanup_old_downloads(downloads_folder, max_age_hours=24):
                     except Exception as e:
                         logger.error(f"Erreur lors de la suppression de {task_path}: {e}")
         
+        # Supprimer les blobs qui ne sont plus référencés par aucune tâche
+        blobs_folder = os.path.join(downloads_folder, 'blobs')
+        if os.path.exists(blobs_folder):
+            BlobStore(blobs_folder).collect_garbage([
+                os.path.join(downloads_folder, 'web_content'),
+                os.path.join(downloads_folder, 'youtube_content')
+            ], partial_max_age_seconds=max_age_hours * 3600)
+        
         # Nettoyer aussi les fichiers ZIP
         for file in os.listdir(downloads_folder):
             if file.endswith('.zip'):
@@ -218,6 +271,16 @@ def extract_youtube_id(url):
     
     return None
 
+def parse_url_list(text):
+    """Extrait les URLs d'une liste collée ou d'un fichier texte/CSV (une ou plusieurs par ligne)"""
+    urls = []
+    for row in csv.reader(io.StringIO(text)):
+        for cell in row:
+            for value in cell.split():
+                if value.startswith(('http://', 'https://', 'www.', 'youtube.com', 'youtu.be')):
+                    urls.append(value)
+    return urls
+
 def create_progress_bar(current, total, bar_length=50):
     """Crée une barre de progression en ASCII"""
     if total == 0:
@@ -1,38 +1,109 @@
-from selenium import webdriver 
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import os
-import time
+import filecmp
+import json
+import shutil
+import threading
 import requests
 import re
 import hashlib
+import tempfile
 import urllib3
-from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 import ssl
 import certifi
 import logging
-from .utils import is_allowed_domain, sanitize_filename, get_file_extension
+from .utils import is_allowed_domain, sanitize_filename, get_file_extension, canonicalize_url
+from .frontier import CrawlFrontier
+from .seen_set import create_seen_set
+from .html_parser import (
+    parse_html, collect_references, parse_srcset, build_srcset, detect_html_encoding, visible_text
+)
+from .driver_pool import create_chrome_driver, is_driver_alive
+from .readiness import wait_for_page_ready, install_network_hook
+from .blob_store import write_manifest, read_manifest
+from .checkpoint import (
+    JOURNAL_NAME, read_checkpoint, write_checkpoint, append_journal, read_journal, truncate_journal, remove_journal
+)
+from .sharded_crawl import run_sharded_crawl, merge_leftover_shards, shard_checkpoint_name, shard_journal_name
+from .http_cache import CachingSession
+from .resume import PartialDownload
+from .rate_limiter import HostRateLimiter, RateLimitedAdapter
+from .asset_cache import AssetCache
+
+# Attributs des noeuds racines typiques des applications monopages
+SPA_ROOT_ATTRIBUTES = [
+    {'id': 'root'},
+    {'id': 'app'},
+    {'id': '__next'},
+    {'id': '__nuxt'},
+    {'data-reactroot': True},
+    {'ng-version': True},
+    {'ng-app': True},
+]
+
+# Manifeste des différences écrit par un crawl incrémental
+CHANGES_MANIFEST_NAME = 'changes.json'
+
+
+class PageNotModified(Exception):
+    """Le serveur a confirmé (304) que la page n'a pas changé depuis le crawl de référence"""
+
+
+def add_counts(target, counts):
+    """Ajoute les compteurs de counts à ceux de target"""
+    for name, value in counts.items():
+        target[name] = target.get(name, 0) + value
+    return target
+
+
+# Taille des blocs lus lors du téléchargement des ressources
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# En dessous de cette quantité de texte visible, la page est considérée vide
+MIN_STATIC_TEXT_LENGTH = 50
 
 class WebScraper:
-    def __init__(self, output_folder):
+    def __init__(self, output_folder, driver_pool=None, blob_store=None, http_cache=None):
         self.output_folder = output_folder
+        self.driver_pool = driver_pool
+        self.blob_store = blob_store
+        self.http_cache = http_cache
+        self.blob_manifest = {}  # Chemin relatif -> empreinte SHA-256
+        self.driver = None
+        self.driver_pages = 0
         self.css_folder = os.path.join(output_folder, "css")
         self.js_folder = os.path.join(output_folder, "js")
         self.images_folder = os.path.join(output_folder, "images")
         self.fonts_folder = os.path.join(output_folder, "fonts")
-        self.visited_urls = set()
+        self.visited_urls = create_seen_set()  # Pages traitées, mémorisées par empreinte (voir seen_set)
         self.base_domain = ""
         self.files_count = 0
         self.total_size = 0
         self.progress_callback = None
+        self.cancel_event = None  # threading.Event signalant l'annulation de la tâche
         self.current_page = 0
+        self.pages_done = 0
         self.total_pages_estimate = 1
+        self.frontier = None
+        self.start_url = None
+        self.page_meta = {}  # URL -> fichier, empreinte, validateurs et ressources de la page
+        self.page_validators = {}  # URL -> validateurs HTTP de la dernière réponse
+        self.baseline_pages = {}  # page_meta du crawl de référence (mode incrémental)
+        self.baseline_manifest = {}
+        self.gone_pages = set()  # Pages de référence disparues (404/410)
+        self.changes = {'changed': set(), 'added': set(), 'unchanged': set()}
+        self.changes_manifest = None
+        self.last_checkpoint_pages = 0
+        self.journal = []  # Événements du crawl pas encore écrits dans le journal
+        self.journal_size = 0  # Taille du journal couverte par le dernier point de reprise
+        self.shard_index = None  # Numéro du processus dans un crawl réparti
+        self.shard_stats = {}  # Compteurs fusionnés depuis les processus d'un crawl réparti
         
         # Options configurables
         self.max_pages = 10
@@ -43,24 +114,73 @@ class WebScraper:
         self.follow_external_links = False
         self.max_file_size = 10 * 1024 * 1024  # 10MB
         self.max_total_size = 100 * 1024 * 1024  # 100MB
-        self.delay = 1  # Délai entre les requêtes
+        self.delay = 1  # Délai moyen entre deux requêtes vers un même hôte (0 = illimité)
+        self.rate_burst = 4  # Requêtes consécutives autorisées vers un hôte avant limitation
+        self.domain_rate_limits = {}  # Débit (requêtes/s) imposé par domaine, None = illimité
+        self.rate_limiter = None
+        self.max_workers = 8  # Téléchargements simultanés de ressources
+        self.max_connections_per_host = 4  # Connexions simultanées par hôte
+        self.resume_attempts = 2  # Reprises (requêtes Range) après une coupure réseau
+        self.workers = 1  # Pages traitées en parallèle
+        self.max_depth = None  # Profondeur maximale de crawl (None = illimitée)
+        self.render_mode = "auto"  # "static", "browser" ou "auto"
+        self.domain_render_modes = {}  # Mode forcé par domaine
+        self.render_fallback_pages = 3  # Pages consécutives à rendre avant de passer tout le domaine à Chrome
+        self.render_streaks = {}  # Domaine -> pages consécutives ayant eu besoin de Chrome (mode "auto")
+        self.render_stats = {'static': 0, 'browser': 0}
+        self.wait_strategy = "ready_state"  # "ready_state", "network_idle", "mutation_idle" ou "selector"
+        self.wait_selector = None  # Sélecteur CSS pour la stratégie "selector"
+        self.wait_timeout = 10  # Délai maximal d'attente par page (secondes)
+        self.wait_quiet_period = 0.5  # Durée sans activité pour les stratégies *_idle
+        self.page_wait_times = {}  # Temps d'attente mesuré par page
+        self.parser_backend = "auto"  # "auto" (lxml si disponible), "lxml" ou "html.parser"
+        self.tracking_params = None  # Paramètres de suivi retirés des URLs (None = Config.TRACKING_PARAMS)
+        self.seen_set = "hash"  # "hash" ou "bloom" pour la déduplication des URLs découvertes
+        self.bloom_capacity = 1000000
+        self.bloom_error_rate = 0.001
+        self.checkpoint_every = 10  # Pages traitées entre deux points de reprise (0 = fin seulement)
+        self.checkpoint_metadata = {}  # Informations de l'appelant conservées avec le point de reprise
+        self.baseline_folder = None  # Dossier d'une tâche précédente pour un crawl incrémental
+        
+        # Verrou protégeant les compteurs et les fichiers écrits
+        self.size_lock = threading.Lock()
+        # Le driver Selenium ne peut charger qu'une page à la fois
+        self.driver_lock = threading.Lock()
+        # Modes de rendu par domaine, modifiés pendant le crawl par les workers
+        self.render_lock = threading.Lock()
+        self.written_paths = set()
+        self.host_semaphores = {}
+        self.executor = None
+        # Ressources déjà résolues pendant le crawl (URL, contenu, échecs)
+        self.asset_cache = AssetCache()
         
         self.create_folders()
         self.session = self.create_session()
-        self.setup_driver()
+        if self.driver_pool is None:
+            self.setup_driver()
         
         # Configuration du logging
         self.logger = logging.getLogger(__name__)
 
     def create_session(self):
-        """Crée une session requests configurée avec retry et SSL"""
-        session = requests.Session()
+        """Crée une session requests configurée avec retry, SSL, cache HTTP et limitation par hôte"""
+        if self.http_cache is not None:
+            session = CachingSession(self.http_cache)
+        else:
+            session = requests.Session()
+        # 429 et 503 sont gérés par le limiteur de débit (Retry-After, ralentissement)
         retry_strategy = Retry(
             total=3,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 504],
+            respect_retry_after_header=False,
+        )
+        adapter = RateLimitedAdapter(
+            self.get_rate_limiter,
+            cancel_event_getter=lambda: self.cancel_event,
+            max_retries=retry_strategy,
+            pool_maxsize=max(self.max_workers, self.max_connections_per_host)
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         session.verify = certifi.where()
@@ -72,26 +192,45 @@ class WebScraper:
         
         return session
 
+    def get_rate_limiter(self):
+        """Retourne le limiteur de débit par hôte, créé au premier appel avec les options courantes"""
+        with self.size_lock:
+            if self.rate_limiter is None:
+                self.rate_limiter = HostRateLimiter(
+                    rate=1 / self.delay if self.delay > 0 else None,
+                    burst=self.rate_burst,
+                    domain_rates=self.domain_rate_limits
+                )
+            return self.rate_limiter
+
     def setup_driver(self):
         """Configure le driver Chrome"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--ignore-certificate-errors")
-        chrome_options.add_argument("--ignore-ssl-errors")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        try:
-            from chromedriver_py import binary_path
-            service = Service(binary_path)
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        except ImportError:
-            # Fallback si chromedriver_py n'est pas disponible
-            self.driver = webdriver.Chrome(options=chrome_options)
-        
-        self.driver.set_page_load_timeout(30)
+        self.driver = create_chrome_driver()
+        self.driver_pages = 0
+
+    def get_driver(self):
+        """Retourne le driver de la tâche, emprunté au pool au premier besoin"""
+        if self.driver is None:
+            if self.driver_pool is not None:
+                self.driver = self.driver_pool.acquire()
+                self.driver_pages = 0
+            else:
+                self.setup_driver()
+        return self.driver
+
+    def release_driver(self, broken=False):
+        """Rend le driver au pool, ou le ferme s'il n'en provient pas"""
+        if self.driver is None:
+            return
+        if self.driver_pool is not None:
+            self.driver_pool.release(self.driver, pages=self.driver_pages, broken=broken)
+        else:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self.logger.warning(f"Erreur lors de la fermeture du driver: {e}")
+        self.driver = None
+        self.driver_pages = 0
 
     def create_folders(self):
         """Crée les dossiers nécessaires pour organiser les fichiers"""
@@ -109,18 +248,38 @@ class WebScraper:
         """Définit le callback pour suivre le progrès"""
         self.progress_callback = callback
 
+    def is_cancelled(self):
+        """Indique si l'arrêt de la tâche a été demandé"""
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
     def update_progress(self):
-        """Met à jour le progrès"""
-        if self.progress_callback and self.total_pages_estimate > 0:
-            progress = min((self.current_page / self.total_pages_estimate) * 100, 100)
-            self.progress_callback(self.current_page, self.total_pages_estimate)
+        """Met à jour le progrès à partir de l'état de la frontière"""
+        pending = len(self.frontier) if self.frontier is not None else 0
+        self.total_pages_estimate = max(min(self.max_pages, self.current_page + pending), 1)
+        if self.progress_callback:
+            self.progress_callback(self.pages_done, self.total_pages_estimate)
 
-    def generate_filename(self, content, extension):
-        """Génère un nom de fichier unique basé sur le contenu"""
-        if isinstance(content, str):
-            content = content.encode()
-        hash_object = hashlib.md5(content)
-        return f"{hash_object.hexdigest()[:8]}{extension}"
+    def store_inline_content(self, content, folder, extension):
+        """Enregistre un style ou script inline, nommé d'après son empreinte
+
+        Un contenu déjà rencontré pendant le crawl réutilise le fichier
+        existant sans nouvelle écriture. Retourne le chemin relatif, ou None
+        si les contraintes de taille ne sont pas respectées.
+        """
+        data = content.encode()
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.asset_cache.path_for_digest(digest)
+        if existing is not None:
+            return existing
+
+        local_path = os.path.join(folder, f"{digest[:16]}{extension}")
+        reserved = self.reserve_file(local_path, len(data))
+        if reserved is None:
+            return None
+        if reserved:
+            self.write_file(local_path, data)
+            self.logger.info(f"Contenu inline extrait: {local_path}")
+        return self.asset_cache.add_digest(digest, os.path.relpath(local_path, self.output_folder))
 
     def check_file_constraints(self, file_size):
         """Vérifie les contraintes de taille de fichier"""
@@ -134,64 +293,199 @@ class WebScraper:
         
         return True
 
+    def reserve_file(self, local_path, file_size):
+        """Réserve atomiquement la place d'un fichier dans le budget de la tâche
+
+        Retourne True si le fichier doit être écrit, False s'il existe déjà,
+        None si les contraintes de taille ne sont pas respectées.
+        """
+        with self.size_lock:
+            if local_path in self.written_paths or os.path.exists(local_path):
+                return False
+            if not self.check_file_constraints(file_size):
+                return None
+            self.written_paths.add(local_path)
+            self.files_count += 1
+            self.total_size += file_size
+            return True
+
+    def write_file(self, local_path, content):
+        """Écrit un fichier de la tâche, via le store partagé s'il est configuré"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        if self.blob_store is None:
+            with open(local_path, 'wb') as f:
+                f.write(content)
+            return
+
+        digest = self.blob_store.put_bytes(content)
+        self.blob_store.link(digest, local_path)
+        with self.size_lock:
+            self.add_to_manifest(os.path.relpath(local_path, self.output_folder), digest)
+
+    def write_page(self, html_path, html):
+        """Écrit le HTML d'une page dans un fichier temporaire, mis en place atomiquement
+
+        Le fichier existant peut être un lien physique vers le crawl de
+        référence ou vers un blob : il est remplacé, jamais réécrit sur place.
+        """
+        tmp_path = f"{html_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, html_path)
+
+    def stream_to_temp_file(self, response, url, tmp_folder, partial=None):
+        """Copie le corps de la réponse dans un fichier temporaire en le hachant
+
+        Avec un fichier partiel, l'écriture reprend après les octets déjà reçus
+        (réponse 206) et le partiel est conservé si le transfert est coupé.
+        Le transfert est interrompu dès que le fichier dépasse max_file_size ou
+        le budget restant de la tâche. Retourne (chemin, sha256, taille) ou None.
+        """
+        hash_object = hashlib.sha256()
+        if partial is not None:
+            f, size = partial.open(response, hash_object)
+            tmp_path = partial.path
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=tmp_folder, prefix='.', suffix='.part')
+            f, size = os.fdopen(fd, 'wb'), 0
+
+        try:
+            with f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_file_size or size > self.max_total_size - self.total_size:
+                        self.logger.warning(f"Téléchargement interrompu, limite de taille dépassée: {url}")
+                        self.discard_temp_file(tmp_path, partial)
+                        return None
+                    hash_object.update(chunk)
+                    f.write(chunk)
+        except Exception:
+            # Transfert coupé : le partiel validé est gardé pour une reprise
+            if partial is None or not partial.resumable:
+                self.discard_temp_file(tmp_path, partial)
+            raise
+
+        if partial is not None:
+            if not partial.is_complete(size):
+                self.logger.warning(f"Taille incohérente pour {url}, fichier partiel supprimé")
+                partial.discard()
+                return None
+            tmp_path = partial.finish()
+        return tmp_path, hash_object.hexdigest(), size
+
+    def discard_temp_file(self, tmp_path, partial=None):
+        if partial is not None:
+            partial.discard()
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    def commit_file(self, tmp_path, digest, local_path):
+        """Met en place atomiquement un fichier téléchargé"""
+        if self.blob_store is None:
+            os.replace(tmp_path, local_path)
+            return
+
+        self.blob_store.put_file(tmp_path, digest)
+        self.blob_store.link(digest, local_path)
+        with self.size_lock:
+            self.add_to_manifest(os.path.relpath(local_path, self.output_folder), digest)
+
+    def add_to_manifest(self, relative_path, digest):
+        """Référence un blob dans le manifeste de la tâche (verrou size_lock tenu)"""
+        self.blob_manifest[relative_path] = digest
+        self.journal_event('blob', path=relative_path, digest=digest)
+
+    def journal_event(self, kind, **fields):
+        """Ajoute un événement au journal, écrit au prochain point de reprise (verrou size_lock tenu)"""
+        fields['type'] = kind
+        self.journal.append(fields)
+
+    def save_blob_manifest(self):
+        """Enregistre la liste des blobs référencés par la tâche"""
+        if self.blob_store is not None and self.blob_manifest:
+            with self.size_lock:
+                manifest = dict(self.blob_manifest)
+            write_manifest(self.output_folder, manifest)
+
+    def get_host_semaphore(self, url):
+        """Retourne le sémaphore limitant les connexions vers l'hôte de l'URL"""
+        host = urlparse(url).netloc
+        with self.size_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.max_connections_per_host)
+            return self.host_semaphores[host]
+
+    def get_executor(self):
+        """Retourne le pool de threads utilisé pour les téléchargements"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="asset-download"
+            )
+        return self.executor
+
     def download_external_file(self, url, folder, file_type="unknown"):
+        """Télécharge un fichier externe, au plus une fois par crawl
+
+        Les URLs déjà résolues (ou en échec) pendant la tâche sont servies
+        par le cache de ressources sans nouvelle requête.
+        """
+        # Vérifier si le type de fichier doit être téléchargé
+        if file_type == "image" and not self.download_images:
+            return None
+        elif file_type == "css" and not self.download_css:
+            return None
+        elif file_type == "js" and not self.download_js:
+            return None
+        elif file_type == "font" and not self.download_fonts:
+            return None
+        
+        return self.asset_cache.get_or_fetch(url, lambda: self.fetch_external_file(url, folder))
+
+    def fetch_external_file(self, url, folder):
         """Télécharge un fichier externe avec gestion des erreurs améliorée"""
         try:
-            # Vérifier si le type de fichier doit être téléchargé
-            if file_type == "image" and not self.download_images:
-                return None
-            elif file_type == "css" and not self.download_css:
-                return None
-            elif file_type == "js" and not self.download_js:
-                return None
-            elif file_type == "font" and not self.download_fonts:
-                return None
-            
-            # Requête HEAD pour vérifier la taille
-            head_response = self.session.head(url, timeout=10)
-            content_length = head_response.headers.get('content-length')
-            if content_length and not self.check_file_constraints(int(content_length)):
-                return None
+            tmp_folder = self.blob_store.tmp_folder if self.blob_store is not None else folder
+            partial = PartialDownload(tmp_folder, url)
+            if not partial.claim():
+                # Même URL en cours de téléchargement par un autre thread
+                partial = None
             
-            response = self.session.get(url, timeout=10, stream=True)
-            response.raise_for_status()
-            
-            # Vérifier la taille réelle
-            content_size = len(response.content)
-            if not self.check_file_constraints(content_size):
-                return None
-            
-            parsed_url = urlparse(url)
-            file_name = os.path.basename(parsed_url.path)
-            
-            # Génération de nom de fichier si nécessaire
-            if not file_name or '.' not in file_name:
-                content_type = response.headers.get('content-type', '').lower()
-                if 'javascript' in content_type:
-                    file_name = self.generate_filename(response.content, '.js')
-                elif 'css' in content_type:
-                    file_name = self.generate_filename(response.content, '.css')
-                elif 'image' in content_type:
-                    extension = get_file_extension(content_type)
-                    file_name = self.generate_filename(response.content, extension)
-                elif 'font' in content_type:
-                    extension = get_file_extension(content_type)
-                    file_name = self.generate_filename(response.content, extension)
-                else:
-                    self.logger.warning(f"Type de contenu non supporté pour {url}: {content_type}")
+            try:
+                fetched = self.fetch_to_temp_file(url, tmp_folder, partial)
+                if fetched is None:
                     return None
-            
-            file_name = sanitize_filename(file_name)
-            local_path = os.path.join(folder, file_name)
-            
-            if not os.path.exists(local_path):
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                self.files_count += 1
-                self.total_size += content_size
-                self.logger.info(f"Fichier téléchargé: {local_path}")
-            
-            return os.path.relpath(local_path, self.output_folder)
+                tmp_path, digest, content_size, file_name, extension = fetched
+                
+                # Contenu identique déjà obtenu via une autre URL
+                existing = self.asset_cache.path_for_digest(digest)
+                if existing is not None:
+                    os.remove(tmp_path)
+                    return existing
+                
+                if extension is not None:
+                    file_name = f"{digest[:16]}{extension}"
+                
+                file_name = sanitize_filename(file_name)
+                local_path = os.path.join(folder, file_name)
+                
+                # Vérifier la taille réelle et réserver la place dans le budget
+                reserved = self.reserve_file(local_path, content_size)
+                if not reserved:
+                    os.remove(tmp_path)
+                    if reserved is None:
+                        return None
+                else:
+                    self.commit_file(tmp_path, digest, local_path)
+                    self.logger.info(f"Fichier téléchargé: {local_path}")
+                
+                return self.asset_cache.add_digest(digest, os.path.relpath(local_path, self.output_folder))
+            finally:
+                # Libéré après la mise en place : le fichier terminé porte encore le nom du partiel
+                if partial is not None:
+                    partial.release()
             
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Erreur lors du téléchargement de {url}: {e}")
@@ -199,110 +493,370 @@ class WebScraper:
             self.logger.error(f"Erreur inattendue lors du téléchargement de {url}: {e}")
         return None
 
-    def extract_inline_styles(self, soup):
-        """Extrait les styles CSS inline"""
+    def fetch_to_temp_file(self, url, tmp_folder, partial=None):
+        """Télécharge une ressource dans un fichier temporaire, avec reprise si possible
+
+        Une coupure réseau en cours de transfert est suivie d'une nouvelle
+        requête Range depuis le dernier octet reçu. Retourne
+        (chemin, sha256, taille, nom de fichier, extension) ou None.
+        """
+        for attempt in range(self.resume_attempts + 1):
+            headers = partial.request_headers() if partial is not None else {}
+            try:
+                with self.get_host_semaphore(url):
+                    # Une seule requête GET en streaming, sans HEAD préalable
+                    response = self.session.get(url, timeout=10, stream=True, headers=headers)
+                    try:
+                        if response.status_code == 416 and partial is not None:
+                            # Partiel incohérent avec la ressource : repartir de zéro
+                            partial.discard()
+                            continue
+                        response.raise_for_status()
+                        
+                        content_length = response.headers.get('content-length')
+                        if content_length and response.status_code != 206 \
+                                and not self.check_file_constraints(int(content_length)):
+                            return None
+                        
+                        file_name, extension = self.resolve_file_name(url, response)
+                        if file_name is None:
+                            return None
+                        
+                        streamed = self.stream_to_temp_file(response, url, tmp_folder, partial)
+                        if streamed is None:
+                            return None
+                        tmp_path, digest, content_size = streamed
+                        
+                        if self.http_cache is not None and response.status_code == 200:
+                            self.session.store_response(url, response, body_path=tmp_path)
+                    finally:
+                        response.close()
+                return tmp_path, digest, content_size, file_name, extension
+            
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout) as e:
+                if partial is None or not partial.resumable or attempt == self.resume_attempts:
+                    raise
+                partial.load()
+                self.logger.warning(f"Transfert interrompu pour {url} ({e}), reprise à l'octet {partial.offset}")
+        return None
+
+    def resolve_file_name(self, url, response):
+        """Nom de fichier d'une ressource et extension déduite du content-type si besoin
+
+        Retourne (None, None) si le type de contenu n'est pas pris en charge.
+        """
+        parsed_url = urlparse(url)
+        file_name = os.path.basename(parsed_url.path)
+        extension = None
+        
+        # Extension déduite du content-type si l'URL n'a pas de nom de fichier
+        if not file_name or '.' not in file_name:
+            content_type = response.headers.get('content-type', '').lower()
+            if 'javascript' in content_type:
+                extension = '.js'
+            elif 'css' in content_type:
+                extension = '.css'
+            elif 'image' in content_type or 'font' in content_type:
+                extension = get_file_extension(content_type)
+            else:
+                self.logger.warning(f"Type de contenu non supporté pour {url}: {content_type}")
+                return None, None
+        return file_name, extension
+
+    def extract_inline_styles(self, soup, references):
+        """Extrait les styles CSS inline, retourne les chemins locaux référencés par la page"""
+        local_paths = []
         if not self.download_css:
-            return
+            return local_paths
             
-        style_tags = soup.find_all('style')
-        for idx, style in enumerate(style_tags):
-            if style.string:
-                filename = self.generate_filename(style.string, '.css')
-                css_path = os.path.join(self.css_folder, filename)
-                
-                if not os.path.exists(css_path):
-                    with open(css_path, 'w', encoding='utf-8') as f:
-                        f.write(style.string)
-                    self.files_count += 1
-                    self.logger.info(f"Style CSS extrait: {css_path}")
-                
-                new_link = soup.new_tag('link', rel='stylesheet', href=f'css/{filename}')
-                style.replace_with(new_link)
+        for reference in references.inline_styles:
+            local_path = self.store_inline_content(reference.value, self.css_folder, '.css')
+            if local_path is None:
+                continue
+            
+            new_link = soup.new_tag('link', rel='stylesheet', href=local_path)
+            reference.tag.replace_with(new_link)
+            local_paths.append(local_path)
+        return local_paths
 
-    def extract_inline_scripts(self, soup):
-        """Extrait les scripts JS inline"""
+    def extract_inline_scripts(self, soup, references):
+        """Extrait les scripts JS inline, retourne les chemins locaux référencés par la page"""
+        local_paths = []
         if not self.download_js:
-            return
+            return local_paths
             
-        script_tags = soup.find_all('script', string=True)
-        for idx, script in enumerate(script_tags):
-            if script.string and not script.get('src'):
-                filename = self.generate_filename(script.string, '.js')
-                js_path = os.path.join(self.js_folder, filename)
-                
-                if not os.path.exists(js_path):
-                    with open(js_path, 'w', encoding='utf-8') as f:
-                        f.write(script.string)
-                    self.files_count += 1
-                    self.logger.info(f"Script JS extrait: {js_path}")
-                
-                new_script = soup.new_tag('script', src=f'js/{filename}')
-                script.replace_with(new_script)
-
-    def process_external_resources(self, soup, base_url):
-        """Traite les ressources externes"""
-        # CSS
-        for link in soup.find_all('link', href=True):
-            if link['href'].endswith('.css') or link.get('rel') == ['stylesheet']:
-                css_url = urljoin(base_url, link['href'])
-                local_path = self.download_external_file(css_url, self.css_folder, "css")
-                if local_path:
-                    link['href'] = local_path
-
-        # JavaScript
-        for script in soup.find_all('script', src=True):
-            js_url = urljoin(base_url, script['src'])
-            local_path = self.download_external_file(js_url, self.js_folder, "js")
-            if local_path:
-                script['src'] = local_path
+        for reference in references.inline_scripts:
+            local_path = self.store_inline_content(reference.value, self.js_folder, '.js')
+            if local_path is None:
+                continue
+            
+            new_script = soup.new_tag('script', src=local_path)
+            reference.tag.replace_with(new_script)
+            local_paths.append(local_path)
+        return local_paths
 
-        # Images
-        for img in soup.find_all(['img', 'source'], src=True):
-            img_url = urljoin(base_url, img['src'])
-            local_path = self.download_external_file(img_url, self.images_folder, "image")
+    def process_external_resources(self, references, base_url):
+        """Traite les ressources externes
+
+        Les références ont été collectées avant l'extraction des éléments
+        inline : les fichiers locaux créés par celle-ci ne sont donc pas
+        redemandés au serveur. Les téléchargements sont lancés en parallèle
+        dans le pool de threads, puis les attributs de la page sont réécrits
+        une fois tous terminés. Retourne les (url, type, chemin local) des
+        ressources obtenues.
+        """
+        executor = self.get_executor()
+        futures = {}
+
+        def submit(url, file_type):
+            # Une seule requête par ressource distincte
+            key = (url, file_type)
+            if key not in futures:
+                futures[key] = executor.submit(self.download_external_file, url, self.asset_folder(file_type), file_type)
+            return key
+
+        pending = []
+        for reference in references.resources:
+            if reference.value.startswith('data:'):
+                continue
+            pending.append((reference, submit(self.canonicalize(urljoin(base_url, reference.value)), reference.kind)))
+
+        pending_srcsets = []
+        for reference in references.srcsets:
+            if 'data:' in reference.value:
+                continue
+            candidates = [
+                (submit(self.canonicalize(urljoin(base_url, url)), 'image'), url, descriptor)
+                for url, descriptor in parse_srcset(reference.value)
+            ]
+            pending_srcsets.append((reference, candidates))
+
+        for reference, key in pending:
+            local_path = futures[key].result()
             if local_path:
-                img['src'] = local_path
-
-        # Fonts (CSS @font-face)
-        for link in soup.find_all('link', href=True):
-            if any(font_ext in link['href'] for font_ext in ['.woff', '.woff2', '.ttf', '.otf', '.eot']):
-                font_url = urljoin(base_url, link['href'])
-                local_path = self.download_external_file(font_url, self.fonts_folder, "font")
-                if local_path:
-                    link['href'] = local_path
-
-    def scrape_page(self, url):
-        """Scrape une page et enregistre son contenu"""
-        try:
-            if url in self.visited_urls or self.current_page >= self.max_pages:
+                reference.tag[reference.attribute] = local_path
+
+        for reference, candidates in pending_srcsets:
+            rewritten = []
+            for key, url, descriptor in candidates:
+                rewritten.append((futures[key].result() or url, descriptor))
+            reference.tag[reference.attribute] = build_srcset(rewritten)
+        return [[url, file_type, future.result()] for (url, file_type), future in futures.items() if future.result()]
+
+    def asset_folder(self, file_type):
+        """Dossier de la tâche où sont rangées les ressources d'un type"""
+        return {
+            'css': self.css_folder,
+            'font': self.fonts_folder,
+            'js': self.js_folder,
+            'image': self.images_folder,
+        }[file_type]
+
+    def get_render_mode(self, url):
+        """Détermine le mode de rendu à utiliser pour une URL"""
+        domain = urlparse(url).netloc.lower()
+        with self.render_lock:
+            for pattern, mode in self.domain_render_modes.items():
+                if domain == pattern or domain.endswith('.' + pattern):
+                    return mode
+        return self.render_mode
+
+    def record_render_need(self, url, needs_browser):
+        """Compte les pages consécutives d'un domaine rendues par Chrome en mode "auto"
+
+        Une page isolée (peu de texte, racine vide) n'est rendue que pour
+        elle-même : le domaine entier ne passe à Chrome qu'après
+        render_fallback_pages pages consécutives dans ce cas.
+        """
+        domain = urlparse(url).netloc.lower()
+        with self.render_lock:
+            if not needs_browser:
+                self.render_streaks.pop(domain, None)
                 return
+            streak = self.render_streaks.get(domain, 0) + 1
+            self.render_streaks[domain] = streak
+            if streak >= self.render_fallback_pages and domain not in self.domain_render_modes:
+                self.domain_render_modes[domain] = "browser"
+                self.logger.info(f"Rendu JavaScript nécessaire pour le domaine {domain}")
+
+    def needs_rendering(self, soup):
+        """Heuristique : la page analysée a-t-elle besoin de JavaScript pour afficher son contenu ?"""
+        body = soup.body
+        if body is None:
+            return True
+
+        # Racines d'applications monopages laissées vides par le serveur
+        for attrs in SPA_ROOT_ATTRIBUTES:
+            root = body.find(attrs=attrs)
+            if root is not None and not root.get_text(strip=True) and not root.find(True):
+                return True
+
+        noscript_text = " ".join(tag.get_text(" ", strip=True) for tag in body.find_all('noscript'))
+        text_length = len(visible_text(body))
+
+        # Corps quasiment vide sans JavaScript
+        if text_length < MIN_STATIC_TEXT_LENGTH:
+            return True
+
+        # Page qui renvoie surtout vers son contenu <noscript>
+        if len(noscript_text) > text_length:
+            return True
+
+        return False
+
+    def fetch_static(self, url, conditional=True):
+        """Récupère le HTML d'une page directement avec la session requests
+
+        En mode incrémental, la requête porte les validateurs du crawl de
+        référence et lève PageNotModified si le serveur répond 304.
+        Retourne (HTML, URL du document après redirections).
+        """
+        headers = {}
+        baseline_page = self.baseline_pages.get(url) if conditional else None
+        if baseline_page:
+            if baseline_page.get('etag'):
+                headers['If-None-Match'] = baseline_page['etag']
+            if baseline_page.get('last_modified'):
+                headers['If-Modified-Since'] = baseline_page['last_modified']
+
+        response = self.session.get(url, timeout=10, headers=headers)
+        if response.status_code == 304 and headers:
+            raise PageNotModified(url)
+        response.raise_for_status()
+        self.page_validators[url] = {
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+        }
+        content_type = response.headers.get('content-type', '').lower()
+        if content_type and 'html' not in content_type:
+            raise ValueError(f"Contenu non HTML pour {url}: {content_type}")
+        if 'charset' not in content_type:
+            # Sans charset dans l'en-tête, requests suppose ISO-8859-1 pour text/html
+            response.encoding = detect_html_encoding(response.content)
+        return response.text, response.url
+
+    def fetch_with_browser(self, url):
+        """Rend une page avec Chrome, retourne (HTML final, URL du document)"""
+        # Attente du limiteur avant de bloquer le driver
+        self.get_rate_limiter().acquire(url, self.cancel_event)
+        with self.driver_lock:
+            driver = self.get_driver()
+            try:
+                if self.wait_strategy == "network_idle":
+                    install_network_hook(driver)
+                
+                driver.get(url)
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                
+                # Attendre que la page soit prête au lieu d'un délai fixe
+                wait_time, timed_out = wait_for_page_ready(
+                    driver,
+                    strategy=self.wait_strategy,
+                    timeout=self.wait_timeout,
+                    selector=self.wait_selector,
+                    quiet_period=self.wait_quiet_period
+                )
+                with self.size_lock:
+                    self.page_wait_times[url] = round(wait_time, 3)
+                    self.journal_event('wait', url=url, seconds=self.page_wait_times[url])
+                if timed_out:
+                    self.logger.warning(f"Page {url} utilisée avant d'être prête")
+                
+                return driver.page_source, driver.current_url
+            except WebDriverException:
+                # Chrome planté : remplacer le driver pour les pages suivantes
+                if not is_driver_alive(driver):
+                    self.release_driver(broken=True)
+                raise
+            finally:
+                self.record_driver_page()
+
+    def record_driver_page(self):
+        """Compte une page chargée par le driver et le rend au pool s'il doit être recyclé
+
+        Appelé avec driver_lock : une longue tâche en mode navigateur change
+        ainsi de Chrome toutes les max_pages_per_driver pages, sans attendre
+        la fin de la tâche.
+        """
+        if self.driver is None:
+            return
+        self.driver_pages += 1
+        if self.driver_pool is not None and self.driver_pool.needs_recycle(self.driver, self.driver_pages):
+            self.release_driver()
+
+    def fetch_page(self, url, conditional=True):
+        """Récupère le HTML d'une page selon le mode de rendu configuré
+
+        Retourne (HTML, URL du document, arbre analysé ou None), l'URL du
+        document servant de base aux URLs relatives de la page. En mode
+        "auto", l'arbre déjà analysé par l'heuristique de rendu est retourné
+        pour que la page ne soit pas analysée deux fois, et seules les
+        erreurs de transport passent à Chrome : une réponse HTTP en erreur
+        (404, 410...) est levée telle quelle.
+        """
+        mode = self.get_render_mode(url)
 
-            if len(self.visited_urls) == 0:
-                self.base_domain = urlparse(url).netloc
+        if mode in ("static", "auto"):
+            try:
+                html, document_url = self.fetch_static(url, conditional)
+                soup = parse_html(html, self.parser_backend) if mode == "auto" else None
+                needs_browser = soup is not None and self.needs_rendering(soup)
+                if mode == "auto":
+                    self.record_render_need(url, needs_browser)
+                if not needs_browser:
+                    with self.size_lock:
+                        self.render_stats['static'] += 1
+                    return html, document_url, soup
+                self.logger.info(f"Rendu JavaScript nécessaire pour {url}")
+            except requests.exceptions.RequestException as e:
+                if mode == "static" or isinstance(e, requests.exceptions.HTTPError):
+                    raise
+                self.logger.warning(f"Récupération statique impossible pour {url}, passage à Chrome: {e}")
 
+        html, document_url = self.fetch_with_browser(url)
+        with self.size_lock:
+            self.render_stats['browser'] += 1
+        return html, document_url, None
+
+    def scrape_page(self, url, depth=0):
+        """Scrape une page, enregistre son contenu et retourne les liens internes trouvés"""
+        try:
             self.logger.info(f"Démarrage du scraping de {url}...")
-            self.visited_urls.add(url)
-            self.current_page += 1
-            self.update_progress()
 
-            self.driver.get(url)
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+            baseline_page = self.baseline_pages.get(url)
+            try:
+                page_source, document_url, soup = self.fetch_page(url)
+            except PageNotModified:
+                page_source = document_url = soup = None
+            content_hash = hashlib.sha256(page_source.encode('utf-8')).hexdigest() if page_source is not None else None
             
-            # Attendre que les ressources se chargent
-            time.sleep(2)
+            # Page identique au crawl de référence : réutiliser ses fichiers et ses liens
+            if baseline_page is not None and (page_source is None or content_hash == baseline_page.get('hash')):
+                links = self.reuse_baseline_page(url, baseline_page)
+                if links is not None:
+                    return links
+                if page_source is None:
+                    page_source, document_url, soup = self.fetch_page(url, conditional=False)
+                    content_hash = hashlib.sha256(page_source.encode('utf-8')).hexdigest()
             
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            if soup is None:
+                soup = parse_html(page_source, self.parser_backend)
+            # Un seul parcours de l'arbre pour toutes les références à traiter
+            references = collect_references(soup)
+            base_url = self.page_base_url(document_url, references)
             
             self.logger.info("Extraction des styles inline...")
-            self.extract_inline_styles(soup)
+            assets = self.extract_inline_styles(soup, references)
             
             self.logger.info("Extraction des scripts inline...")
-            self.extract_inline_scripts(soup)
+            assets += self.extract_inline_scripts(soup, references)
             
             self.logger.info("Traitement des ressources externes...")
-            self.process_external_resources(soup, url)
+            resources = self.process_external_resources(references, base_url)
+            assets += [local_path for _, _, local_path in resources]
             
             # Sauvegarde de la page HTML
             parsed_url = urlparse(url)
@@ -310,26 +864,158 @@ class WebScraper:
             page_name = sanitize_filename(page_name)
             html_path = os.path.join(self.output_folder, page_name)
             
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(soup.prettify())
+            self.write_page(html_path, soup.prettify())
             
-            self.files_count += 1
+            validators = self.page_validators.pop(url, {})
+            meta = {
+                'file': os.path.relpath(html_path, self.output_folder),
+                'hash': content_hash,
+                'etag': validators.get('etag'),
+                'last_modified': validators.get('last_modified'),
+                'assets': sorted(set(assets)),
+                'resources': sorted(resources),  # (url, type, chemin) revalidés en mode incrémental
+            }
+            if document_url != url:
+                # Base des liens relus dans le fichier lors d'un crawl incrémental
+                meta['document_url'] = document_url
+            change = None
+            if self.baseline_folder:
+                change = 'changed' if baseline_page is not None else 'added'
+            with self.size_lock:
+                self.files_count += 1
+                self.record_page(url, meta, change)
             self.logger.info(f"Page {url} sauvegardée avec succès!")
             
-            # Délai entre les requêtes
-            if self.delay > 0:
-                time.sleep(self.delay)
-            
-            # Suivre les liens internes si configuré
-            if self.current_page < self.max_pages:
-                links = soup.find_all('a', href=True)
-                for link in links:
-                    next_url = urljoin(url, link['href'])
-                    if self.is_internal_link(next_url) and next_url not in self.visited_urls:
-                        self.scrape_page(next_url)
+            # Liens internes à ajouter à la frontière
+            return self.internal_links(references, base_url)
             
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code in (404, 410) and url in self.baseline_pages:
+                with self.size_lock:
+                    self.gone_pages.add(url)
+                    self.journal_event('gone', url=url)
+            self.logger.error(f"Erreur lors du scraping de {url}: {e}")
+            return []
         except Exception as e:
             self.logger.error(f"Erreur lors du scraping de {url}: {e}")
+            return []
+
+    def reuse_baseline_page(self, url, baseline_page):
+        """Reprend une page inchangée et ses ressources depuis le crawl de référence
+
+        Chaque ressource externe est d'abord revalidée par le cache de
+        ressources : requête conditionnelle (304) avec le cache HTTP, une
+        seule fois par crawl pour les ressources partagées. Les autres
+        fichiers sont liés (ou copiés) sans nouvelle écriture de contenu.
+        Retourne les liens de la page, relus dans son fichier HTML, ou None
+        si des fichiers de référence manquent ou si le contenu d'une
+        ressource a changé : la page est alors traitée normalement.
+        """
+        relative_paths = [baseline_page['file']] + baseline_page.get('assets', [])
+        if not all(os.path.isfile(os.path.join(self.baseline_folder, path)) for path in relative_paths):
+            return None
+        try:
+            with open(os.path.join(self.baseline_folder, baseline_page['file']), 'r', encoding='utf-8') as f:
+                references = collect_references(parse_html(f.read(), self.parser_backend))
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        executor = self.get_executor()
+        revalidations = [
+            (relative_path, executor.submit(self.download_external_file, resource_url,
+                                            self.asset_folder(file_type), file_type))
+            for resource_url, file_type, relative_path in baseline_page.get('resources', [])
+        ]
+        for relative_path, future in revalidations:
+            # Ressource renommée, absente, ou mise à jour sous le même nom
+            if future.result() != relative_path or not filecmp.cmp(
+                    os.path.join(self.baseline_folder, relative_path),
+                    os.path.join(self.output_folder, relative_path), shallow=False):
+                self.logger.info(f"Ressources modifiées pour {url}, page retraitée")
+                return None
+
+        for relative_path in relative_paths:
+            source_path = os.path.join(self.baseline_folder, relative_path)
+            local_path = os.path.join(self.output_folder, relative_path)
+            reserved = self.reserve_file(local_path, os.path.getsize(source_path))
+            if reserved is None:
+                return None
+            if not reserved:
+                continue
+
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            try:
+                os.link(source_path, local_path)
+            except OSError:
+                shutil.copyfile(source_path, local_path)
+            digest = self.baseline_manifest.get(relative_path)
+            if digest is not None:
+                with self.size_lock:
+                    self.add_to_manifest(relative_path, digest)
+
+        with self.size_lock:
+            self.record_page(url, dict(baseline_page), 'unchanged')
+        self.logger.info(f"Page {url} inchangée, reprise depuis le crawl de référence")
+        return self.internal_links(references, self.page_base_url(baseline_page.get('document_url', url), references))
+
+    def page_base_url(self, document_url, references):
+        """Base des URLs relatives d'une page : le document reçu (après redirections) ou son <base href>"""
+        return urljoin(document_url, references.base_href) if references.base_href else document_url
+
+    def internal_links(self, references, base_url):
+        """URLs canoniques des liens internes de la page, à ajouter à la frontière"""
+        links = []
+        for reference in references.anchors:
+            next_url = self.canonicalize(urljoin(base_url, reference.value))
+            if self.is_internal_link(next_url):
+                links.append(next_url)
+        return links
+
+    def record_page(self, url, meta, change=None):
+        """Enregistre une page traitée et sa nature dans un crawl incrémental (verrou size_lock tenu)"""
+        self.page_meta[url] = meta
+        if change is not None:
+            self.changes[change].add(url)
+        self.journal_event('page', url=url, meta=meta, change=change)
+
+    def load_baseline(self):
+        """Charge les pages du crawl de référence (mode incrémental) depuis son journal"""
+        state = read_checkpoint(self.baseline_folder)
+        pages = {}
+        if state is not None:
+            for record in read_journal(self.baseline_folder, state['journal_size']):
+                if record['type'] == 'page':
+                    pages[record['url']] = record['meta']
+        if not pages:
+            self.logger.warning(f"Aucun état exploitable dans {self.baseline_folder}, crawl complet")
+            self.baseline_pages = {}
+            return False
+        self.baseline_pages = pages
+        self.baseline_manifest = read_manifest(self.baseline_folder)
+        return True
+
+    def write_changes_manifest(self):
+        """Écrit la liste des pages modifiées, ajoutées et supprimées depuis la référence"""
+        removed = sorted(
+            url for url in self.baseline_pages
+            if url in self.gone_pages or not self.frontier.has_seen(url)
+        )
+        with self.size_lock:
+            manifest = {
+                'baseline': os.path.basename(os.path.normpath(self.baseline_folder)),
+                'changed': sorted(self.changes['changed']),
+                'added': sorted(self.changes['added']),
+                'removed': removed,
+                'unchanged': len(self.changes['unchanged']),
+            }
+        with open(os.path.join(self.output_folder, CHANGES_MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        self.changes_manifest = manifest
+        return manifest
+
+    def canonicalize(self, url):
+        """Forme canonique d'une URL, utilisée pour la frontière et les ressources"""
+        return canonicalize_url(url, self.tracking_params)
 
     def is_internal_link(self, url):
         """Vérifie si le lien est interne au domaine principal"""
@@ -339,23 +1025,270 @@ class WebScraper:
         parsed_url = urlparse(url)
         return parsed_url.netloc == self.base_domain
 
-    def start_scraping(self, start_url):
-        """Lance le scraping à partir de l'URL de départ"""
+    def start_scraping(self, start_url, resume=False):
+        """Lance le scraping à partir de l'URL de départ
+
+        Avec resume=True, le crawl reprend depuis le point de reprise du
+        dossier de sortie s'il existe : les pages déjà enregistrées ne sont
+        pas téléchargées à nouveau.
+        """
+        start_url = self.canonicalize(start_url)
         self.base_domain = urlparse(start_url).netloc
-        self.total_pages_estimate = self.max_pages
-        self.scrape_page(start_url)
+        self.start_url = start_url
+        self.visited_urls = create_seen_set(self.seen_set, self.bloom_capacity, self.bloom_error_rate)
+        self.frontier = CrawlFrontier(
+            max_depth=self.max_depth,
+            seen=create_seen_set(self.seen_set, self.bloom_capacity, self.bloom_error_rate)
+        )
+        if self.baseline_folder:
+            self.load_baseline()
+        if not (resume and self.restore_checkpoint()):
+            self.reset_journal()
+            self.add_to_frontier(start_url, 0)
+        try:
+            self.crawl()
+        finally:
+            self.save_blob_manifest()
+            self.save_checkpoint()
+            if self.baseline_folder:
+                self.write_changes_manifest()
+
+    def start_sharded_scraping(self, start_url, shards, resume=False):
+        """Lance le crawl sur plusieurs processus (voir sharded_crawl)
+
+        Les URLs sont réparties par empreinte entre shards processus qui
+        écrivent dans le dossier de la tâche ; leurs résultats sont fusionnés
+        dans ce scraper, qui produit les manifestes et le point de reprise.
+        """
+        start_url = self.canonicalize(start_url)
+        self.base_domain = urlparse(start_url).netloc
+        self.start_url = start_url
+        self.visited_urls = create_seen_set(self.seen_set, self.bloom_capacity, self.bloom_error_rate)
+        if self.baseline_folder:
+            self.load_baseline()
+        try:
+            run_sharded_crawl(self, shards, resume)
+        finally:
+            self.save_blob_manifest()
+            self.save_checkpoint()
+            if self.baseline_folder:
+                self.write_changes_manifest()
+
+    def resume_scraping(self, start_url):
+        """Reprend un crawl interrompu à partir de son point de reprise"""
+        self.start_scraping(start_url, resume=True)
+
+    def crawl(self):
+        """Vide la frontière en répartissant les pages sur les workers disponibles"""
+        with ThreadPoolExecutor(max_workers=max(self.workers, 1), thread_name_prefix="page-worker") as pool:
+            running = {}
+            while True:
+                # Remplir les emplacements libres tant que la limite de pages le permet
+                while len(running) < max(self.workers, 1) and self.current_page < self.max_pages:
+                    if self.is_cancelled():
+                        self.logger.info("Scraping annulé, arrêt après les pages en cours")
+                        break
+                    item = self.frontier.pop()
+                    if item is None:
+                        break
+                    url, depth = item
+                    self.visited_urls.add(url)
+                    self.current_page += 1
+                    running[pool.submit(self.scrape_page, url, depth)] = (url, depth)
+                    self.update_progress()
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = running.pop(future)
+                    for next_url in future.result():
+                        self.add_to_frontier(next_url, depth + 1)
+                    self.frontier.mark_done(url)
+                    with self.size_lock:
+                        self.journal_event('done', url=url)
+                    self.pages_done += 1
+                    self.update_progress()
+
+                if self.checkpoint_every and self.pages_done - self.last_checkpoint_pages >= self.checkpoint_every:
+                    self.save_checkpoint()
+
+    def add_to_frontier(self, url, depth):
+        """Ajoute une URL à la frontière et journalise sa découverte"""
+        if self.frontier.add(url, depth):
+            with self.size_lock:
+                self.journal_event('url', url=url, depth=depth)
+
+    def reset_journal(self):
+        """Repart d'un journal vide pour un nouveau crawl"""
+        remove_journal(self.output_folder, self.journal_name())
+        self.journal_size = 0
+
+    def journal_name(self):
+        return JOURNAL_NAME if self.shard_index is None else shard_journal_name(self.shard_index)
+
+    def save_checkpoint(self):
+        """Sauvegarde l'état du crawl dans le dossier de la tâche
+
+        Les événements survenus depuis la sauvegarde précédente sont ajoutés
+        au journal ; le point de reprise, réécrit en entier, ne contient que
+        les compteurs et la taille du journal qu'ils couvrent. Le coût d'une
+        sauvegarde ne dépend donc pas du nombre de pages déjà crawlées.
+        """
+        if self.frontier is None:
+            return
+        with self.size_lock:
+            records, self.journal = self.journal, []
+            records += self.asset_cache.take_journal()
+            if self.shard_index is not None:
+                # Processus d'un crawl réparti : résumé fusionné par le processus principal
+                name = shard_checkpoint_name(self.shard_index)
+                state = self.shard_summary()
+            else:
+                name = None
+                state = {
+                    'start_url': self.start_url,
+                    'pages_done': self.pages_done,
+                    'files_count': self.files_count,
+                    'total_size': self.total_size,
+                    'metadata': self.checkpoint_metadata,
+                }
+        try:
+            self.journal_size = append_journal(self.output_folder, records, self.journal_name(), self.journal_size)
+        except (OSError, TypeError, ValueError) as e:
+            with self.size_lock:
+                self.journal[:0] = records
+            self.logger.error(f"Impossible d'écrire le journal du crawl: {e}")
+            return
+        try:
+            state['journal_size'] = self.journal_size
+            if name is None:
+                write_checkpoint(self.output_folder, state)
+            else:
+                write_checkpoint(self.output_folder, state, name)
+            self.last_checkpoint_pages = self.pages_done
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error(f"Impossible d'écrire le point de reprise: {e}")
+
+    def restore_checkpoint(self):
+        """Recharge l'état sauvegardé en rejouant le journal, retourne False s'il n'y a pas de point de reprise"""
+        state = read_checkpoint(self.output_folder)
+        if state is None:
+            return False
+
+        # Événements écrits après le point de reprise : les pages concernées seront retraitées
+        self.journal_size = state['journal_size']
+        truncate_journal(self.output_folder, self.journal_size)
+        with self.size_lock:
+            self.files_count = state['files_count']
+            self.total_size = state['total_size']
+            self.pages_done = self.current_page = self.last_checkpoint_pages = state['pages_done']
+        # Résultats des processus d'un crawl réparti interrompu, ajoutés au journal de la tâche
+        merge_leftover_shards(self)
+
+        pending = {}  # URL découverte et pas encore traitée -> profondeur
+        done = []
+        assets = {'resolved': {}, 'digests': {}}
+        with self.size_lock:
+            for record in read_journal(self.output_folder, self.journal_size):
+                kind = record['type']
+                if kind == 'url':
+                    pending[record['url']] = record['depth']
+                elif kind == 'done':
+                    pending.pop(record['url'], None)
+                    done.append(record['url'])
+                elif kind == 'asset':
+                    assets['resolved'][record['url']] = record['path']
+                elif kind == 'digest':
+                    assets['digests'][record['digest']] = record['path']
+                self.apply_event(record)
+        self.asset_cache.restore(assets)
+
+        # Les pages en cours lors de la sauvegarde sont remises en attente
+        self.frontier.restore(pending.items(), done)
+        self.logger.info(
+            f"Reprise du crawl: {len(self.page_meta)} pages déjà enregistrées, "
+            f"{self.frontier.pending_count()} en attente"
+        )
+        return True
+
+    def apply_event(self, record):
+        """Reporte dans l'état du scraper un événement du journal (verrou size_lock tenu)"""
+        kind = record['type']
+        if kind == 'done':
+            self.visited_urls.add(record['url'])
+        elif kind == 'page':
+            self.page_meta[record['url']] = record['meta']
+            if record.get('change'):
+                self.changes[record['change']].add(record['url'])
+        elif kind == 'gone':
+            self.gone_pages.add(record['url'])
+        elif kind == 'blob':
+            self.blob_manifest[record['path']] = record['digest']
+        elif kind == 'wait':
+            self.page_wait_times[record['url']] = record['seconds']
+
+    def shard_summary(self):
+        """Compteurs d'un processus de crawl réparti, fusionnés par merge_shard_summary() (verrou size_lock tenu)
+
+        Les pages, fichiers et URLs du processus sont dans son journal.
+        """
+        return {
+            'files_count': self.files_count,
+            'total_size': self.total_size,
+            'render_stats': dict(self.render_stats),
+            'stats': {
+                'cache': self.get_cache_stats(),
+                'rate_limit': self.get_rate_limit_stats(),
+                'asset_cache': self.get_asset_cache_stats(),
+            },
+        }
+
+    def merge_shard_summary(self, summary, records):
+        """Ajoute les résultats d'un processus de crawl réparti à ceux de la tâche
+
+        Les événements de son journal sont repris dans celui de la tâche au
+        prochain point de reprise.
+        """
+        with self.size_lock:
+            for record in records:
+                self.apply_event(record)
+            self.journal.extend(records)
+            self.files_count += summary['files_count']
+            self.total_size += summary['total_size']
+            add_counts(self.render_stats, summary['render_stats'])
+            for group, counts in summary['stats'].items():
+                add_counts(self.shard_stats.setdefault(group, {}), counts)
 
     def get_files_count(self):
         """Retourne le nombre de fichiers téléchargés"""
         return self.files_count
 
+    def get_cache_stats(self):
+        """Retourne les compteurs du cache HTTP pour cette tâche"""
+        return add_counts(dict(getattr(self.session, 'cache_stats', {})), self.shard_stats.get('cache', {}))
+
+    def get_asset_cache_stats(self):
+        """Retourne les compteurs du cache de ressources (dont les requêtes évitées)"""
+        return add_counts(self.asset_cache.get_stats(), self.shard_stats.get('asset_cache', {}))
+
+    def get_rate_limit_stats(self):
+        """Retourne les compteurs du limiteur de débit (refus 429/503, attente cumulée)"""
+        stats = dict(self.rate_limiter.stats) if self.rate_limiter is not None else {'throttled': 0, 'wait_time': 0.0}
+        return add_counts(stats, self.shard_stats.get('rate_limit', {}))
+
     def get_total_size(self):
         """Retourne la taille totale des fichiers téléchargés"""
         return self.total_size
 
     def close(self):
         """Ferme le navigateur et nettoie les ressources"""
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        self.release_driver()
+        if self.frontier is not None:
+            self.frontier.close()
         if hasattr(self, 'session'):
             self.session.close()
\ No newline at end of file
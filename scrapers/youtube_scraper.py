@@ -1,14 +1,29 @@
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadCancelled
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 import logging
-from .utils import sanitize_filename
+import threading
+from .utils import sanitize_filename, extract_youtube_id
 
 class YoutubeDownloader:
-    def __init__(self, output_folder):
+    def __init__(self, output_folder, metadata_cache=None):
         self.output_folder = output_folder
+        self.metadata_cache = metadata_cache
         self.progress_callback = None
+        self.cancel_event = None  # threading.Event signalant l'annulation de la tâche
         self.files_count = 0
         
+        # Options configurables
+        self.playlist_workers = 3  # Vidéos d'une playlist téléchargées en parallèle
+        self.entry_retries = 2  # Nouvelles tentatives par vidéo en cas d'échec
+        self.concurrent_fragments = 4  # Fragments DASH/HLS téléchargés en parallèle
+        
+        self.lock = threading.Lock()
+        self.extraction_time = 0  # Cumul des durées d'extraction des métadonnées
+        self.download_time = 0  # Cumul des durées de téléchargement
+        
         # Configuration du logging
         self.logger = logging.getLogger(__name__)
         
@@ -21,6 +36,9 @@ class YoutubeDownloader:
 
     def progress_hook(self, d):
         """Hook de progrès pour yt-dlp"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise DownloadCancelled("Téléchargement annulé")
+        
         if self.progress_callback:
             if d['status'] == 'downloading':
                 # Extraire le pourcentage depuis la chaîne
@@ -34,27 +52,137 @@ class YoutubeDownloader:
                 self.progress_callback({'percentage': 100})
                 self.files_count += 1
 
+    def check_cancelled(self):
+        """Interrompt yt-dlp si l'annulation de la tâche a été demandée"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise DownloadCancelled("Téléchargement annulé")
+
+    def get_format_selector(self, quality='best', audio_only=False):
+        """Construit le sélecteur de format yt-dlp"""
+        if audio_only:
+            return 'bestaudio/best'
+        if quality == 'best':
+            return 'best'
+        if quality == 'worst':
+            return 'worst'
+        return f'best[height<={quality}]'
+
+    def get_playlist_entries(self, url):
+        """Liste les vidéos d'une playlist sans résoudre leurs formats"""
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'ignoreerrors': True,
+        }
+        with YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        if not info:
+            raise Exception("Impossible de récupérer les informations de la playlist")
+
+        entries = []
+        seen = set()
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            entry_url = entry.get('webpage_url') or entry.get('url')
+            entry_id = entry.get('id') or entry_url
+            if entry_url and entry_id not in seen:
+                seen.add(entry_id)
+                entries.append({'id': entry_id, 'url': entry_url, 'title': entry.get('title')})
+        return info, entries
+
+    def metadata_key(self, url):
+        """Clé de cache d'une URL : l'identifiant de la vidéo, None pour les playlists"""
+        if 'list=' in url or '/playlist' in url:
+            return None
+        return extract_youtube_id(url)
+
+    def extract_metadata(self, url, ydl=None):
+        """Extrait les métadonnées brutes d'une URL (sans sélection de format)
+
+        Les vidéos individuelles passent par le cache de métadonnées partagé,
+        utilisé aussi bien pour l'aperçu que pour le téléchargement.
+        """
+        def extract():
+            if ydl is not None:
+                return ydl.extract_info(url, download=False, process=False)
+            with YoutubeDL({'quiet': True, 'no_warnings': True}) as own_ydl:
+                return own_ydl.extract_info(url, download=False, process=False)
+
+        key = self.metadata_key(url)
+        if self.metadata_cache is None or key is None:
+            return extract()
+        return self.metadata_cache.get_or_extract(key, extract)
+
+    def extract_and_download(self, ydl, url):
+        """Extrait les métadonnées une seule fois puis télécharge à partir de celles-ci
+
+        Retourne (info, durée d'extraction, durée de téléchargement) en secondes.
+        """
+        start = time.monotonic()
+        ie_result = self.extract_metadata(url, ydl)
+        extraction_time = time.monotonic() - start
+        if not ie_result:
+            return None, extraction_time, 0
+
+        start = time.monotonic()
+        info = ydl.process_ie_result(ie_result, download=True)
+        download_time = time.monotonic() - start
+        return info, extraction_time, download_time
+
+    def download_entry(self, entry, ydl_opts, tracker):
+        """Télécharge une vidéo de playlist avec nouvelles tentatives"""
+        def entry_hook(d):
+            self.check_cancelled()
+            if d['status'] == 'downloading':
+                tracker.update(entry['id'], d.get('downloaded_bytes') or 0,
+                               d.get('total_bytes') or d.get('total_bytes_estimate') or 0)
+            elif d['status'] == 'finished':
+                size = d.get('total_bytes') or d.get('downloaded_bytes') or 0
+                tracker.update(entry['id'], size, size)
+
+        opts = dict(ydl_opts, progress_hooks=[entry_hook], ignoreerrors=False)
+        for attempt in range(self.entry_retries + 1):
+            self.check_cancelled()
+            try:
+                with YoutubeDL(opts) as ydl:
+                    info, extraction_time, download_time = self.extract_and_download(ydl, entry['url'])
+                if not info:
+                    raise Exception("Impossible de récupérer les informations de la vidéo")
+                tracker.finish(entry['id'], success=True)
+                with self.lock:
+                    self.files_count += 1
+                    self.extraction_time += extraction_time
+                    self.download_time += download_time
+                return True
+            except DownloadCancelled:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Échec de {entry['url']} (tentative {attempt + 1}/{self.entry_retries + 1}): {e}")
+                if attempt < self.entry_retries:
+                    time.sleep(2 ** attempt)
+
+        tracker.finish(entry['id'], success=False)
+        return False
+
     def get_video_info(self, url):
         """Récupère les informations d'une vidéo sans la télécharger"""
         try:
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-            }
+            info = self.extract_metadata(url)
+            if not info:
+                return None
             
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                return {
-                    'title': info.get('title', 'Titre non disponible'),
-                    'duration': info.get('duration', 0),
-                    'view_count': info.get('view_count', 0),
-                    'uploader': info.get('uploader', 'Auteur non disponible'),
-                    'upload_date': info.get('upload_date', 'Date non disponible'),
-                    'description': info.get('description', ''),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'formats': [f for f in info.get('formats', []) if f.get('vcodec') != 'none']
-                }
+            return {
+                'title': info.get('title', 'Titre non disponible'),
+                'duration': info.get('duration', 0),
+                'view_count': info.get('view_count', 0),
+                'uploader': info.get('uploader', 'Auteur non disponible'),
+                'upload_date': info.get('upload_date', 'Date non disponible'),
+                'description': info.get('description', ''),
+                'thumbnail': info.get('thumbnail', ''),
+                'formats': [f for f in info.get('formats') or [] if f.get('vcodec') != 'none']
+            }
         except Exception as e:
             self.logger.error(f"Erreur lors de l'extraction des infos de {url}: {e}")
             return None
@@ -82,21 +210,23 @@ class YoutubeDownloader:
                 'extractaudio': audio_only,
                 'audioformat': 'mp3' if audio_only else None,
                 'ignoreerrors': True,
+                'concurrent_fragment_downloads': self.concurrent_fragments,
+                # Reprise des fichiers .part laissés par une tentative précédente
+                'continuedl': True,
+                'nopart': False,
             }
 
             with YoutubeDL(ydl_opts) as ydl:
-                # Récupérer les infos avant téléchargement
-                info = ydl.extract_info(url, download=False)
+                info, extraction_time, download_time = self.extract_and_download(ydl, url)
                 if not info:
                     raise Exception("Impossible de récupérer les informations de la vidéo")
-
-                # Télécharger
-                ydl.download([url])
                 
                 return {
                     'success': True,
                     'title': info.get('title', 'Titre inconnu'),
                     'files_count': 1,
+                    'extraction_time': extraction_time,
+                    'download_time': download_time,
                     'message': 'Téléchargement terminé avec succès'
                 }
 
@@ -109,57 +239,97 @@ class YoutubeDownloader:
             }
 
     def download_playlist(self, url, quality='best', audio_only=False):
-        """Télécharge une playlist complète"""
+        """Télécharge une playlist complète, plusieurs vidéos à la fois"""
         try:
-            # Configuration pour playlist
-            if audio_only:
-                format_selector = 'bestaudio/best'
-                outtmpl = os.path.join(self.output_folder, '%(playlist_title)s', '%(title)s.%(ext)s')
-            else:
-                if quality == 'best':
-                    format_selector = 'best'
-                elif quality == 'worst':
-                    format_selector = 'worst'
-                else:
-                    format_selector = f'best[height<={quality}]'
-                outtmpl = os.path.join(self.output_folder, '%(playlist_title)s', '%(title)s.%(ext)s')
+            start = time.monotonic()
+            info, entries = self.get_playlist_entries(url)
+            self.extraction_time += time.monotonic() - start
+            playlist_title = sanitize_filename(info.get('title') or 'Playlist')
+            outtmpl = os.path.join(self.output_folder, playlist_title, '%(title)s.%(ext)s')
 
-            ydl_opts = {
-                'format': format_selector,
-                'outtmpl': outtmpl,
-                'progress_hooks': [self.progress_hook],
-                'extractaudio': audio_only,
-                'audioformat': 'mp3' if audio_only else None,
-                'noplaylist': False,
-                'ignoreerrors': True,
+            failed = self.download_entries(entries, outtmpl, quality, audio_only)
+
+            downloaded = len(entries) - len(failed)
+            return {
+                'success': downloaded > 0 or not entries,
+                'playlist_title': info.get('title', 'Playlist'),
+                'files_count': downloaded,
+                'failed': failed,
+                # Durées cumulées sur l'ensemble des vidéos
+                'extraction_time': self.extraction_time,
+                'download_time': self.download_time,
+                'message': f'Téléchargement de {downloaded}/{len(entries)} vidéos terminé'
             }
 
-            with YoutubeDL(ydl_opts) as ydl:
-                # Récupérer les infos de la playlist
-                info = ydl.extract_info(url, download=False)
-                if not info:
-                    raise Exception("Impossible de récupérer les informations de la playlist")
+        except Exception as e:
+            self.logger.error(f"Erreur lors du téléchargement de la playlist {url}: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'files_count': 0
+            }
 
-                playlist_count = len(info.get('entries', []))
-                
-                # Télécharger la playlist
-                ydl.download([url])
-                
-                return {
-                    'success': True,
-                    'playlist_title': info.get('title', 'Playlist'),
-                    'files_count': playlist_count,
-                    'message': f'Téléchargement de {playlist_count} vidéos terminé'
-                }
+    def download_batch(self, urls, quality='best', audio_only=False):
+        """Télécharge une liste d'URLs, dédoublonnées par identifiant de vidéo"""
+        entries = []
+        duplicates = []
+        seen = set()
+        for url in urls:
+            entry_id = self.metadata_key(url) or url
+            if entry_id in seen:
+                duplicates.append(url)
+                continue
+            seen.add(entry_id)
+            entries.append({'id': entry_id, 'url': url})
+
+        try:
+            outtmpl = os.path.join(self.output_folder, '%(title)s.%(ext)s')
+            failed = self.download_entries(entries, outtmpl, quality, audio_only)
+
+            downloaded = len(entries) - len(failed)
+            return {
+                'success': downloaded > 0 or not entries,
+                'files_count': downloaded,
+                'failed': failed,
+                'duplicates': duplicates,
+                'extraction_time': self.extraction_time,
+                'download_time': self.download_time,
+                'message': f'Téléchargement de {downloaded}/{len(entries)} vidéos terminé'
+            }
 
         except Exception as e:
-            self.logger.error(f"Erreur lors du téléchargement de la playlist {url}: {e}")
+            self.logger.error(f"Erreur lors du téléchargement du lot: {e}")
             return {
                 'success': False,
                 'error': str(e),
                 'files_count': 0
             }
 
+    def download_entries(self, entries, outtmpl, quality='best', audio_only=False):
+        """Télécharge des vidéos en parallèle, retourne les URLs en échec"""
+        ydl_opts = {
+            'format': self.get_format_selector(quality, audio_only),
+            'outtmpl': outtmpl,
+            'extractaudio': audio_only,
+            'audioformat': 'mp3' if audio_only else None,
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            'concurrent_fragment_downloads': self.concurrent_fragments,
+            'continuedl': True,
+            'nopart': False,
+        }
+
+        tracker = PlaylistProgress(entries, self.progress_callback)
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=max(self.playlist_workers, 1), thread_name_prefix="playlist") as executor:
+            futures = {executor.submit(self.download_entry, entry, ydl_opts, tracker): entry for entry in entries}
+            for future in as_completed(futures):
+                if not future.result():
+                    failed.append(futures[future]['url'])
+        return failed
+
     def download_audio_only(self, url, is_playlist=False):
         """Télécharge uniquement l'audio (alias pour audio_only=True)"""
         if is_playlist:
@@ -170,53 +340,51 @@ class YoutubeDownloader:
     def get_available_formats(self, url):
         """Récupère les formats disponibles pour une vidéo"""
         try:
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'listformats': True,
-            }
-            
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                formats = info.get('formats', [])
+            info = self.extract_metadata(url) or {}
+            formats = info.get('formats') or []
                 
-                # Filtrer et organiser les formats
-                video_formats = []
-                audio_formats = []
+            # Filtrer et organiser les formats
+            video_formats = []
+            audio_formats = []
                 
-                for f in formats:
-                    if f.get('vcodec') != 'none' and f.get('acodec') != 'none':
-                        # Format vidéo+audio
-                        video_formats.append({
-                            'format_id': f.get('format_id'),
-                            'ext': f.get('ext'),
-                            'resolution': f.get('resolution', f'{f.get("width", "?")}x{f.get("height", "?")}'),
-                            'fps': f.get('fps'),
-                            'vcodec': f.get('vcodec'),
-                            'acodec': f.get('acodec'),
-                            'filesize': f.get('filesize'),
-                        })
-                    elif f.get('acodec') != 'none' and f.get('vcodec') == 'none':
-                        # Format audio seulement
-                        audio_formats.append({
-                            'format_id': f.get('format_id'),
-                            'ext': f.get('ext'),
-                            'acodec': f.get('acodec'),
-                            'abr': f.get('abr'),
-                            'filesize': f.get('filesize'),
-                        })
+            for f in formats:
+                if f.get('vcodec') != 'none' and f.get('acodec') != 'none':
+                    # Format vidéo+audio
+                    video_formats.append({
+                        'format_id': f.get('format_id'),
+                        'ext': f.get('ext'),
+                        'resolution': f.get('resolution', f'{f.get("width", "?")}x{f.get("height", "?")}'),
+                        'fps': f.get('fps'),
+                        'vcodec': f.get('vcodec'),
+                        'acodec': f.get('acodec'),
+                        'filesize': f.get('filesize'),
+                    })
+                elif f.get('acodec') != 'none' and f.get('vcodec') == 'none':
+                    # Format audio seulement
+                    audio_formats.append({
+                        'format_id': f.get('format_id'),
+                        'ext': f.get('ext'),
+                        'acodec': f.get('acodec'),
+                        'abr': f.get('abr'),
+                        'filesize': f.get('filesize'),
+                    })
                 
-                return {
-                    'video_formats': video_formats,
-                    'audio_formats': audio_formats
-                }
+            return {
+                'video_formats': video_formats,
+                'audio_formats': audio_formats
+            }
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des formats pour {url}: {e}")
             return {'video_formats': [], 'audio_formats': []}
 
     def cleanup(self):
-        """Nettoie les fichiers temporaires"""
+        """Nettoie les fichiers temporaires
+
+        Appelé uniquement après un téléchargement réussi : après une erreur
+        ou une annulation, les fichiers .part sont conservés pour qu'une
+        nouvelle tentative reprenne le téléchargement là où il s'est arrêté.
+        """
         try:
             # Supprimer les fichiers .part (téléchargements interrompus)
             for root, dirs, files in os.walk(self.output_folder):
@@ -230,4 +398,66 @@ class YoutubeDownloader:
 
     def get_files_count(self):
         """Retourne le nombre de fichiers téléchargés"""
-        return self.files_count
\ No newline at end of file
+        return self.files_count
+
+
+class PlaylistProgress:
+    """Agrège la progression de vidéos téléchargées en parallèle (playlist ou lot)"""
+
+    def __init__(self, entries, callback=None):
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.entries = {
+            entry['id']: {'url': entry['url'], 'status': 'pending', 'downloaded': 0, 'total': 0}
+            for entry in entries
+        }
+        self.entries_done = 0
+        self.entries_failed = 0
+
+    def update(self, entry_id, downloaded, total):
+        with self.lock:
+            state = self.entries[entry_id]
+            state['status'] = 'downloading'
+            state['downloaded'] = downloaded
+            if total:
+                state['total'] = total
+        self.report()
+
+    def finish(self, entry_id, success):
+        with self.lock:
+            state = self.entries[entry_id]
+            if state['status'] in ('completed', 'error'):
+                return
+            state['status'] = 'completed' if success else 'error'
+            if success:
+                self.entries_done += 1
+            else:
+                self.entries_failed += 1
+        self.report()
+
+    def snapshot(self):
+        """Progression globale (vidéos terminées, octets téléchargés) et état de chaque vidéo"""
+        with self.lock:
+            count = len(self.entries) or 1
+            fraction = 0
+            for state in self.entries.values():
+                if state['status'] in ('completed', 'error'):
+                    fraction += 1
+                elif state['total']:
+                    fraction += min(state['downloaded'] / state['total'], 1)
+            return {
+                'percentage': fraction / count * 100,
+                'entries_done': self.entries_done,
+                'entries_failed': self.entries_failed,
+                'entries_total': len(self.entries),
+                'bytes_done': sum(state['downloaded'] for state in self.entries.values()),
+                'bytes_total': sum(state['total'] for state in self.entries.values()),
+                'items': [
+                    {'url': state['url'], 'status': state['status'], 'downloaded': state['downloaded'], 'total': state['total']}
+                    for state in self.entries.values()
+                ],
+            }
+
+    def report(self):
+        if self.callback:
+            self.callback(self.snapshot())
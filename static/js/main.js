@@ -85,6 +85,12 @@ function updateProgress(status) {
     
     // Mettre à jour le texte de progression
     switch (status.status) {
+        case 'queued':
+            progressText.innerHTML = `
+                <i class="fas fa-hourglass-half"></i> 
+                En file d'attente${status.queue_position ? ` (position ${status.queue_position})` : ''}...
+            `;
+            break;
         case 'running':
             progressText.innerHTML = `
                 <i class="fas fa-spinner fa-spin"></i> 
@@ -170,6 +176,45 @@ function showCompletionResults(taskId, status) {
     resetFormButtons();
 }
 
+// Suivi de l'état d'une tâche : flux SSE, sondage périodique en secours
+const ACTIVE_TASK_STATES = ['running', 'queued'];
+
+function watchTaskStatus(taskId, onStatus) {
+    const pollStatus = () => {
+        fetch(`/task-status/${taskId}`)
+        .then(response => response.json())
+        .then(status => {
+            onStatus(status);
+            if (ACTIVE_TASK_STATES.includes(status.status)) {
+                setTimeout(pollStatus, 2000);
+            }
+        })
+        .catch(error => {
+            console.error('Erreur de vérification du statut:', error);
+            setTimeout(pollStatus, 5000);
+        });
+    };
+    
+    if (!window.EventSource) {
+        pollStatus();
+        return;
+    }
+    
+    const source = new EventSource(`/task-events/${taskId}`);
+    source.onmessage = event => {
+        const status = JSON.parse(event.data);
+        if (!ACTIVE_TASK_STATES.includes(status.status)) {
+            source.close();
+        }
+        onStatus(status);
+    };
+    source.onerror = () => {
+        // Connexion perdue ou flux non supporté par un proxy : retour au sondage
+        source.close();
+        pollStatus();
+    };
+}
+
 function cancelCurrentTask() {
     if (currentTaskId) {
         fetch(`/cancel-task/${currentTaskId}`, { method: 'POST' })
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Les tests importent les modules du dépôt (app, config, scrapers)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers.driver_pool import DriverPool  # noqa: E402
+from scrapers.web_scraper import WebScraper  # noqa: E402
+
+
+class Site:
+    """Site de test servi en local : chemin -> (statut, en-têtes, corps)
+
+    Une route peut aussi être une fonction appelée avec le gestionnaire de
+    requête, pour les réponses particulières (Range, coupures...).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []  # (chemin, en-têtes) des requêtes reçues
+        self.lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with site.lock:
+                    site.requests.append((self.path, dict(self.headers)))
+                route = site.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                elif callable(route):
+                    route(self)
+                else:
+                    status, headers, body = route
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path='/'):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def add(self, path, body, content_type='text/html; charset=utf-8', status=200, headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = dict(headers or {})
+        if content_type:
+            headers['Content-Type'] = content_type
+        self.routes[path] = (status, headers, body)
+
+    def requested(self, path):
+        """Nombre de requêtes reçues pour un chemin"""
+        with self.lock:
+            return sum(1 for requested_path, _ in self.requests if requested_path == path)
+
+
+@pytest.fixture
+def site():
+    site = Site()
+    site.thread.start()
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+
+def no_chrome():
+    raise RuntimeError("Chrome n'est pas disponible pendant les tests")
+
+
+@pytest.fixture
+def make_scraper(tmp_path):
+    """Crée des WebScraper en mode statique, sans délai, écrivant dans tmp_path"""
+    scrapers = []
+
+    def factory(name='out', **options):
+        scraper = WebScraper(str(tmp_path / name), driver_pool=DriverPool(1, driver_factory=no_chrome), **options)
+        scraper.render_mode = 'static'
+        scraper.delay = 0
+        scraper.tracking_params = []
+        scrapers.append(scraper)
+        return scraper
+
+    yield factory
+    for scraper in scrapers:
+        scraper.close()
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """Module app importé dans un dossier temporaire, avec registre et planificateur neufs
+
+    Le planificateur n'a aucun worker : les tâches soumises restent en attente.
+    """
+    from scrapers.scheduler import JobScheduler
+    from scrapers.task_registry import TaskRegistry
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('logs', exist_ok=True)
+    monkeypatch.setenv('JOB_STORE', 'memory')
+    import app
+
+    monkeypatch.setattr(app, 'tasks', TaskRegistry())
+    monkeypatch.setattr(app, 'scheduler', JobScheduler({'web': 0, 'youtube': 0}))
+    app.app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,126 @@
+import os
+import time
+
+import pytest
+
+from config import Config
+from scrapers.checkpoint import write_checkpoint
+from scrapers.task_registry import INTERRUPTED_MESSAGE
+
+
+def start_web(client, **options):
+    return client.post('/start-web-scraping', json={'url': 'http://127.0.0.1:9/', 'options': options})
+
+
+@pytest.mark.parametrize('priority', ['high', True, '2.5', [1], float('inf')])
+def test_invalid_priority_is_rejected_before_the_task_is_recorded(app_module, client, priority):
+    response = start_web(client, priority=priority)
+
+    assert response.status_code == 400
+    assert app_module.tasks.list() == []
+    assert app_module.scheduler.active_job_ids() == []
+
+
+@pytest.mark.parametrize('priority, expected', [(None, 0), ('3', 3), (2.9, 2), (10 ** 9, 10), (-10 ** 9, -10)])
+def test_priority_is_coerced_and_clamped(app_module, client, priority, expected):
+    response = start_web(client, priority=priority)
+
+    assert response.status_code == 202
+    task_id = response.get_json()['task_id']
+    assert app_module.scheduler.get_job(task_id).priority == expected
+    assert app_module.tasks.get(task_id)['options']['priority'] == expected
+
+
+@pytest.mark.parametrize('delay', ['abc', -1, float('nan'), float('inf'), True, [1]])
+def test_invalid_delay_is_rejected(app_module, client, delay):
+    response = start_web(client, delay=delay)
+
+    assert response.status_code == 400
+    assert app_module.tasks.list() == []
+
+
+@pytest.mark.parametrize('delay, expected', [(None, Config.DEFAULT_DELAY), (0, 0.0), ('2.5', 2.5)])
+def test_delay_is_normalized(app_module, client, delay, expected):
+    response = start_web(client, delay=delay)
+
+    assert response.status_code == 202
+    task_id = response.get_json()['task_id']
+    assert app_module.tasks.get(task_id)['options']['delay'] == expected
+
+
+
+@pytest.mark.parametrize('name, value', [
+    ('workers', 'abc'), ('workers', 0), ('workers', True), ('workers', 2.5),
+    ('workers', Config.MAX_CRAWL_WORKERS + 1),
+    ('max_depth', -1), ('max_depth', 'deep'), ('max_depth', False),
+    ('wait_timeout', 0), ('wait_timeout', -5), ('wait_timeout', 'long'), ('wait_timeout', True),
+    ('shards', True), ('shards', 0), ('shards', '2x'), ('shards', Config.MAX_CRAWL_SHARDS + 1),
+])
+def test_invalid_crawl_option_is_rejected(app_module, client, name, value):
+    response = start_web(client, **{name: value})
+
+    assert response.status_code == 400
+    assert response.get_json()['error']
+    assert app_module.tasks.list() == []
+
+
+def test_crawl_options_are_normalized(app_module, client):
+    response = start_web(client, workers='4', max_depth=2.0, wait_timeout='2.5', shards=None)
+
+    assert response.status_code == 202
+    options = app_module.tasks.get(response.get_json()['task_id'])['options']
+    assert (options['workers'], options['max_depth'], options['wait_timeout'], options['shards']) == (
+        4, 2, 2.5, Config.DEFAULT_CRAWL_SHARDS
+    )
+
+@pytest.fixture
+def restarted_app(app_module, tmp_path, monkeypatch):
+    """Application redémarrée sur un stockage SQLite où un ancien worker a laissé une tâche en cours"""
+    from scrapers.job_store import SQLiteJobStore
+    from scrapers.task_registry import TaskRegistry
+
+    path = str(tmp_path / 'jobs.sqlite3')
+    previous = TaskRegistry(store=SQLiteJobStore(path))
+    previous.create('web_interrupted', 'web', url='http://127.0.0.1:9/', options={}, progress=40)
+    previous.update('web_interrupted', status='running')
+    # Dernier signe de vie bien avant le redémarrage
+    previous.store.heartbeat(previous.owner, time.time() - 3600)
+
+    monkeypatch.setattr(app_module, 'tasks', TaskRegistry(store=SQLiteJobStore(path)))
+    return app_module
+
+
+def test_tasks_of_a_stopped_worker_are_marked_interrupted(restarted_app):
+    assert restarted_app.tasks.recover_orphans() == ['web_interrupted']
+
+    task = restarted_app.tasks.get('web_interrupted')
+    assert task['status'] == 'error'
+    assert task['error'] == INTERRUPTED_MESSAGE
+
+
+def test_running_task_can_be_resumed_after_restart(restarted_app, client):
+    folder = os.path.join('downloads', 'web_content', 'web_interrupted')
+    os.makedirs(folder)
+    write_checkpoint(folder, {'start_url': 'http://127.0.0.1:9/', 'metadata': {'options': {'delay': 0}}})
+
+    response = client.post('/resume/web_interrupted')
+
+    assert response.status_code == 202
+    task = restarted_app.tasks.get('web_interrupted')
+    assert task['status'] == 'queued'
+    assert task['owner'] == restarted_app.tasks.owner
+    assert restarted_app.scheduler.get_job('web_interrupted') is not None
+
+
+def test_running_task_can_be_retried_after_restart(restarted_app, client):
+    response = client.post('/retry/web_interrupted')
+
+    assert response.status_code == 202
+    assert restarted_app.tasks.get('web_interrupted')['status'] == 'queued'
+
+
+def test_task_of_a_live_worker_is_not_taken_over(app_module, client):
+    app_module.tasks.create('web_live', 'web', status='running', url='http://127.0.0.1:9/', options={})
+
+    assert client.post('/retry/web_live').status_code == 409
+    assert app_module.tasks.recover_orphans() == []
@@ -0,0 +1,27 @@
+import zipfile
+
+from scrapers.archive import list_archive_files, stream_zip
+
+
+def test_archive_skips_partial_and_temporary_files(tmp_path):
+    folder = tmp_path / 'task'
+    (folder / 'css').mkdir(parents=True)
+    files = {
+        'video.mp4': b'done',
+        'css/site.css': b'body {}',
+        'clip.mp4.part': b'half',
+        'clip.f137.mp4.part-Frag12': b'fragment',
+        'clip.mp4.ytdl': b'{}',
+        'css/site.css.123.456.tmp': b'body',
+        'css/.partial-abc.part': b'half',
+        '.blobs.json': b'{}',
+    }
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+
+    assert sorted(arcname for _, arcname in list_archive_files(str(folder))) == ['css/site.css', 'video.mp4']
+
+    archive = tmp_path / 'task.zip'
+    archive.write_bytes(b''.join(stream_zip(str(folder))))
+    with zipfile.ZipFile(archive) as zipf:
+        assert sorted(zipf.namelist()) == ['css/site.css', 'video.mp4']
@@ -0,0 +1,53 @@
+import os
+import time
+
+from scrapers.archive import folder_signature, is_archive_fresh, stream_zip
+from scrapers.blob_store import BlobStore, write_manifest
+
+
+def build_archive(folder):
+    signature = folder_signature(folder)
+    for _ in stream_zip(folder, signature, cache_path=f"{folder}.zip"):
+        pass
+    return signature
+
+
+def test_reusing_a_blob_keeps_older_archives_fresh(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'))
+    first = tmp_path / 'task_a'
+    second = tmp_path / 'task_b'
+    first.mkdir()
+    second.mkdir()
+
+    digest = store.put_bytes(b'body { color: red }')
+    store.link(digest, str(first / 'style.css'))
+    build_archive(str(first))
+    assert is_archive_fresh(f"{first}.zip", folder_signature(str(first)))
+
+    # Une tâche plus récente réutilise la même ressource
+    time.sleep(0.01)
+    store.link(digest, str(second / 'style.css'))
+
+    assert is_archive_fresh(f"{first}.zip", folder_signature(str(first)))
+
+
+def test_garbage_collection_keeps_linked_and_referenced_blobs(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'))
+    content = tmp_path / 'web_content'
+    task = content / 'task'
+    task.mkdir(parents=True)
+
+    linked = store.put_bytes(b'linked')
+    store.link(linked, str(task / 'linked.css'))
+    referenced = store.put_bytes(b'referenced')
+    write_manifest(str(task), {'other.css': referenced})
+    orphan = store.put_bytes(b'orphan')
+
+    old = time.time() - 7200
+    for digest in (linked, referenced, orphan):
+        os.utime(store.blob_path(digest), (old, old))
+
+    assert store.collect_garbage([str(content)]) == 1
+    assert store.has(linked)
+    assert store.has(referenced)
+    assert not store.has(orphan)
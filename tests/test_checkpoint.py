@@ -0,0 +1,77 @@
+import os
+
+from scrapers.checkpoint import JOURNAL_NAME, CHECKPOINT_NAME, read_checkpoint, read_journal
+
+
+def add_chain(site, count):
+    """Pages /p0.html -> /p1.html -> ... avec assez de texte pour le mode statique"""
+    for index in range(count):
+        link = f'<a href="/p{index + 1}.html">suite</a>' if index + 1 < count else ''
+        site.add(f'/p{index}.html', f'<html><body><p>Page {index} ' + 'texte ' * 20 + f'</p>{link}</body></html>')
+
+
+def test_checkpoint_stays_small_as_journal_grows(site, make_scraper):
+    add_chain(site, 8)
+    scraper = make_scraper()
+    scraper.max_pages = 8
+    scraper.checkpoint_every = 1
+
+    scraper.start_scraping(site.url('/p0.html'))
+
+    state = read_checkpoint(scraper.output_folder)
+    assert state['pages_done'] == 8
+    assert 'page_meta' not in state and 'frontier' not in state
+    assert state['journal_size'] == os.path.getsize(os.path.join(scraper.output_folder, JOURNAL_NAME))
+    pages = [record['url'] for record in read_journal(scraper.output_folder) if record['type'] == 'page']
+    assert len(pages) == 8
+
+
+def test_resume_replays_journal_without_refetching(site, make_scraper):
+    add_chain(site, 6)
+    first = make_scraper()
+    first.max_pages = 3
+    first.checkpoint_every = 1
+    first.start_scraping(site.url('/p0.html'))
+
+    # Événements écrits après le dernier point de reprise : ignorés à la reprise
+    with open(os.path.join(first.output_folder, JOURNAL_NAME), 'a', encoding='utf-8') as f:
+        f.write('{"type":"done","url":"' + site.url('/p3.html') + '"}\n{"type":')
+
+    second = make_scraper()
+    second.max_pages = 10
+    second.resume_scraping(site.url('/p0.html'))
+
+    for index in range(6):
+        assert site.requested(f'/p{index}.html') == 1
+    assert len(second.page_meta) == 6
+    for meta in second.page_meta.values():
+        assert os.path.exists(os.path.join(second.output_folder, meta['file']))
+    assert read_checkpoint(second.output_folder)['pages_done'] == 6
+
+
+def test_checkpoint_file_is_gzip_counters_only(site, make_scraper):
+    add_chain(site, 2)
+    scraper = make_scraper()
+    scraper.start_scraping(site.url('/p0.html'))
+
+    assert os.path.getsize(os.path.join(scraper.output_folder, CHECKPOINT_NAME)) < 512
+
+
+def test_sharded_crawl_merges_shard_journals(site, make_scraper):
+    add_chain(site, 6)
+    first = make_scraper()
+    first.max_pages = 2
+    first.start_scraping(site.url('/p0.html'))
+
+    # Reprise répartie d'un crawl commencé dans un seul processus
+    second = make_scraper()
+    second.max_pages = 10
+    second.start_sharded_scraping(site.url('/p0.html'), 2, resume=True)
+
+    for index in range(6):
+        assert site.requested(f'/p{index}.html') == 1
+    assert len(second.page_meta) == 6
+    assert read_checkpoint(second.output_folder)['pages_done'] == 6
+    assert not [name for name in os.listdir(second.output_folder) if name.startswith('.crawl_shard-')]
+    pages = {record['url'] for record in read_journal(second.output_folder) if record['type'] == 'page'}
+    assert len(pages) == 6
@@ -0,0 +1,68 @@
+from scrapers.driver_pool import DriverPool
+from scrapers.web_scraper import WebScraper
+
+
+class FakeSwitchTo:
+    def window(self, handle):
+        pass
+
+
+class FakeDriver:
+    """Driver minimal : répond aux appels faits par le pool"""
+
+    def __init__(self):
+        self.window_handles = ['main']
+        self.switch_to = FakeSwitchTo()
+        self.closed = False
+
+    def execute_cdp_cmd(self, command, params):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+
+def make_pool(created, max_pages=3):
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+    return DriverPool(size=1, max_pages_per_driver=max_pages, driver_factory=factory)
+
+
+def test_release_recycles_after_max_pages():
+    created = []
+    pool = make_pool(created)
+
+    driver = pool.acquire()
+    pool.release(driver, pages=2)
+    assert pool.acquire() is driver
+    pool.release(driver, pages=1)
+
+    assert driver.closed
+    assert pool.acquire() is not driver
+    assert len(created) == 2
+
+
+def test_long_task_recycles_driver_by_page_count(tmp_path):
+    created = []
+    pool = make_pool(created)
+    scraper = WebScraper(str(tmp_path / 'out'), driver_pool=pool)
+    try:
+        first = scraper.get_driver()
+        for _ in range(3):
+            scraper.record_driver_page()
+
+        # Recyclé pendant la tâche, sans attendre close()
+        assert first.closed
+        assert scraper.driver is None
+        assert scraper.get_driver() is not first
+        assert len(created) == 2
+    finally:
+        scraper.close()
+        pool.shutdown()
@@ -0,0 +1,129 @@
+import os
+
+from scrapers.http_cache import HttpCache
+
+PAGE = ('<html><head><link rel="stylesheet" href="/style.css"></head>'
+        '<body><p>' + 'Contenu de la page ' * 10 + '</p></body></html>')
+
+
+def conditional(site, path, body, etag, content_type):
+    """Route qui répond 304 quand If-None-Match correspond à l'ETag courant"""
+    def handler(request):
+        if request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+        data = body.encode('utf-8')
+        request.send_response(200)
+        request.send_header('Content-Type', content_type)
+        request.send_header('ETag', etag)
+        request.send_header('Cache-Control', 'no-cache')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+    site.routes[path] = handler
+
+
+def crawl_twice(site, make_scraper, tmp_path, css_after):
+    cache = HttpCache(str(tmp_path / 'cache'))
+    conditional(site, '/index.html', PAGE, '"page-1"', 'text/html; charset=utf-8')
+    conditional(site, '/style.css', 'body { color: red; }', '"css-1"', 'text/css')
+    baseline = make_scraper('baseline', http_cache=cache)
+    baseline.start_scraping(site.url('/index.html'))
+
+    if css_after is not None:
+        conditional(site, '/style.css', css_after, '"css-2"', 'text/css')
+    incremental = make_scraper('incremental', http_cache=cache)
+    incremental.baseline_folder = baseline.output_folder
+    incremental.start_scraping(site.url('/index.html'))
+    return incremental
+
+
+def css_requests(site):
+    return [headers.get('If-None-Match') for path, headers in site.requests if path == '/style.css']
+
+
+def test_unchanged_page_revalidates_its_assets(site, make_scraper, tmp_path):
+    scraper = crawl_twice(site, make_scraper, tmp_path, css_after=None)
+
+    assert scraper.changes['unchanged'] == {site.url('/index.html')}
+    # Ressource revalidée par une requête conditionnelle, pas reprise à l'aveugle
+    assert css_requests(site) == [None, '"css-1"']
+    with open(os.path.join(scraper.output_folder, 'css', 'style.css'), encoding='utf-8') as f:
+        assert f.read() == 'body { color: red; }'
+
+
+def test_changed_asset_reprocesses_unchanged_page(site, make_scraper, tmp_path):
+    scraper = crawl_twice(site, make_scraper, tmp_path, css_after='body { color: blue; }')
+
+    assert not scraper.changes['unchanged']
+    assert scraper.changes['changed'] == {site.url('/index.html')}
+    assert css_requests(site) == [None, '"css-1"']
+    with open(os.path.join(scraper.output_folder, 'css', 'style.css'), encoding='utf-8') as f:
+        assert f.read() == 'body { color: blue; }'
+
+
+def test_reused_page_links_are_read_from_its_file(site, make_scraper, tmp_path):
+    body = '<html><body><p>' + 'Sommaire ' * 20 + '</p><a href="intro.html">Intro</a></body></html>'
+    conditional(site, '/docs/', body, '"docs-1"', 'text/html; charset=utf-8')
+    conditional(site, '/docs/intro.html', PAGE.replace('/style.css', '/docs/style.css'), '"intro-1"',
+                'text/html; charset=utf-8')
+    conditional(site, '/docs/style.css', 'p {}', '"css-1"', 'text/css')
+    baseline = make_scraper('baseline')
+    baseline.start_scraping(site.url('/docs/'))
+
+    incremental = make_scraper('incremental')
+    incremental.baseline_folder = baseline.output_folder
+    incremental.start_scraping(site.url('/docs/'))
+
+    assert incremental.changes['unchanged'] == {site.url('/docs/'), site.url('/docs/intro.html')}
+    assert all('links' not in meta for meta in incremental.page_meta.values())
+    assert site.url('/docs/intro.html') in incremental.visited_urls
+
+
+def test_rewritten_page_does_not_change_the_baseline(site, make_scraper):
+    # /list?page=1 et /list?page=2 sont enregistrées dans le même fichier list.html
+    def listing(page, label):
+        return f'<html><body><p>Liste {page} ' + f'{label} ' * 20 + '</p></body></html>'
+
+    site.add('/index.html', '<html><body><p>' + 'Accueil ' * 20 + '</p>'
+             '<a href="/list?page=1">1</a><a href="/list?page=2">2</a></body></html>')
+    site.add('/list?page=1', listing(1, 'ancienne'))
+    site.add('/list?page=2', listing(2, 'ancienne'))
+    baseline = make_scraper('baseline')
+    baseline.start_scraping(site.url('/index.html'))
+    baseline_path = os.path.join(baseline.output_folder, 'list.html')
+    with open(baseline_path, encoding='utf-8') as f:
+        before = f.read()
+
+    site.add('/list?page=2', listing(2, 'nouvelle'))
+    incremental = make_scraper('incremental')
+    incremental.baseline_folder = baseline.output_folder
+    incremental.start_scraping(site.url('/index.html'))
+
+    assert site.url('/list?page=1') in incremental.changes['unchanged']
+    assert incremental.changes['changed'] == {site.url('/list?page=2')}
+    with open(baseline_path, encoding='utf-8') as f:
+        assert f.read() == before
+    with open(os.path.join(incremental.output_folder, 'list.html'), encoding='utf-8') as f:
+        assert 'nouvelle' in f.read()
+
+
+def test_removed_page_is_detected_in_auto_mode(site, make_scraper):
+    site.add('/index.html', '<html><body><p>' + 'Accueil ' * 20 + '</p><a href="/old.html">Ancienne</a></body></html>')
+    site.add('/old.html', '<html><body><p>' + 'Ancienne page ' * 10 + '</p></body></html>')
+    baseline = make_scraper('baseline')
+    baseline.render_mode = 'auto'
+    baseline.start_scraping(site.url('/index.html'))
+
+    site.add('/old.html', 'Introuvable', content_type='text/plain', status=404)
+    incremental = make_scraper('incremental')
+    incremental.render_mode = 'auto'
+    incremental.baseline_folder = baseline.output_folder
+    # Chrome n'est pas disponible : une page en erreur ne doit pas y être rechargée
+    incremental.start_scraping(site.url('/index.html'))
+
+    assert incremental.changes_manifest['removed'] == [site.url('/old.html')]
+    assert incremental.render_stats['browser'] == 0
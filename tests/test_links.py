@@ -0,0 +1,50 @@
+TEXT = '<p>' + 'Documentation du projet ' * 5 + '</p>'
+
+
+def add_page(site, path, body):
+    site.add(path, f'<html><head>{body[0]}</head><body>{TEXT}{body[1]}</body></html>')
+
+
+def add_assets(site, *paths):
+    for path in paths:
+        if path.endswith('.css'):
+            site.add(path, 'p { margin: 0; }', content_type='text/css')
+        else:
+            site.add(path, b'\x89PNG\r\n\x1a\n', content_type='image/png')
+
+
+def test_relative_urls_resolve_against_slash_terminated_page(site, make_scraper):
+    add_page(site, '/docs/', ('<link rel="stylesheet" href="doc.css">',
+                              '<img src="logo.png"><a href="intro.html">Intro</a>'))
+    add_page(site, '/docs/intro.html', ('', ''))
+    add_assets(site, '/docs/doc.css', '/docs/logo.png')
+    scraper = make_scraper()
+
+    scraper.start_scraping(site.url('/docs/'))
+
+    for path in ('/docs/doc.css', '/docs/logo.png', '/docs/intro.html'):
+        assert site.requested(path) == 1
+    assert site.url('/docs/') in scraper.page_meta
+
+
+def test_relative_urls_resolve_against_redirect_target(site, make_scraper):
+    site.add('/guide', '', content_type=None, status=301, headers={'Location': '/guide/'})
+    add_page(site, '/guide/', ('', '<a href="next.html">Suite</a>'))
+    add_page(site, '/guide/next.html', ('', ''))
+    scraper = make_scraper()
+
+    scraper.start_scraping(site.url('/guide'))
+
+    assert site.requested('/guide/next.html') == 1
+    assert site.requested('/next.html') == 0
+
+
+def test_base_href_is_honoured(site, make_scraper):
+    add_page(site, '/a/page.html', ('<base href="/static/">', '<img src="logo.png">'))
+    add_assets(site, '/static/logo.png')
+    scraper = make_scraper()
+
+    scraper.start_scraping(site.url('/a/page.html'))
+
+    assert site.requested('/static/logo.png') == 1
+    assert site.requested('/a/logo.png') == 0
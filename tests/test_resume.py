@@ -0,0 +1,93 @@
+import gzip
+import os
+import subprocess
+import sys
+
+from scrapers.resume import PartialDownload
+
+CSS = b"body { color: #333; }\n" * 200
+
+
+def test_gzip_asset_is_kept_and_decoded(site, make_scraper):
+    site.add('/style.css', gzip.compress(CSS), content_type='text/css',
+             headers={'Content-Encoding': 'gzip', 'ETag': '"v1"'})
+    scraper = make_scraper()
+
+    path = scraper.fetch_external_file(site.url('/style.css'), scraper.output_folder)
+
+    assert path is not None
+    with open(os.path.join(scraper.output_folder, path), 'rb') as f:
+        assert f.read() == CSS
+    # Contenu encodé : rien à reprendre, aucun partiel laissé derrière
+    assert not any(name.startswith('.partial-') for name in os.listdir(scraper.output_folder))
+
+
+def test_interrupted_transfer_resumes_with_range(site, make_scraper):
+    body = bytes(range(256)) * 2000  # Plusieurs blocs de lecture avant la coupure
+    cut = len(body) // 3
+
+    def resource(handler):
+        requested_range = handler.headers.get('Range')
+        if requested_range is None:
+            # Premier essai : la connexion est coupée au tiers du fichier
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'application/octet-stream')
+            handler.send_header('Content-Length', str(len(body)))
+            handler.send_header('ETag', '"fixe"')
+            handler.end_headers()
+            handler.wfile.write(body[:cut])
+            handler.wfile.flush()
+            handler.close_connection = True
+            return
+        start = int(requested_range.split('=')[1].rstrip('-'))
+        handler.send_response(206)
+        handler.send_header('Content-Type', 'application/octet-stream')
+        handler.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+        handler.send_header('Content-Length', str(len(body) - start))
+        handler.send_header('ETag', '"fixe"')
+        handler.end_headers()
+        handler.wfile.write(body[start:])
+
+    site.routes['/data.bin'] = resource
+    scraper = make_scraper()
+
+    path = scraper.fetch_external_file(site.url('/data.bin'), scraper.output_folder)
+
+    assert path is not None
+    with open(os.path.join(scraper.output_folder, path), 'rb') as f:
+        assert f.read() == body
+    ranges = [headers.get('Range') for requested, headers in site.requests if requested == '/data.bin']
+    assert ranges[0] is None
+    offset = int(ranges[1].split('=')[1].rstrip('-'))
+    assert 0 < offset <= cut
+
+
+def test_partial_is_claimed_once(tmp_path):
+    first = PartialDownload(str(tmp_path), 'http://example.com/a.bin')
+    second = PartialDownload(str(tmp_path), 'http://example.com/a.bin')
+
+    assert first.claim()
+    assert not second.claim()
+    first.release()
+    assert second.claim()
+    second.release()
+
+
+def claim_in_other_process(folder, url):
+    """Tente la réservation depuis un autre processus (shard, worker gunicorn)"""
+    code = ("import sys; from scrapers.resume import PartialDownload; "
+            "print(PartialDownload(sys.argv[1], sys.argv[2]).claim())")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code, folder, url], cwd=root,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip() == 'True'
+
+
+def test_partial_claim_holds_across_processes(tmp_path):
+    url = 'http://example.com/a.bin'
+    partial = PartialDownload(str(tmp_path), url)
+
+    assert partial.claim()
+    assert not claim_in_other_process(str(tmp_path), url)
+    partial.release()
+    assert claim_in_other_process(str(tmp_path), url)
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+from test_checkpoint import add_chain
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script principal qui note chacun de ses imports, à la manière d'app.py
+MAIN_SCRIPT = '''
+import sys
+sys.path.insert(0, {root!r})
+with open({marker!r}, 'a') as f:
+    f.write('import\\n')
+
+from scrapers.driver_pool import DriverPool
+from scrapers.web_scraper import WebScraper
+
+if __name__ == '__main__':
+    scraper = WebScraper({output!r}, driver_pool=DriverPool(1))
+    scraper.render_mode = 'static'
+    scraper.delay = 0
+    scraper.tracking_params = []
+    scraper.start_sharded_scraping({url!r}, 2)
+    print(len(scraper.page_meta))
+    scraper.close()
+'''
+
+
+def test_shards_do_not_reimport_main_module(site, tmp_path):
+    add_chain(site, 4)
+    marker = tmp_path / 'imports.txt'
+    script = tmp_path / 'main.py'
+    script.write_text(MAIN_SCRIPT.format(
+        root=ROOT, marker=str(marker), output=str(tmp_path / 'out'), url=site.url('/p0.html')
+    ))
+
+    result = subprocess.run([sys.executable, str(script)], cwd=tmp_path, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '4'
+    assert marker.read_text() == 'import\n'
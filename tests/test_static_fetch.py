@@ -0,0 +1,107 @@
+import os
+
+PAGE = '<html><head>{meta}<title>Test</title></head><body><p>Café crème et pâtisseries du matin, servis chaque jour.</p></body></html>'
+
+
+def read_page(scraper, name='index.html'):
+    with open(os.path.join(scraper.output_folder, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_utf8_page_without_charset_header(site, make_scraper):
+    site.add('/', PAGE.format(meta='<meta charset="utf-8">'), content_type='text/html')
+    scraper = make_scraper()
+    scraper.start_scraping(site.url('/'))
+
+    assert 'Café crème' in read_page(scraper)
+
+
+def test_utf8_page_without_any_declaration(site, make_scraper):
+    site.add('/', PAGE.format(meta=''), content_type='text/html')
+    scraper = make_scraper()
+    scraper.start_scraping(site.url('/'))
+
+    assert 'Café crème' in read_page(scraper)
+
+
+def test_latin1_page_declared_in_meta_is_saved_as_utf8(site, make_scraper):
+    site.add('/', PAGE.format(meta='<meta charset="iso-8859-1">').encode('latin-1'), content_type='text/html')
+    scraper = make_scraper()
+    scraper.start_scraping(site.url('/'))
+
+    html = read_page(scraper)
+    assert 'Café crème' in html
+    assert 'charset="utf-8"' in html
+
+
+def test_charset_header_takes_precedence(site, make_scraper):
+    site.add('/', PAGE.format(meta='').encode('latin-1'), content_type='text/html; charset=iso-8859-1')
+    scraper = make_scraper()
+    scraper.start_scraping(site.url('/'))
+
+    assert 'Café crème' in read_page(scraper)
+
+
+def add_pages(site, thin):
+    """Chaîne /p0.html -> /p1.html -> ... ; les pages de thin n'ont presque pas de texte"""
+    count = len(thin)
+    for index, is_thin in enumerate(thin):
+        link = f'<a href="/p{index + 1}.html">suite</a>' if index + 1 < count else ''
+        text = 'Chargement' if is_thin else 'Texte servi directement par le serveur. ' * 3
+        site.add(f'/p{index}.html', f'<html><body><p>{text}</p>{link}</body></html>')
+
+
+def auto_scraper(make_scraper, site):
+    scraper = make_scraper()
+    scraper.render_mode = 'auto'
+
+    # Chrome remplacé par la version statique de la page
+    def fetch_with_browser(url):
+        return scraper.fetch_static(url, conditional=False)
+
+    scraper.fetch_with_browser = fetch_with_browser
+    return scraper
+
+
+def test_single_thin_page_does_not_switch_the_domain_to_chrome(site, make_scraper):
+    add_pages(site, [False, True, False, False])
+    scraper = auto_scraper(make_scraper, site)
+    scraper.start_scraping(site.url('/p0.html'))
+
+    assert scraper.render_stats == {'static': 3, 'browser': 1}
+    assert scraper.domain_render_modes == {}
+
+
+def test_consecutive_thin_pages_switch_the_domain_to_chrome(site, make_scraper):
+    add_pages(site, [True, True, True, False, False])
+    scraper = auto_scraper(make_scraper, site)
+    scraper.render_fallback_pages = 3
+    scraper.start_scraping(site.url('/p0.html'))
+
+    assert scraper.render_stats == {'static': 0, 'browser': 5}
+    assert scraper.domain_render_modes == {scraper.base_domain: 'browser'}
+    # Les pages suivantes ne passent plus par la récupération statique
+    assert site.requested('/p3.html') == 1
+
+
+def test_auto_mode_parses_each_page_once(site, make_scraper, monkeypatch):
+    import scrapers.web_scraper as web_scraper
+
+    calls = []
+    parse_html = web_scraper.parse_html
+
+    def counting_parse_html(html, backend='auto'):
+        calls.append(html)
+        return parse_html(html, backend)
+
+    monkeypatch.setattr(web_scraper, 'parse_html', counting_parse_html)
+    page = PAGE.format(meta='<meta charset="utf-8">')
+    site.add('/', page.replace('</body>', '<noscript>Activez JavaScript</noscript></body>'))
+    scraper = make_scraper()
+    scraper.render_mode = 'auto'
+    scraper.start_scraping(site.url('/'))
+
+    assert len(calls) == 1
+    assert scraper.render_stats == {'static': 1, 'browser': 0}
+    # L'heuristique de rendu ne retire rien de l'arbre enregistré
+    assert 'Activez JavaScript' in read_page(scraper)